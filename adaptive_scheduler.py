@@ -0,0 +1,208 @@
+# adaptive_scheduler.py — Allocate extra repetitions to the cells that most need them
+
+import heapq
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.stats import t as t_dist
+
+from model_comparison import CONTRASTS
+from response_cache import ResponseCache, cache_key
+from run_experiment import PROMPTS_PATH, SAMPLING_PARAMS, load_prompts, make_row, reuse_row
+
+ANALYSIS_DIR = Path("analysis")
+QUEUE_PATH = Path("prompts") / "sampling_queue.json"
+
+# Contrasts whose confidence intervals drive the allocation
+SCHEDULED_CONTRASTS = ["framing", "confirmation"]
+
+TARGET_HALF_WIDTH = 0.25   # 95% CI half-width on the compound-sentiment gap
+CONFIDENCE = 0.95
+MIN_PER_CELL = 2           # cells below this are topped up first (variance undefined)
+MAX_NEW_CALLS = 200        # budget per scheduling round
+
+
+# ---------- current precision ----------
+
+def cell_variances(sent: pd.DataFrame) -> pd.DataFrame:
+    """
+    n and sample variance of compound per (model, condition). Cells with
+    fewer than two responses borrow the pooled within-cell variance.
+    """
+    cells = sent.groupby(["model_name", "condition_id"])["compound"].agg(n="count", var="var")
+    within = (cells["var"] * (cells["n"] - 1)).sum()
+    dof = (cells["n"] - 1).clip(lower=0).sum()
+    pooled = within / dof if dof > 0 else 0.25
+    cells["var"] = cells["var"].fillna(pooled)
+    cells.loc[cells["n"] < 2, "var"] = pooled
+    return cells
+
+
+def half_width(var_a, n_a, var_b, n_b):
+    if n_a < 1 or n_b < 1:
+        return np.inf
+    dof = max(n_a + n_b - 2, 1)
+    q = t_dist.ppf(0.5 + CONFIDENCE / 2, dof)
+    return q * np.sqrt(var_a / n_a + var_b / n_b)
+
+
+# ---------- greedy allocation ----------
+
+def plan_allocation(cells, models, contrasts=SCHEDULED_CONTRASTS, target=TARGET_HALF_WIDTH, budget=MAX_NEW_CALLS):
+    """
+    Greedy allocation of one extra response at a time to whichever cell
+    shrinks its contrast's CI half-width the most, until every contrast is
+    at or below `target` or the budget runs out.
+
+    Returns (dict (model, condition) -> extra responses, contrast summary rows).
+    """
+    n = {k: int(v) for k, v in cells["n"].items()}
+    var = dict(cells["var"].items())
+    pooled = float(cells["var"].mean()) if len(cells) else 0.25
+    extra = {}
+
+    def add(cell):
+        n[cell] = n.get(cell, 0) + 1
+        var.setdefault(cell, pooled)
+        extra[cell] = extra.get(cell, 0) + 1
+
+    pairs = [(m, name, *CONTRASTS[name]) for m in models for name in contrasts]
+    spent = 0
+
+    # top up cells that cannot yet estimate a variance
+    for m, _, a, b in pairs:
+        for cond in (a, b):
+            while n.get((m, cond), 0) < MIN_PER_CELL and spent < budget:
+                add((m, cond))
+                spent += 1
+
+    def width(m, a, b, da=0, db=0):
+        return half_width(var.get((m, a), pooled), n.get((m, a), 0) + da,
+                          var.get((m, b), pooled), n.get((m, b), 0) + db)
+
+    def best_step(m, a, b):
+        w = width(m, a, b)
+        gain_a = w - width(m, a, b, da=1)
+        gain_b = w - width(m, a, b, db=1)
+        return (gain_a, a) if gain_a >= gain_b else (gain_b, b)
+
+    heap = []
+    for m, name, a, b in pairs:
+        if width(m, a, b) > target:
+            gain, cond = best_step(m, a, b)
+            heapq.heappush(heap, (-gain, m, name, a, b, cond))
+
+    while heap and spent < budget:
+        _, m, name, a, b, cond = heapq.heappop(heap)
+        add((m, cond))
+        spent += 1
+        if width(m, a, b) > target:
+            gain, cond = best_step(m, a, b)
+            heapq.heappush(heap, (-gain, m, name, a, b, cond))
+
+    summary = []
+    for m, name, a, b in pairs:
+        before = half_width(cells["var"].get((m, a), pooled), int(cells["n"].get((m, a), 0)),
+                            cells["var"].get((m, b), pooled), int(cells["n"].get((m, b), 0)))
+        summary.append({
+            "model_name": m,
+            "contrast": name,
+            "current_half_width": before,
+            "planned_half_width": width(m, a, b),
+            "extra_calls": extra.get((m, a), 0) + extra.get((m, b), 0),
+            "meets_target": width(m, a, b) <= target,
+        })
+    return extra, summary
+
+
+def uniform_calls_needed(cells, models, contrasts=SCHEDULED_CONTRASTS, target=TARGET_HALF_WIDTH, cap=1000):
+    """Calls a fixed design would need: the same extra count for every in-scope cell."""
+    pooled = float(cells["var"].mean()) if len(cells) else 0.25
+    pairs = [(m, *CONTRASTS[name]) for m in models for name in contrasts]
+
+    def stat(cell):
+        return cells["var"].get(cell, pooled), int(cells["n"].get(cell, 0))
+
+    for r in range(cap + 1):
+        widths = []
+        for m, a, b in pairs:
+            (va, na), (vb, nb) = stat((m, a)), stat((m, b))
+            widths.append(half_width(va, na + r, vb, nb + r))
+        if all(w <= target for w in widths):
+            return r * 2 * len(pairs)
+    return None
+
+
+def build_queue(extra, cells, prompts):
+    """
+    Expand the allocation into concrete requests. Repetition indices
+    continue after the responses already collected, so each entry maps to a
+    new response-cache key.
+    """
+    by_condition = {p["condition_id"]: p for p in prompts}
+    queue = []
+    for (model, cond), k in sorted(extra.items()):
+        if cond not in by_condition:
+            print(f"No prompt for condition {cond}; skipping.")
+            continue
+        start = int(cells["n"].get((model, cond), 0))
+        for rep in range(start, start + k):
+            queue.append({
+                "model_name": model,
+                "condition_id": cond,
+                "prompt_id": by_condition[cond]["prompt_id"],
+                "repetition": rep,
+            })
+    return queue
+
+
+def collect_queue(queue, dispatch, cache=None):
+    """
+    Run a sampling queue through the response cache; only misses call
+    dispatch(prompt, model_name, repetition) -> response_text.
+    """
+    cache = cache if cache is not None else ResponseCache()
+    prompts = {p["prompt_id"]: p for p in load_prompts()}
+    rows = []
+    for item in queue:
+        p = prompts[item["prompt_id"]]
+        key = cache_key(p["prompt_text"], item["model_name"], SAMPLING_PARAMS, item["repetition"])
+        cached = cache.get(key)
+        if cached is not None:
+            rows.append(reuse_row(cached, p))
+            continue
+        row = make_row(p, item["model_name"], dispatch(p, item["model_name"], item["repetition"]), item["repetition"])
+        cache.put(key, row)
+        rows.append(row)
+    print(cache.report())
+    return rows
+
+
+def main():
+    sent_path = ANALYSIS_DIR / "sentiment_raw.csv"
+    if not sent_path.exists():
+        raise FileNotFoundError(f"{sent_path} not found. Run analyze_bias.py first.")
+    if not PROMPTS_PATH.exists():
+        raise FileNotFoundError("Run experiment_design.py first to generate prompts.")
+
+    sent = pd.read_csv(sent_path)
+    cells = cell_variances(sent)
+    models = sorted(sent["model_name"].unique())
+
+    extra, summary = plan_allocation(cells, models)
+    queue = build_queue(extra, cells, load_prompts())
+
+    with QUEUE_PATH.open("w", encoding="utf-8") as f:
+        json.dump(queue, f, indent=2)
+
+    print(pd.DataFrame(summary).to_string(index=False))
+    print(f"\nQueued {len(queue)} model calls in {QUEUE_PATH} (target CI half-width {TARGET_HALF_WIDTH}).")
+    uniform = uniform_calls_needed(cells, models)
+    if uniform is not None:
+        print(f"A fixed number of extra runs per cell would need {uniform} calls.")
+
+
+if __name__ == "__main__":
+    main()
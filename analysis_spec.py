@@ -0,0 +1,225 @@
+# analysis_spec.py — Declarative analysis spec (inputs, word lists, ground truth, tests) with per-stage hashes
+
+import hashlib
+import json
+import os
+import tomllib
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import yaml  # optional: only needed for .yaml / .yml specs
+except ImportError:
+    yaml = None
+
+DEFAULT_SPEC_PATH = Path(__file__).with_name("analysis_spec.toml")
+# Every script reads this spec unless given another one
+SPEC_PATH = Path(os.environ.get("ANALYSIS_SPEC", DEFAULT_SPEC_PATH))
+STAGE_MANIFEST_NAME = "spec_stages.json"
+
+REQUIRED_SECTIONS = ["inputs", "outputs", "stages", "sentiment", "entities", "keywords", "phrases",
+                     "ground_truth", "tests"]
+
+# Spec sections each stage reads. A stage's hash covers exactly these, so
+# editing e.g. [phrases] changes only the validation hash. "scores" and
+# "claims" are intermediates shared between stages, not stages of their own.
+# Stages that read [inputs] also hash the response files it selects, so new
+# or rewritten data makes them (and everything downstream) stale.
+STAGE_SECTIONS = {
+    "load": ["inputs"],
+    "scores": ["inputs", "sentiment"],
+    "claims": ["inputs"],
+    "entities": ["inputs", "entities"],
+    "sentiment": ["inputs", "sentiment", "tests.ttests"],
+    "recommendations": ["inputs", "keywords"],
+    "ttests": ["inputs", "sentiment", "tests.ttests"],
+    "chi_square": ["inputs", "keywords", "tests.chi_square"],
+    "validation": ["inputs", "phrases", "ground_truth"],
+}
+
+# Files each stage writes under the spec's analysis_dir, in run order
+STAGE_OUTPUTS = {
+    "entities": ["entity_mentions.csv"],
+    "sentiment": ["sentiment_raw.csv", "sentiment_by_condition.csv", "sentiment_by_condition_model.csv",
+                  "sentiment_ttests.csv"],
+    "recommendations": ["recommendations_raw.csv", "recommendations_by_condition.csv",
+                        "recommendations_by_condition_model.csv"],
+    "ttests": ["stat_ttests.csv"],
+    "chi_square": ["stat_chi_square.csv"],
+    "validation": ["claims.csv", "validation_flags.csv", "fabrication_rates_by_condition.csv"],
+}
+STAGES = list(STAGE_OUTPUTS)
+STAGE_NEEDS = {"ttests": "sentiment", "chi_square": "recommendations"}
+
+
+class AnalysisSpec:
+    """
+    A parsed spec. `data` is the document as loaded (TOML and YAML give the
+    same dict, hence the same hashes); the properties are the views the
+    analysis modules use. Paths are relative to the working directory.
+    """
+
+    def __init__(self, data, path=None):
+        self.data = data
+        self.path = Path(path) if path else None
+        where = f" in {self.path}" if self.path else ""
+
+        missing = [s for s in REQUIRED_SECTIONS if s not in data]
+        if missing:
+            raise ValueError(f"Analysis spec is missing section(s) {missing}{where}")
+        unknown = [s for s in data["stages"].get("run", []) if s not in STAGE_OUTPUTS]
+        if unknown:
+            raise ValueError(f"Unknown stage(s) {unknown}{where}. Available: {STAGES}")
+        buckets = [b for b in self.chi_square if b not in self.keywords]
+        if buckets:
+            raise ValueError(f"chi_square bucket(s) {buckets} have no [keywords] entry{where}")
+
+    @property
+    def name(self):
+        return self.data.get("name") or (self.path.stem if self.path else "spec")
+
+    @property
+    def results_dir(self):
+        return Path(self.data["inputs"]["results_dir"])
+
+    @property
+    def filters(self):
+        """runs / models / conditions for load_responses (empty list = no filter)."""
+        inputs = self.data["inputs"]
+        return {k: inputs.get(k) or None for k in ("runs", "models", "conditions")}
+
+    @property
+    def analysis_dir(self):
+        return Path(self.data["outputs"]["analysis_dir"])
+
+    @property
+    def stages(self):
+        """Requested stages plus their dependencies, in run order."""
+        wanted = set(self.data["stages"].get("run", STAGES))
+        wanted |= {STAGE_NEEDS[s] for s in wanted if s in STAGE_NEEDS}
+        return [s for s in STAGES if s in wanted]
+
+    @property
+    def scorer(self):
+        return self.data["sentiment"]["scorer"]
+
+    @property
+    def players(self):
+        return list(self.data["entities"]["players"])
+
+    @property
+    def keywords(self):
+        return {bucket: list(words) for bucket, words in self.data["keywords"].items()}
+
+    @property
+    def phrases(self):
+        return {kind: list(p) for kind, p in self.data["phrases"].items()}
+
+    @property
+    def ground_truth(self):
+        return {k: v for k, v in self.data["ground_truth"].items() if k != "player"}
+
+    @property
+    def player_ground_truth(self):
+        return dict(self.data["ground_truth"].get("player", {}))
+
+    @property
+    def ttests(self):
+        return list(self.data["tests"].get("ttests", []))
+
+    @property
+    def chi_square(self):
+        return list(self.data["tests"].get("chi_square", []))
+
+    def section(self, dotted):
+        value = self.data
+        for part in dotted.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+
+    def input_files(self):
+        """
+        (name, size, mtime_ns) of every response file the [inputs] filters
+        select. Partitions are not listed: they are derived from these files
+        and only read while their manifest still matches them.
+        """
+        from partitioned_dataset import source_files  # it imports this module
+
+        filters = self.filters
+        stats = [(f.name, f.stat()) for f, _, _ in source_files(self.results_dir, filters["runs"], filters["models"])]
+        return [(name, st.st_size, st.st_mtime_ns) for name, st in stats]
+
+    def stage_hash(self, stage):
+        """sha256 of the spec sections `stage` reads (see STAGE_SECTIONS) and of its input files."""
+        sections = {s: self.section(s) for s in STAGE_SECTIONS[stage]}
+        if "inputs" in sections:
+            sections["input_files"] = self.input_files()
+        payload = json.dumps([stage, sections], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def stage_hashes(self):
+        return {stage: self.stage_hash(stage) for stage in self.stages}
+
+
+def load_spec(path=SPEC_PATH):
+    """Read a .toml spec (or .yaml / .yml when PyYAML is installed)."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Analysis spec {path} not found.")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        if yaml is None:
+            raise SystemExit(f"{path} is YAML: install PyYAML (pip install pyyaml) or use a .toml spec.")
+        with path.open("r", encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+    else:
+        with path.open("rb") as f:
+            data = tomllib.load(f)
+    return AnalysisSpec(data, path)
+
+
+@lru_cache(maxsize=None)
+def default_spec():
+    """The spec at SPEC_PATH, loaded once per process (module-level defaults come from it)."""
+    return load_spec(SPEC_PATH)
+
+
+# -------------------------------------------------------------------
+# Stage manifest: which spec hashes produced the files in an analysis dir
+# -------------------------------------------------------------------
+def read_stage_manifest(analysis_dir):
+    path = Path(analysis_dir) / STAGE_MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_stage_manifest(analysis_dir, hashes):
+    path = Path(analysis_dir) / STAGE_MANIFEST_NAME
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+
+
+def output_dir(spec, default):
+    """
+    Where a stage writes: the spec's analysis_dir (created if needed), or
+    `default`, the calling module's ANALYSIS_DIR, when no spec is given.
+    """
+    if spec is None:
+        return default
+    spec.analysis_dir.mkdir(parents=True, exist_ok=True)
+    return spec.analysis_dir
+
+
+def stage_is_current(spec, stage, manifest=None):
+    """True if `stage`'s outputs exist in the spec's analysis_dir and were made with the same hash."""
+    manifest = read_stage_manifest(spec.analysis_dir) if manifest is None else manifest
+    if manifest.get(stage) != spec.stage_hash(stage):
+        return False
+    return all((spec.analysis_dir / name).exists() for name in STAGE_OUTPUTS[stage])
+
+
+def changed_stages(spec):
+    """Stages of `spec` that have to run again in its analysis_dir."""
+    manifest = read_stage_manifest(spec.analysis_dir)
+    return [s for s in spec.stages if not stage_is_current(spec, s, manifest)]
@@ -1,178 +1,146 @@
 # analyze_bias.py — Quantitative analysis of LLM outputs from JSON files (sanitized)
 
-import json
-from pathlib import Path
-from collections import Counter
-
 import pandas as pd
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
 from scipy.stats import ttest_ind
 
+from analysis_spec import default_spec, output_dir
+from partitioned_dataset import load_responses
+from sentiment_scorers import get_scorer
+
 # -------------------------------------------------------------------
-# Paths
+# Defaults from the analysis spec (analysis_spec.toml or $ANALYSIS_SPEC).
+# Every analysis function also takes spec= to run a variant.
 # -------------------------------------------------------------------
-RESULTS_DIR = Path(r"C:\Users\leena\Downloads\results")
-ANALYSIS_DIR = Path("analysis")
-ANALYSIS_DIR.mkdir(exist_ok=True)
+SPEC = default_spec()
+RESULTS_DIR = SPEC.results_dir
+ANALYSIS_DIR = SPEC.analysis_dir
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
 
-# -------------------------------------------------------------------
 # Anonymous players only — NO REAL NAMES
-# -------------------------------------------------------------------
-PLAYERS = ["Player A", "Player B", "Player C", "Player Star"]
+PLAYERS = SPEC.players
 
 # Keyword buckets
-OFFENSE_WORDS = ["attack", "offense", "offensive", "scoring", "goals", "shooting", "finish"]
-DEFENSE_WORDS = ["defense", "defensive", "turnovers", "ground balls", "saves", "goalie", "stops"]
-TEAM_WORDS = ["team", "system", "overall", "collective"]
-INDIVIDUAL_WORDS = ["player", "individual", "specific", "starter"]
+KEYWORD_BUCKETS = SPEC.keywords
+
+# Sentiment scorer (see sentiment_scorers.py): "vader", "lexicon" or "sports"
+SENTIMENT_SCORER = SPEC.scorer
+SENTIMENT_TTESTS = SPEC.ttests
 
 
 # -------------------------------------------------------------------
 # Load ALL JSON response files
 # -------------------------------------------------------------------
-def load_json_responses():
+def load_json_responses(runs=None, models=None, conditions=None):
+    """
+    Load responses, optionally restricted to some runs / models / conditions
+    (e.g. runs=[2], models=["gemini"]). Only matching partitions or files are read.
+    """
     print("Loading JSON response files...")
-
-    json_files = list(RESULTS_DIR.glob("Run*_responses.json"))
-
-    if not json_files:
-        print("❌ No JSON files found. Expected files like: Run1_chatgpt_responses.json")
-        raise SystemExit
-
-    rows = []
-    for jf in json_files:
-        print(f"Loading {jf.name}...")
-        with jf.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-            for entry in data:
-                rows.append(entry)
-
-    df = pd.DataFrame(rows)
-
-    # Fill missing fields if needed
-    if "hypothesis_id" not in df.columns:
-        df["hypothesis_id"] = df["condition_id"].astype(str).str.slice(0, 2)
-
-    return df
+    return load_responses(RESULTS_DIR, runs=runs, models=models, conditions=conditions)
 
 
 # -------------------------------------------------------------------
 # Entity mention analysis
 # -------------------------------------------------------------------
-def analyze_entities(df):
-    rows = []
-    grouped = df.groupby(["condition_id", "model_name"], dropna=False)
+def analyze_entities(df, spec=None):
+    players = PLAYERS if spec is None else spec.players
+    needles = [p.lower() for p in players]
 
-    for (cond, model), group in grouped:
-        total = len(group)
-        counts = Counter()
+    # one pass over the lowercased texts, then counts per group
+    texts = map(str.lower, df["response_text"].astype(str))
+    hits = pd.DataFrame([[n in tl for n in needles] for tl in texts], columns=players, index=df.index)
+    hits["responses"] = 1
+    grouped = hits.groupby([df["condition_id"], df["model_name"]], dropna=False).sum()
 
-        for text in group["response_text"]:
-            tl = text.lower()
-            for p in PLAYERS:
-                if p.lower() in tl:
-                    counts[p] += 1
-
-        for p in PLAYERS:
+    rows = []
+    for (cond, model), counts in grouped.iterrows():
+        total = int(counts["responses"])
+        for p in players:
             rows.append({
                 "condition_id": cond,
                 "model_name": model,
                 "entity": p,
-                "mention_count": counts[p],
+                "mention_count": int(counts[p]),
                 "mention_rate": counts[p] / total if total else 0,
                 "responses": total
             })
 
     ent_df = pd.DataFrame(rows)
-    ent_df.to_csv(ANALYSIS_DIR / "entity_mentions.csv", index=False)
+    ent_df.to_csv(output_dir(spec, ANALYSIS_DIR) / "entity_mentions.csv", index=False)
     return ent_df
 
 
 # -------------------------------------------------------------------
-# Sentiment analysis (VADER)
+# Sentiment analysis (VADER or another registered scorer)
 # -------------------------------------------------------------------
-def analyze_sentiment(df):
-    sid = SentimentIntensityAnalyzer()
-
-    sent_rows = []
-    for _, row in df.iterrows():
-        scores = sid.polarity_scores(row["response_text"])
-        sent_rows.append({
-            "response_id": row["response_id"],
-            "condition_id": row["condition_id"],
-            "model_name": row["model_name"],
-            "compound": scores["compound"],
-            "pos": scores["pos"],
-            "neu": scores["neu"],
-            "neg": scores["neg"],
-        })
-
-    sent = pd.DataFrame(sent_rows)
-    sent.to_csv(ANALYSIS_DIR / "sentiment_raw.csv", index=False)
+def analyze_sentiment(df, scorer=None, spec=None):
+    scorer = scorer or get_scorer(SENTIMENT_SCORER if spec is None else spec.scorer)
+    out_dir = output_dir(spec, ANALYSIS_DIR)
+    scores = scorer.score_batch(df["response_text"].astype(str))
+
+    sent = pd.DataFrame({
+        "response_id": df["response_id"].values,
+        "condition_id": df["condition_id"].values,
+        "model_name": df["model_name"].values,
+        "compound": scores["compound"].values,
+        "pos": scores["pos"].values,
+        "neu": scores["neu"].values,
+        "neg": scores["neg"].values,
+    })
+    sent.to_csv(out_dir / "sentiment_raw.csv", index=False)
 
     sent.groupby("condition_id")[["compound", "pos", "neu", "neg"]].mean().reset_index() \
-        .to_csv(ANALYSIS_DIR / "sentiment_by_condition.csv", index=False)
+        .to_csv(out_dir / "sentiment_by_condition.csv", index=False)
 
     sent.groupby(["condition_id", "model_name"])[["compound"]].mean().reset_index() \
-        .to_csv(ANALYSIS_DIR / "sentiment_by_condition_model.csv", index=False)
+        .to_csv(out_dir / "sentiment_by_condition_model.csv", index=False)
 
-    run_sentiment_tests(sent)
+    run_sentiment_tests(sent, spec)
     return sent
 
 
-def run_sentiment_tests(sent):
+def run_sentiment_tests(sent, spec=None):
+    """Welch t-test of compound sentiment for each [tests] ttests pair (e.g. H1_pos vs H1_neg)."""
     results = []
 
-    # H1: Positive vs Negative
-    h1_pos = sent[sent["condition_id"] == "H1_pos"]["compound"]
-    h1_neg = sent[sent["condition_id"] == "H1_neg"]["compound"]
+    for test in SENTIMENT_TTESTS if spec is None else spec.ttests:
+        a = sent[sent["condition_id"] == test["a"]]["compound"]
+        b = sent[sent["condition_id"] == test["b"]]["compound"]
 
-    if len(h1_pos) > 1 and len(h1_neg) > 1:
-        t, p = ttest_ind(h1_pos, h1_neg, equal_var=False)
-        results.append({"test": "H1_pos vs H1_neg", "t": t, "p": p})
+        if len(a) > 1 and len(b) > 1:
+            t, p = ttest_ind(a, b, equal_var=False)
+            results.append({"test": f"{test['a']} vs {test['b']}", "t": t, "p": p})
 
-    # H3: Neutral vs Underperf
-    h3_neu = sent[sent["condition_id"] == "H3_neutral"]["compound"]
-    h3_under = sent[sent["condition_id"] == "H3_underperf"]["compound"]
-
-    if len(h3_neu) > 1 and len(h3_under) > 1:
-        t, p = ttest_ind(h3_neu, h3_under, equal_var=False)
-        results.append({"test": "H3_neutral vs H3_underperf", "t": t, "p": p})
-
-    pd.DataFrame(results).to_csv(ANALYSIS_DIR / "sentiment_ttests.csv", index=False)
+    pd.DataFrame(results).to_csv(output_dir(spec, ANALYSIS_DIR) / "sentiment_ttests.csv", index=False)
 
 
 # -------------------------------------------------------------------
 # Recommendation-type keyword analysis
 # -------------------------------------------------------------------
-def classify_recommendation(text):
+def classify_recommendation(text, buckets=None):
     txt = text.lower()
     return {
-        "offense": int(any(w in txt for w in OFFENSE_WORDS)),
-        "defense": int(any(w in txt for w in DEFENSE_WORDS)),
-        "team": int(any(w in txt for w in TEAM_WORDS)),
-        "individual": int(any(w in txt for w in INDIVIDUAL_WORDS)),
+        bucket: int(any(w in txt for w in words))
+        for bucket, words in (buckets or KEYWORD_BUCKETS).items()
     }
 
 
-def analyze_recommendations(df):
-    rows = []
-
-    for _, row in df.iterrows():
-        tags = classify_recommendation(row["response_text"])
-        tags["condition_id"] = row["condition_id"]
-        tags["model_name"] = row["model_name"]
-        tags["response_id"] = row["response_id"]
-        rows.append(tags)
+def analyze_recommendations(df, spec=None):
+    out_dir = output_dir(spec, ANALYSIS_DIR)
+    buckets = KEYWORD_BUCKETS if spec is None else spec.keywords
 
-    rec = pd.DataFrame(rows)
-    rec.to_csv(ANALYSIS_DIR / "recommendations_raw.csv", index=False)
+    rec = pd.DataFrame([classify_recommendation(text, buckets) for text in df["response_text"].astype(str)])
+    rec["condition_id"] = df["condition_id"].values
+    rec["model_name"] = df["model_name"].values
+    rec["response_id"] = df["response_id"].values
+    rec.to_csv(out_dir / "recommendations_raw.csv", index=False)
+    buckets = list(buckets)
 
-    rec.groupby("condition_id")[["offense", "defense", "team", "individual"]] \
-        .mean().reset_index().to_csv(ANALYSIS_DIR / "recommendations_by_condition.csv", index=False)
+    rec.groupby("condition_id")[buckets] \
+        .mean().reset_index().to_csv(out_dir / "recommendations_by_condition.csv", index=False)
 
-    rec.groupby(["condition_id", "model_name"])[["offense", "defense", "team", "individual"]] \
-        .mean().reset_index().to_csv(ANALYSIS_DIR / "recommendations_by_condition_model.csv", index=False)
+    rec.groupby(["condition_id", "model_name"])[buckets] \
+        .mean().reset_index().to_csv(out_dir / "recommendations_by_condition_model.csv", index=False)
 
     return rec
 
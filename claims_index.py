@@ -0,0 +1,221 @@
+# claims_index.py — Numeric-claim extraction and ground-truth checks by join
+
+import re
+
+import numpy as np
+import pandas as pd
+
+CONTEXT_CHARS = 40   # characters kept on each side of a claim
+
+# One scan over all responses: a score/record like "10-9" or a plain number.
+# The record alternative is tried first so "10-9" stays one claim.
+# A fraction followed by "-<digit>" is left unabsorbed ("1.5-2" -> 1 and 5-2),
+# which keeps the record claims identical to validate_claims.flag_response.
+# Both alternatives start at a digit; the leading (?=\d) lets the engine
+# skip every other position cheaply (about 40% of the scan time).
+CLAIM_RE = re.compile(r"(?=\d)(?:\b(\d+)\s*-\s*(\d+)\b|(?<![\w.])(\d+(?:\.\d+(?!\d)(?!\s*-\s*\d))?))")
+# Responses are scanned as one string joined by NUL: CLAIM_RE treats it
+# like a string boundary, so no claim or window crosses two responses.
+SEPARATOR = "\x00"
+
+# Unit words as written -> canonical unit
+UNIT_ALIASES = {
+    "goal": "goals", "goals": "goals",
+    "assist": "assists", "assists": "assists",
+    "point": "points", "points": "points",
+    "game": "games", "games": "games", "games played": "games",
+    "shot": "shots", "shots": "shots",
+    "win": "wins", "wins": "wins",
+    "loss": "losses", "losses": "losses",
+}
+_UNIT_WORDS = "|".join(sorted((re.escape(w) for w in UNIT_ALIASES), key=len, reverse=True))
+
+# "30 goals", "217 team goals", "4.0 points per game" (not "1.53 assist-to-goal ratio")
+UNIT_AFTER_RE = (
+    r"^\s*(?:(?:total|career|season)\s+)?(?:(?P<scope>team|opponent)\s+)?"
+    rf"(?P<unit>{_UNIT_WORDS})(?![\w-])(?P<rate>\s+(?:per|a)\s+game)?"
+)
+# "the team's 217 total goals"
+SCOPE_BEFORE_RE = r"\b(?P<scope>team|opponent)s?(?:'s|')?\s+$"
+# "points (76)", "assists: 46", "goals of 30"
+UNIT_BEFORE_RE = rf"(?P<unit>{_UNIT_WORDS})\s*(?:\(|:|=|of|was|were|totaled|totaling)?\s*$"
+# "goal differential of -5" (the sign sits just before the number)
+GOAL_DIFF_BEFORE_RE = r"goal differential(?: of)?\s+(?P<sign>-?)$"
+PERCENT_AFTER_RE = r"^\s*(?:%|percent)"
+_UNIT_AFTER, _SCOPE_BEFORE, _UNIT_BEFORE, _GOAL_DIFF_BEFORE, _PERCENT_AFTER = map(re.compile, (
+    UNIT_AFTER_RE, SCOPE_BEFORE_RE, UNIT_BEFORE_RE, GOAL_DIFF_BEFORE_RE, PERCENT_AFTER_RE))
+
+CLAIM_COLUMNS = ["response_id", "claim_idx", "value", "value2", "decimals", "unit", "start", "end", "context"]
+
+
+# -------------------------------------------------------------------
+# Extraction
+# -------------------------------------------------------------------
+def normalize(texts: pd.Series) -> pd.Series:
+    """Same normalization as text_arena.normalize_text, column-wise."""
+    return texts.astype(str).str.lower().str.replace("–", "-", regex=False)
+
+
+def _scan(texts, response_ids):
+    """
+    One regex pass over all responses; returns raw tokens with their
+    windows. Match positions are mapped back to responses with
+    searchsorted and the windows are clipped to the response.
+    """
+    texts = list(texts)
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    offsets = np.concatenate(([0], np.cumsum(lengths + 1)[:-1])).astype(np.int64)
+    joined = SEPARATOR.join(texts)
+
+    # one flat list of (start, end, wins, losses, number) runs: keeping a
+    # Match object or tuple per claim alive costs more in GC than the scan
+    found = [x for m in CLAIM_RE.finditer(joined) for x in (*m.span(), *m.groups())]
+    if not found:
+        return pd.DataFrame(columns=["response_id", "claim_idx", "start", "end", "before", "after",
+                                     "value", "value2", "decimals", "token"])
+    wins, losses, number = found[2::5], found[3::5], found[4::5]
+    start, end = np.array(found[0::5], dtype=np.int64), np.array(found[1::5], dtype=np.int64)
+
+    row = np.searchsorted(offsets, start, side="right") - 1
+    lo, hi = offsets[row], offsets[row] + lengths[row]
+    before_from = np.maximum(start - CONTEXT_CHARS, lo).tolist()
+    after_to = np.minimum(end + CONTEXT_CHARS, hi).tolist()
+    raw = pd.DataFrame({
+        "response_id": np.asarray(list(response_ids), dtype=object)[row],
+        "claim_idx": np.arange(len(row)) - np.searchsorted(row, row),
+        "start": start - lo,
+        "end": end - lo,
+        "wins": wins,
+        "losses": losses,
+        "number": number,
+        "before": [joined[a:b] for a, b in zip(before_from, start.tolist())],
+        "after": [joined[a:b] for a, b in zip(end.tolist(), after_to)],
+    })
+
+    raw["value"] = pd.to_numeric(raw["number"].fillna(raw["wins"]))
+    raw["value2"] = pd.to_numeric(raw["losses"])
+    raw["decimals"] = [len(n.partition(".")[2]) if n else 0 for n in number]
+    raw["token"] = [n if n else f"{w}-{l}" for w, l, n in zip(wins, losses, number)]
+    return raw.drop(columns=["wins", "losses", "number"])
+
+
+def _extract(strings: pd.Series, pattern) -> pd.DataFrame:
+    """Named groups of `pattern` for the strings it matches (Series.str.extract minus the misses)."""
+    # flat runs of (index, group 1, ..., group k), as in _scan
+    step = pattern.groups + 1
+    found = [x for i, m in zip(strings.index, map(pattern.search, strings.tolist())) if m for x in (i, *m.groups())]
+    return pd.DataFrame({name: found[g::step] for name, g in pattern.groupindex.items()},
+                        index=found[0::step], dtype=object)
+
+
+def classify_units(raw: pd.DataFrame):
+    """
+    Canonical unit per token from its context windows, column-wise:
+    record > goal_diff > unit after the number > unit before it > percent.
+    Team/opponent totals get a scope prefix, rates a _per_game suffix.
+    Numbers with no recognizable unit are kept as "number".
+    Returns (units, goal-differential sign: "-", "" or NaN outside that context).
+    """
+    unit = pd.Series("number", index=raw.index, dtype=object)
+    plain = raw["value2"].isna()
+
+    after = _extract(raw.loc[plain, "after"], _UNIT_AFTER)
+    # "the team's 217 goals": only windows naming a team need the regex
+    before = raw.loc[after.index, "before"]
+    named = [missing and ("team" in b or "opponent" in b)
+             for missing, b in zip(after["scope"].isna().tolist(), before.tolist())]
+    scope = after["scope"].fillna(_extract(before[named], _SCOPE_BEFORE)["scope"])
+    canon = (scope + "_").fillna("") + after["unit"].map(UNIT_ALIASES)
+    unit[after.index] = canon.where(after["rate"].isna(), canon + "_per_game")
+
+    rest = plain & unit.eq("number")
+    before = _extract(raw.loc[rest, "before"], _UNIT_BEFORE)["unit"]
+    unit[before.index] = before.map(UNIT_ALIASES)
+
+    rest = plain & unit.eq("number")
+    percent = _extract(raw.loc[rest, "after"], _PERCENT_AFTER)
+    unit[percent.index] = "percent"
+
+    gd = pd.Series(np.nan, index=raw.index, dtype=object)
+    near = ["goal differential" in b for b in raw["before"].tolist()]
+    sign = _extract(raw.loc[near, "before"], _GOAL_DIFF_BEFORE)["sign"]
+    gd[sign.index] = sign
+    unit[gd.notna() & plain] = "goal_diff"
+
+    unit[~plain] = "record"
+    return unit, gd
+
+
+def extract_claims(texts, response_ids) -> pd.DataFrame:
+    """
+    Every (number, unit, context window) claim in the responses, one row
+    per claim, indexed by (unit, response_id) for the ground-truth joins.
+
+    This classifies every number, not just the first record and goal
+    differential, so it costs about 3x the per-response flag_response scan
+    (~1.0s vs ~0.3s for 20k responses / 250k claims). Compute it once per
+    dataset and share it between stages, as run_analysis does.
+    """
+    norm = normalize(pd.Series(list(texts)))
+    raw = _scan(norm, list(response_ids))
+    if raw.empty:
+        return pd.DataFrame(columns=CLAIM_COLUMNS).set_index(["unit", "response_id"], drop=False)
+
+    raw["unit"], raw["gd_sign"] = classify_units(raw)
+    # a score right after "goal differential" also states the differential
+    # ("goal differential of -3 -12"), so it is indexed under both units
+    also = raw[raw["gd_sign"].notna() & raw["unit"].eq("record")].assign(unit="goal_diff", value2=np.nan)
+    raw = pd.concat([raw, also], ignore_index=True)
+    # differentials are whole numbers; like flag_response, read the integer part
+    gd = raw["unit"].eq("goal_diff")
+    raw.loc[gd, "value"] = np.trunc(raw.loc[gd, "value"])
+    raw.loc[gd, "decimals"] = 0
+    negative = gd & raw["gd_sign"].eq("-")
+    raw.loc[negative, "value"] = -raw.loc[negative, "value"]
+    raw["context"] = raw["before"] + "[" + raw["token"] + "]" + raw["after"]
+    claims = raw[CLAIM_COLUMNS].sort_values(["unit", "response_id", "claim_idx"])
+    return claims.set_index(["unit", "response_id"], drop=False)
+
+
+# -------------------------------------------------------------------
+# Ground-truth checks
+# -------------------------------------------------------------------
+CHECK_COLUMNS = ["flag", "hypotheses", "unit", "value", "value2", "first_only"]
+
+
+def check_claims(claims: pd.DataFrame, responses: pd.DataFrame, checks) -> pd.DataFrame:
+    """
+    Join claims against a table of expected values and return one boolean
+    column per flag, aligned with `responses` (needs response_id and
+    hypothesis_id).
+
+    Each check row is (flag, hypotheses, unit, value, value2, first_only):
+    hypotheses=None applies to every response; first_only checks only the
+    first claim of that unit in a response. A claim is wrong when it
+    differs from the expected value by more than half a unit in the last
+    digit it reports, so "4.1 shots per game" matches 77 / 19 = 4.05.
+    """
+    checks = pd.DataFrame(checks, columns=CHECK_COLUMNS)
+    flags = pd.DataFrame(False, index=responses.index, columns=list(dict.fromkeys(checks["flag"])))
+    if claims.empty:
+        return flags
+
+    checks = checks.explode("hypotheses")
+    c = claims.reset_index(drop=True).merge(
+        responses[["response_id", "hypothesis_id"]].drop_duplicates("response_id"), on="response_id"
+    )
+    first = c.groupby(["response_id", "unit"])["claim_idx"].transform("min").eq(c["claim_idx"])
+
+    joined = c.assign(is_first=first).merge(checks, on="unit", suffixes=("", "_expected"))
+    applies = joined["hypotheses"].isna() | joined["hypotheses"].eq(joined["hypothesis_id"])
+    applies &= ~joined["first_only"].astype(bool) | joined["is_first"]
+    joined = joined[applies]
+
+    tol = 0.5 * 10.0 ** (-joined["decimals"]) + 1e-9
+    wrong = (joined["value"] - joined["value_expected"]).abs() > tol
+    wrong |= joined["value2_expected"].notna() & joined["value2"].ne(joined["value2_expected"])
+
+    hits = joined.loc[wrong, ["response_id", "flag"]]
+    for flag, ids in hits.groupby("flag")["response_id"]:
+        flags[flag] = responses["response_id"].isin(ids)
+    return flags
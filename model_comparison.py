@@ -0,0 +1,357 @@
+# model_comparison.py — Condition × model effects on sentiment and fabrication flags
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import lsqr, splu
+from scipy.special import expit
+from scipy.stats import f as f_dist
+from scipy.stats import norm, t as t_dist
+
+from analysis_spec import default_spec
+from partitioned_dataset import load_responses
+from sentiment_scorers import get_scorer
+from validate_claims import validation_flags
+
+# Contrasts reported per model: name -> (condition_a, condition_b), effect = a − b
+CONTRASTS = {
+    "framing": ("H1_pos", "H1_neg"),
+    "identity": ("H2_named", "H2_anon"),
+    "confirmation": ("H3_neutral", "H3_underperf"),
+}
+
+# Inputs, outputs and the sentiment scorer come from the analysis spec
+# (analysis_spec.toml or $ANALYSIS_SPEC), like the other analysis scripts
+SPEC = default_spec()
+RESULTS_DIR = SPEC.results_dir
+SENTIMENT_SCORER = SPEC.scorer
+
+ANALYSIS_DIR = SPEC.analysis_dir
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+
+# Ridge on fixed cell log-odds (a N(0, 10) prior) so all-0 / all-1 cells stay finite
+FIXED_RIDGE = 0.1
+
+
+# ---------- sufficient statistics ----------
+
+def sufficient_stats(df: pd.DataFrame, value: str, keys=("condition_id", "model_name", "run")) -> pd.DataFrame:
+    """Per-group n, sum and sum of squares of `value` — all the models below need."""
+    keys = list(keys)
+    tmp = df[keys + [value]].dropna(subset=[value]).assign(_sq=lambda d: d[value] ** 2)
+    return (
+        tmp.groupby(keys, observed=True)
+        .agg(n=(value, "count"), total=(value, "sum"), sumsq=("_sq", "sum"))
+        .reset_index()
+    )
+
+
+def _collapse(stats, keys):
+    return stats.groupby(list(keys), observed=True)[["n", "total", "sumsq"]].sum().reset_index()
+
+
+def _within_ss(stats):
+    return float((stats["sumsq"] - stats["total"] ** 2 / stats["n"]).sum())
+
+
+def _onehot(codes, k):
+    rows = np.arange(len(codes))
+    return sparse.csr_matrix((np.ones(len(codes)), (rows, codes)), shape=(len(codes), k))
+
+
+# ---------- two-way ANOVA with run as a random effect ----------
+
+def two_way_anova(stats: pd.DataFrame):
+    """
+    Type II two-way ANOVA (condition × model) from (condition, model, run)
+    sufficient statistics, plus a method-of-moments variance component for
+    run. The additive model is fitted by weighted least squares on cell
+    means with a sparse design, so cost grows with the number of cells,
+    not responses.
+
+    Returns (anova DataFrame, dict of variance components).
+    """
+    cells = _collapse(stats, ["condition_id", "model_name"])
+    N = cells["n"].sum()
+    n_cells = len(cells)
+    ybar = cells["total"] / cells["n"]
+
+    c_codes, conds = pd.factorize(cells["condition_id"])
+    m_codes, models = pd.factorize(cells["model_name"])
+    C, M = len(conds), len(models)
+
+    sse_full = _within_ss(cells)
+    sse_cond = _within_ss(_collapse(cells, ["condition_id"]))
+    sse_model = _within_ss(_collapse(cells, ["model_name"]))
+
+    # additive model: intercept + condition + model dummies (first level dropped)
+    X = sparse.hstack([
+        sparse.csr_matrix(np.ones((n_cells, 1))),
+        _onehot(c_codes, C)[:, 1:],
+        _onehot(m_codes, M)[:, 1:],
+    ]).tocsr()
+    sw = np.sqrt(cells["n"].to_numpy(dtype=float))
+    beta = lsqr(X.multiply(sw[:, None]).tocsr(), ybar.to_numpy() * sw, atol=1e-12, btol=1e-12)[0]
+    fitted = X @ beta
+    sse_add = sse_full + float((cells["n"] * (ybar - fitted) ** 2).sum())
+
+    df_resid = N - n_cells
+    ms_resid = sse_full / df_resid if df_resid > 0 else np.nan
+    terms = [
+        ("condition_id", sse_model - sse_add, C - 1),
+        ("model_name", sse_cond - sse_add, M - 1),
+        ("condition_id:model_name", sse_add - sse_full, n_cells - C - M + 1),
+    ]
+
+    rows = []
+    for term, ss, dof in terms:
+        F = (ss / dof) / ms_resid if dof > 0 and ms_resid > 0 else np.nan
+        rows.append({
+            "term": term,
+            "sum_sq": ss,
+            "df": dof,
+            "F": F,
+            "p_value": f_dist.sf(F, dof, df_resid) if np.isfinite(F) else np.nan,
+            "eta_sq_partial": ss / (ss + sse_full) if (ss + sse_full) > 0 else np.nan,
+        })
+    rows.append({"term": "Residual", "sum_sq": sse_full, "df": df_resid, "F": np.nan,
+                 "p_value": np.nan, "eta_sq_partial": np.nan})
+
+    var = _run_variance(stats, cells, sse_full, df_resid)
+    return pd.DataFrame(rows), var
+
+
+def _run_variance(stats, cells, sse_full, df_resid):
+    """
+    ANOVA (moment) estimator of the run random-intercept variance from
+    residuals around the (condition, model) cell means, plus BLUPs per run.
+    """
+    means = cells.assign(cell_mean=cells["total"] / cells["n"])[["condition_id", "model_name", "cell_mean"]]
+    s = stats.merge(means, on=["condition_id", "model_name"])
+    s["resid_sum"] = s["total"] - s["n"] * s["cell_mean"]
+
+    by_run = s.groupby("run")[["n", "resid_sum"]].sum()
+    K = len(by_run)
+    N = by_run["n"].sum()
+    ss_between = float((by_run["resid_sum"] ** 2 / by_run["n"]).sum())
+
+    sigma2_e = sse_full / df_resid if df_resid > 0 else np.nan
+    sigma2_run = 0.0
+    if K > 1 and df_resid - (K - 1) > 0:
+        ms_between = ss_between / (K - 1)
+        ms_within = (sse_full - ss_between) / (df_resid - (K - 1))
+        n0 = (N - (by_run["n"] ** 2).sum() / N) / (K - 1)
+        sigma2_run = max(0.0, (ms_between - ms_within) / n0)
+        sigma2_e = ms_within
+
+    r_k = by_run["resid_sum"] / by_run["n"]
+    shrink = sigma2_run / (sigma2_run + sigma2_e / by_run["n"]) if sigma2_run > 0 else 0.0
+    blup = (shrink * r_k).rename("run_effect")
+
+    return {
+        "sigma2_run": sigma2_run,
+        "sigma2_resid": sigma2_e,
+        "icc_run": sigma2_run / (sigma2_run + sigma2_e) if sigma2_e > 0 else np.nan,
+        "df_resid": df_resid,
+        "run_effects": blup,
+    }
+
+
+def sentiment_contrasts(stats: pd.DataFrame, var: dict, contrasts=CONTRASTS) -> pd.DataFrame:
+    """
+    Per-model contrasts on run-adjusted cell means, vectorized across models.
+    Standard errors use the pooled ANOVA residual variance; Cohen's d uses
+    the pooled SD of the two cells, as in statistical_tests.cohen_d.
+    """
+    adj = stats.merge(var["run_effects"], left_on="run", right_index=True, how="left").fillna({"run_effect": 0.0})
+    adj["adj_total"] = adj["total"] - adj["n"] * adj["run_effect"]
+    cells = adj.groupby(["model_name", "condition_id"], observed=True)[["n", "total", "sumsq", "adj_total"]].sum()
+
+    n = cells["n"].unstack()
+    mean = (cells["adj_total"] / cells["n"]).unstack()
+    ss = (cells["sumsq"] - cells["total"] ** 2 / cells["n"]).unstack()
+
+    out = pd.DataFrame(index=n.index)
+    for name, (a, b) in contrasts.items():
+        if a not in n.columns or b not in n.columns:
+            continue
+        na, nb = n[a], n[b]
+        gap = mean[a] - mean[b]
+        se = np.sqrt(var["sigma2_resid"] * (1 / na + 1 / nb))
+        t = gap / se
+        # like statistical_tests.cohen_d: no effect size without two responses
+        # per cell (including a model that lacks one of the two conditions)
+        enough = (na >= 2) & (nb >= 2)
+        pooled_sd = np.sqrt((ss[a] + ss[b]) / (na + nb - 2).where(enough))
+        out[f"{name}_n_a"] = na
+        out[f"{name}_n_b"] = nb
+        out[f"{name}_gap"] = gap
+        out[f"{name}_se"] = se
+        out[f"{name}_t"] = t
+        out[f"{name}_p"] = 2 * t_dist.sf(np.abs(t), var["df_resid"])
+        out[f"{name}_cohen_d"] = (gap / pooled_sd).where(pooled_sd > 0, 0.0).where(enough)
+    return out
+
+
+# ---------- logistic model with run random intercept ----------
+
+def logistic_run_effects(binom: pd.DataFrame, max_iter=50, outer_iter=10, tol=1e-8):
+    """
+    Logistic model for flag counts with one fixed log-odds per
+    (condition, model) cell and a random intercept per run, fitted by
+    penalized IRLS on aggregated binomial counts with a sparse design
+    (penalized quasi-likelihood; run variance re-estimated between passes).
+
+    `binom` has condition_id, model_name, run, k (flags), n (responses).
+    Returns (cells DataFrame with log_odds, LU factor of the Hessian, sigma2_run).
+    """
+    cell_codes = binom.groupby(["condition_id", "model_name"], sort=False).ngroup().to_numpy()
+    cells = binom[["condition_id", "model_name"]].drop_duplicates().itertuples(index=False, name=None)
+    cells = list(cells)
+    run_codes, runs = pd.factorize(binom["run"])
+    P, K = len(cells), len(runs)
+
+    X = sparse.hstack([_onehot(cell_codes, P), _onehot(run_codes, K)]).tocsc()
+    Xt = X.T.tocsc()
+    k = binom["k"].to_numpy(dtype=float)
+    n = binom["n"].to_numpy(dtype=float)
+
+    beta = np.zeros(P + K)
+    p_emp = (k + 0.5) / (n + 1.0)
+    beta[:P] = np.bincount(cell_codes, weights=np.log(p_emp / (1 - p_emp)) * n, minlength=P) / \
+        np.bincount(cell_codes, weights=n, minlength=P)
+    sigma2_run = 1.0
+    lu = None
+
+    for _ in range(outer_iter):
+        prior = np.r_[np.full(P, FIXED_RIDGE), np.full(K, 1.0 / max(sigma2_run, 1e-6))]
+        for _ in range(max_iter):
+            eta = X @ beta
+            p = expit(eta)
+            w = np.maximum(n * p * (1 - p), 1e-9)
+            z = eta + (k - n * p) / w
+            H = (Xt @ sparse.diags(w) @ X + sparse.diags(prior)).tocsc()
+            lu = splu(H)
+            rhs = Xt @ (w * z)
+            new = lu.solve(rhs)
+            done = np.max(np.abs(new - beta)) < tol
+            beta = new
+            if done:
+                break
+
+        if K < 2:
+            sigma2_run = 0.0
+            break
+        u = beta[P:]
+        trace_uu = 0.0
+        for j in range(K):
+            e = np.zeros(P + K)
+            e[P + j] = 1.0
+            trace_uu += lu.solve(e)[P + j]
+        new_sigma2 = (u @ u + trace_uu) / K
+        if abs(new_sigma2 - sigma2_run) < 1e-6:
+            sigma2_run = new_sigma2
+            break
+        sigma2_run = new_sigma2
+
+    out = pd.DataFrame(list(cells), columns=["condition_id", "model_name"])
+    out["log_odds"] = beta[:P]
+    out["n"] = np.bincount(cell_codes, weights=n, minlength=P)
+    out["k"] = np.bincount(cell_codes, weights=k, minlength=P)
+    return out, lu, sigma2_run
+
+
+def fabrication_contrasts(fit, lu, contrasts=CONTRASTS) -> pd.DataFrame:
+    """Per-model log-odds ratios (a vs b) with Wald SEs from the penalized Hessian."""
+    index = {(c, m): i for i, (c, m) in enumerate(zip(fit["condition_id"], fit["model_name"]))}
+    dim = lu.shape[0]
+    models = sorted(fit["model_name"].unique())
+    out = pd.DataFrame(index=pd.Index(models, name="model_name"))
+
+    for name, (a, b) in contrasts.items():
+        lor, se = [], []
+        for m in models:
+            ia, ib = index.get((a, m)), index.get((b, m))
+            if ia is None or ib is None:
+                lor.append(np.nan)
+                se.append(np.nan)
+                continue
+            e = np.zeros(dim)
+            e[ia], e[ib] = 1.0, -1.0
+            lor.append(fit["log_odds"].iat[ia] - fit["log_odds"].iat[ib])
+            se.append(np.sqrt(e @ lu.solve(e)))
+        lor, se = np.asarray(lor), np.asarray(se)
+        out[f"{name}_fab_log_or"] = lor
+        out[f"{name}_fab_se"] = se
+        out[f"{name}_fab_p"] = 2 * norm.sf(np.abs(lor / se))
+    return out
+
+
+# ---------- driver ----------
+
+def compare_models(df: pd.DataFrame, contrasts=CONTRASTS):
+    """
+    df needs condition_id, model_name, run, compound and any_flag.
+    Returns (anova table, per-model effects table).
+    """
+    stats = sufficient_stats(df, "compound")
+    anova, var = two_way_anova(stats)
+    anova["outcome"] = "compound"
+    variance_rows = pd.DataFrame([
+        {"term": "run (random)", "outcome": "compound", "variance": var["sigma2_run"]},
+        {"term": "residual", "outcome": "compound", "variance": var["sigma2_resid"]},
+    ])
+
+    binom = (
+        df.groupby(["condition_id", "model_name", "run"], observed=True)["any_flag"]
+        .agg(k="sum", n="count")
+        .reset_index()
+    )
+    fit, lu, sigma2_fab = logistic_run_effects(binom)
+    variance_rows = pd.concat([variance_rows, pd.DataFrame([
+        {"term": "run (random)", "outcome": "any_flag (logit)", "variance": sigma2_fab},
+    ])], ignore_index=True)
+
+    effects = sentiment_contrasts(stats, var, contrasts).join(
+        fabrication_contrasts(fit, lu, contrasts), how="outer"
+    )
+    rates = binom.groupby("model_name")[["k", "n"]].sum()
+    effects.insert(0, "fabrication_rate", rates["k"] / rates["n"])
+    effects.insert(0, "responses", rates["n"])
+
+    anova = pd.concat([anova, variance_rows], ignore_index=True)
+    return anova, effects.reset_index()
+
+
+def score_responses(df, spec=None):
+    """
+    Add `compound` (the spec's [sentiment] scorer) and `any_flag`, which
+    is set exactly when validate_claims flags the response against the
+    spec's ground truth and phrases (as in validation_flags.csv).
+    """
+    scorer = get_scorer(SENTIMENT_SCORER if spec is None else spec.scorer)
+    df = df.reset_index(drop=True)
+    df["compound"] = scorer.score_batch(df["response_text"].astype(str))["compound"].values
+    df["any_flag"] = validation_flags(df, spec).any(axis=1).astype(int).values
+    return df
+
+
+def main():
+    df = load_responses(RESULTS_DIR)
+
+    print(f"Scoring sentiment ({SENTIMENT_SCORER}) and validation flags...")
+    df = score_responses(df)
+
+    print("Fitting condition × model effects...")
+    anova, effects = compare_models(df)
+
+    anova_path = ANALYSIS_DIR / "model_anova.csv"
+    effects_path = ANALYSIS_DIR / "model_effects.csv"
+    anova.to_csv(anova_path, index=False)
+    effects.to_csv(effects_path, index=False)
+    print(f"Saved ANOVA + variance components to {anova_path}")
+    print(f"Saved per-model bias effect sizes to {effects_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+# monitor_bias.py — Online bias-drift monitor over an append-only responses JSONL stream
+
+import argparse
+import json
+import math
+import statistics
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from analyze_bias import classify_recommendation
+from validate_claims import flag_record
+
+# -------------------------------------------------------------------
+# Paths
+# -------------------------------------------------------------------
+STREAM_PATH = Path("results") / "responses_stream.jsonl"
+ANALYSIS_DIR = Path("analysis")
+ANALYSIS_DIR.mkdir(exist_ok=True)
+
+METRICS_PATH = ANALYSIS_DIR / "monitor_metrics.jsonl"
+ALERTS_PATH = ANALYSIS_DIR / "monitor_alerts.jsonl"
+
+# -------------------------------------------------------------------
+# Monitor settings
+# -------------------------------------------------------------------
+POLL_INTERVAL = 0.1      # seconds between checks of the stream file
+WINDOW_SIZE = 50         # sliding window per (model, condition)
+EWMA_ALPHA = 0.1         # weight of the newest record in decayed stats
+WARMUP = 10              # records per cell before a baseline is frozen
+
+# Two-sided CUSUM on per-record framing residuals (in baseline SD units).
+# With GAP_WARMUP records per arm, K = 0.5 and H = 9, a stream with no
+# drift raises a false alarm in about 5% of 400-record streams (simulated,
+# see tests/test_monitor_bias.py); a 1 SD shift is caught within ~20 records.
+GAP_WARMUP = 50
+GAP_CUSUM_K = 0.5
+GAP_CUSUM_H = 9.0
+GAP_FALSE_ALARM_RATE = 0.05   # per GAP_NOMINAL_RECORDS-record stream
+GAP_NOMINAL_RECORDS = 400
+
+# Bernoulli CUSUM (sequential likelihood ratio) on the fabrication rate
+FAB_SHIFT = 0.2          # absolute shift in flag rate we want to detect
+FAB_ALPHA = 0.01
+FAB_BETA = 0.1
+FAB_H = math.log((1 - FAB_BETA) / FAB_ALPHA)
+
+FRAMING_PAIR = ("H1_pos", "H1_neg")
+FLAG_COLS = ["wrong_record", "wrong_goal_diff", "wrong_player_stat", "claims_dominant", "claims_disastrous"]
+
+
+# -------------------------------------------------------------------
+# Per-cell running statistics
+# -------------------------------------------------------------------
+class CellStats:
+    """
+    Sliding-window and exponentially decayed statistics for one
+    (model, condition) cell:
+      - compound sentiment
+      - any fabrication flag (0/1)
+      - recommendation keyword rates
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.compound = deque(maxlen=WINDOW_SIZE)
+        self.any_flag = deque(maxlen=WINDOW_SIZE)
+        self.ewma_compound = None
+        self.ewvar_compound = 0.0
+        self.ewma_flag = None
+        self.ewma_keywords = {}
+
+        # fabrication-rate sequential test
+        self.fab_p0 = None
+        self.fab_up = 0.0
+        self.fab_down = 0.0
+
+    def update(self, compound, any_flag, keywords):
+        self.n += 1
+        self.compound.append(compound)
+        self.any_flag.append(any_flag)
+
+        if self.ewma_compound is None:
+            self.ewma_compound = compound
+            self.ewma_flag = float(any_flag)
+            self.ewma_keywords = {k: float(v) for k, v in keywords.items()}
+            return
+
+        diff = compound - self.ewma_compound
+        incr = EWMA_ALPHA * diff
+        self.ewma_compound += incr
+        self.ewvar_compound = (1 - EWMA_ALPHA) * (self.ewvar_compound + diff * incr)
+        self.ewma_flag += EWMA_ALPHA * (any_flag - self.ewma_flag)
+        for k, v in keywords.items():
+            prev = self.ewma_keywords.get(k, float(v))
+            self.ewma_keywords[k] = prev + EWMA_ALPHA * (v - prev)
+
+    def window_mean(self):
+        return sum(self.compound) / len(self.compound) if self.compound else math.nan
+
+    def window_var(self):
+        n = len(self.compound)
+        if n < 2:
+            return math.nan
+        m = self.window_mean()
+        return sum((x - m) ** 2 for x in self.compound) / (n - 1)
+
+    def window_flag_rate(self):
+        return sum(self.any_flag) / len(self.any_flag) if self.any_flag else math.nan
+
+    def snapshot(self):
+        return {
+            "n": self.n,
+            "window_n": len(self.compound),
+            "window_compound": self.window_mean(),
+            "ewma_compound": self.ewma_compound,
+            "ewsd_compound": math.sqrt(self.ewvar_compound),
+            "window_flag_rate": self.window_flag_rate(),
+            "ewma_flag_rate": self.ewma_flag,
+            "ewma_keywords": self.ewma_keywords,
+        }
+
+
+class GapTest:
+    """
+    Two-sided CUSUM on a model's framing gap (H1_pos − H1_neg).
+
+    The baseline mean and SD of each arm are estimated from all of its
+    warm-up records (until both arms have GAP_WARMUP). After that every
+    record adds one standardized residual, sign-flipped for H1_neg so a
+    wider gap is positive. Without drift these increments are independent
+    and close to N(0, 1), which is what K and H are calibrated for.
+    """
+
+    def __init__(self):
+        self.warmup = ([], [])
+        self.mean = None
+        self.sd = None
+        self.up = 0.0
+        self.down = 0.0
+
+    @property
+    def baseline(self):
+        return None if self.mean is None else self.mean[0] - self.mean[1]
+
+    def update(self, arm, compound, current_gap=None):
+        """arm: 0 for FRAMING_PAIR[0] (H1_pos), 1 for FRAMING_PAIR[1] (H1_neg)."""
+        if self.mean is None:
+            self.warmup[arm].append(compound)
+            if min(len(w) for w in self.warmup) < GAP_WARMUP:
+                return None
+            self.mean = [statistics.fmean(w) for w in self.warmup]
+            self.sd = [max(statistics.stdev(w), 1e-6) for w in self.warmup]
+            return None
+
+        z = (compound - self.mean[arm]) / self.sd[arm]
+        if arm == 1:
+            z = -z
+        self.up = max(0.0, self.up + z - GAP_CUSUM_K)
+        self.down = max(0.0, self.down - z - GAP_CUSUM_K)
+
+        if self.up > GAP_CUSUM_H or self.down > GAP_CUSUM_H:
+            direction = "widened" if self.up > GAP_CUSUM_H else "narrowed"
+            alert = {
+                "baseline_gap": self.baseline,
+                "current_gap": current_gap,
+                "z": z,
+                "direction": direction,
+            }
+            self.up = self.down = 0.0
+            return alert
+        return None
+
+
+def fabrication_test(cell, any_flag):
+    """
+    Bernoulli CUSUM for a shift of ±FAB_SHIFT away from the cell's
+    warm-up fabrication rate. Returns an alert dict or None.
+    """
+    if cell.n < WARMUP:
+        return None
+    if cell.fab_p0 is None:
+        cell.fab_p0 = min(max(cell.window_flag_rate(), 0.01), 0.99)
+        return None
+
+    p0 = cell.fab_p0
+    alert = None
+    for side, p1 in (("up", min(p0 + FAB_SHIFT, 0.99)), ("down", max(p0 - FAB_SHIFT, 0.01))):
+        if p1 == p0:
+            continue
+        llr = math.log(p1 / p0) if any_flag else math.log((1 - p1) / (1 - p0))
+        stat = max(0.0, getattr(cell, f"fab_{side}") + llr)
+        if stat > FAB_H:
+            alert = {
+                "baseline_rate": p0,
+                "window_rate": cell.window_flag_rate(),
+                "direction": "increased" if side == "up" else "decreased",
+            }
+            stat = 0.0
+        setattr(cell, f"fab_{side}", stat)
+    return alert
+
+
+# -------------------------------------------------------------------
+# Monitor
+# -------------------------------------------------------------------
+class BiasMonitor:
+    """
+    Runs the existing sentiment, keyword and validation logic on each
+    incoming record and keeps per-(model, condition) statistics.
+    """
+
+    def __init__(self, metrics_path=METRICS_PATH, alerts_path=ALERTS_PATH):
+        self.sid = SentimentIntensityAnalyzer()
+        self.cells = defaultdict(CellStats)
+        self.gap_tests = defaultdict(GapTest)
+        self.metrics_path = Path(metrics_path)
+        self.alerts_path = Path(alerts_path)
+
+    def process(self, record, landed_at=None):
+        text = str(record.get("response_text", ""))
+        model = record.get("model_name", "unknown")
+        cond = record.get("condition_id", "unknown")
+
+        compound = self.sid.polarity_scores(text)["compound"]
+        keywords = classify_recommendation(text)
+        hypothesis = record.get("hypothesis_id") or str(cond)[:2]
+        flags = flag_record(text, hypothesis)
+        any_flag = int(any(flags.get(c, False) for c in FLAG_COLS))
+
+        cell = self.cells[(model, cond)]
+        cell.update(compound, any_flag, keywords)
+
+        alerts = []
+        fab_alert = fabrication_test(cell, any_flag)
+        if fab_alert:
+            alerts.append({"type": "fabrication_rate", "model_name": model, "condition_id": cond, **fab_alert})
+
+        gap = None
+        if cond in FRAMING_PAIR:
+            pos = self.cells[(model, FRAMING_PAIR[0])]
+            neg = self.cells[(model, FRAMING_PAIR[1])]
+            if pos.n and neg.n:
+                gap = pos.window_mean() - neg.window_mean()
+            gap_alert = self.gap_tests[model].update(FRAMING_PAIR.index(cond), compound, gap)
+            if gap_alert:
+                alerts.append({"type": "framing_gap", "model_name": model, **gap_alert})
+
+        now = time.time()
+        metric = {
+            "processed_at": now,
+            "latency_s": now - landed_at if landed_at else None,
+            "response_id": record.get("response_id"),
+            "model_name": model,
+            "condition_id": cond,
+            "compound": compound,
+            "any_flag": any_flag,
+            "framing_gap": gap,
+            "cell": cell.snapshot(),
+        }
+        self._emit(self.metrics_path, metric)
+        for a in alerts:
+            a["detected_at"] = now
+            a["response_id"] = record.get("response_id")
+            self._emit(self.alerts_path, a)
+            print(f"⚠️  ALERT {a['type']}: {json.dumps(a)}")
+
+        return metric, alerts
+
+    @staticmethod
+    def _emit(path, obj):
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+
+
+def tail_jsonl(path, poll_interval=POLL_INTERVAL, follow=True):
+    """
+    Yield (record, landed_at) for each complete line appended to `path`.
+    Partial trailing lines are buffered until their newline arrives;
+    a truncated file is re-read from the start.
+    """
+    path = Path(path)
+    offset = 0
+    buffer = b""
+
+    while True:
+        size = path.stat().st_size if path.exists() else 0
+        if size < offset:
+            offset, buffer = 0, b""
+
+        if size > offset:
+            landed_at = path.stat().st_mtime
+            with path.open("rb") as f:
+                f.seek(offset)
+                chunk = f.read(size - offset)
+            offset = size
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line), landed_at
+                except json.JSONDecodeError:
+                    print(f"Skipping malformed line: {line[:80]!r}")
+        elif not follow:
+            return
+        else:
+            time.sleep(poll_interval)
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Monitor a responses JSONL stream for bias drift.")
+    parser.add_argument("stream", nargs="?", default=STREAM_PATH, type=Path)
+    parser.add_argument("--once", action="store_true", help="process what is there and exit")
+    args = parser.parse_args()
+
+    monitor = BiasMonitor()
+    print(f"Monitoring {args.stream} (metrics → {METRICS_PATH}, alerts → {ALERTS_PATH})")
+
+    try:
+        for record, landed_at in tail_jsonl(args.stream, follow=not args.once):
+            monitor.process(record, landed_at)
+    except KeyboardInterrupt:
+        pass
+
+    print(f"Processed {sum(c.n for c in monitor.cells.values())} records.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# partitioned_dataset.py — run=/model=/condition= partitioned layout for response files
+
+import json
+import re
+import shutil
+from collections import defaultdict
+from pathlib import Path
+
+from analysis_spec import default_spec
+from reproducibility import canonical_order
+from response_schema import finish_ingest, ingest_file
+
+RESULTS_DIR = default_spec().results_dir
+
+PARTITION_DIRNAME = "partitioned"
+MANIFEST_NAME = "manifest.json"
+INGEST_CACHE_DIRNAME = ".ingest_cache"
+SOURCE_PATTERN = "Run*_*_responses.json"
+
+RUN_FILE_RE = re.compile(r"Run(\d+)_([A-Za-z0-9]+)_responses\.json$")
+
+
+# -------------------------------------------------------------------
+# Filename metadata
+# -------------------------------------------------------------------
+def parse_run_file(path):
+    """Return (run, model) from a name like Run2_gemini_responses.json, or None."""
+    m = RUN_FILE_RE.search(Path(path).name)
+    if not m:
+        return None
+    return int(m.group(1)), m.group(2).lower()
+
+
+def _as_set(values):
+    if values is None:
+        return None
+    if isinstance(values, (str, int)):
+        values = [values]
+    return {str(v) for v in values}
+
+
+def _model_keys(models):
+    """
+    Model filter values as canonical model keys. The key is the lowercased
+    model from the source filename on both load paths; partitions are laid
+    out by it too, so a model= filter selects the same rows either way.
+    """
+    models = _as_set(models)
+    return None if models is None else {m.lower() for m in models}
+
+
+def _keep(value, allowed):
+    return allowed is None or str(value) in allowed
+
+
+def source_files(results_dir=RESULTS_DIR, runs=None, models=None):
+    """
+    Response files under `results_dir`, pruned by the run/model encoded
+    in each filename. Sorted so row order is stable between runs.
+    """
+    runs, models = _as_set(runs), _model_keys(models)
+    files = []
+    for f in sorted(Path(results_dir).glob(SOURCE_PATTERN)):
+        meta = parse_run_file(f)
+        if meta is None:
+            continue
+        run, model = meta
+        if _keep(run, runs) and _keep(model, models):
+            files.append((f, run, model))
+    return files
+
+
+# -------------------------------------------------------------------
+# Write partitions + manifest
+# -------------------------------------------------------------------
+def write_partitions(results_dir=RESULTS_DIR, out_dir=None):
+    """
+    Re-lay the Run*_*_responses.json files out as
+
+        <results_dir>/partitioned/run=<n>/model=<name>/condition=<id>/part-0000.jsonl
+
+    and write manifest.json with per-partition row counts and
+    min/max timestamps. Returns the manifest dict.
+    """
+    results_dir = Path(results_dir)
+    out_dir = Path(out_dir) if out_dir else results_dir / PARTITION_DIRNAME
+
+    files = source_files(results_dir)
+    if not files:
+        raise SystemExit(f"No JSON files found in {results_dir} (expected pattern: {SOURCE_PATTERN}).")
+
+    groups = defaultdict(list)
+    sources = []
+    for f, run, model in files:
+        with f.open("r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        for entry in data:
+            # partition by the file's model key, as source_files prunes raw files
+            groups[(run, model, str(entry.get("condition_id")))].append(entry)
+        sources.append({"file": f.name, "mtime": f.stat().st_mtime, "rows": len(data)})
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+
+    partitions = []
+    for (run, model, cond), entries in sorted(groups.items()):
+        part_dir = out_dir / f"run={run}" / f"model={model}" / f"condition={cond}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        part_path = part_dir / "part-0000.jsonl"
+        with part_path.open("w", encoding="utf-8") as fh:
+            for entry in entries:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        timestamps = [e["timestamp"] for e in entries if e.get("timestamp")]
+        partitions.append({
+            "path": part_path.relative_to(out_dir).as_posix(),
+            "run": run,
+            "model": model,
+            "condition": cond,
+            "rows": len(entries),
+            "min_timestamp": min(timestamps) if timestamps else None,
+            "max_timestamp": max(timestamps) if timestamps else None,
+        })
+
+    manifest = {"sources": sources, "partitions": partitions}
+    with (out_dir / MANIFEST_NAME).open("w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+
+    print(f"Wrote {len(partitions)} partitions ({sum(p['rows'] for p in partitions)} rows) to {out_dir}")
+    return manifest
+
+
+def load_manifest(results_dir=RESULTS_DIR):
+    """Return the manifest dict, or None if the dataset has not been partitioned."""
+    path = Path(results_dir) / PARTITION_DIRNAME / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with path.open("r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def manifest_is_current(manifest, results_dir=RESULTS_DIR):
+    """True if the manifest still describes every raw response file on disk."""
+    recorded = {s["file"]: s["mtime"] for s in manifest.get("sources", [])}
+    current = {f.name: f.stat().st_mtime for f, _, _ in source_files(results_dir)}
+    return recorded == current
+
+
+def select_partitions(manifest, runs=None, models=None, conditions=None):
+    """Manifest entries matching the filters (no data is read)."""
+    runs, models, conditions = _as_set(runs), _model_keys(models), _as_set(conditions)
+    return [
+        p for p in manifest["partitions"]
+        if _keep(p["run"], runs) and _keep(p["model"], models) and _keep(p["condition"], conditions)
+    ]
+
+
+# -------------------------------------------------------------------
+# Load with partition pruning
+# -------------------------------------------------------------------
+def load_responses(results_dir=RESULTS_DIR, runs=None, models=None, conditions=None):
+    """
+    Load responses into one DataFrame with a `run` column.
+
+    If <results_dir>/partitioned/manifest.json exists, only the partitions
+    matching runs / models / conditions are read. Otherwise the raw
+    Run*_*_responses.json files are pruned by filename (run, model) and
+    conditions are filtered after loading.
+
+    Records are decoded and validated by response_schema; invalid ones are
+    written to analysis/ingest_rejects.jsonl instead of being loaded.
+    Validated frames are cached under <results_dir>/.ingest_cache.
+    In reproducible mode rows come back in one canonical order, whichever
+    path was used.
+    """
+    results_dir = Path(results_dir)
+    cache_dir = results_dir / INGEST_CACHE_DIRNAME
+    manifest = load_manifest(results_dir)
+    if manifest is not None and not manifest_is_current(manifest, results_dir):
+        print("Partition manifest is out of date; reading raw files (re-run partitioned_dataset.py).")
+        manifest = None
+    frames, rejects = [], []
+
+    if manifest is not None:
+        part_root = results_dir / PARTITION_DIRNAME
+        selected = select_partitions(manifest, runs, models, conditions)
+        print(
+            f"Loading {len(selected)} of {len(manifest['partitions'])} partitions "
+            f"({sum(p['rows'] for p in selected)} rows)..."
+        )
+        for p in selected:
+            part, bad = ingest_file(part_root / p["path"], cache_dir)
+            frames.append(part.assign(run=p["run"]))
+            rejects += bad
+    else:
+        wanted = _as_set(conditions)
+        for f, run, _ in source_files(results_dir, runs, models):
+            print(f"Loading {f.name}...")
+            part, bad = ingest_file(f, cache_dir)
+            if wanted is not None and not part.empty:
+                part = part[part["condition_id"].astype(str).isin(wanted)]
+            frames.append(part.assign(run=run))
+            rejects += bad
+
+    df, rejects = finish_ingest(frames, rejects)
+    if df.empty:
+        raise SystemExit(
+            f"No responses found in {results_dir} for runs={runs}, models={models}, conditions={conditions}."
+        )
+
+    # per row: a file may omit the field for some records, and the typed
+    # decoder always creates the column
+    prefix = df["condition_id"].astype(str).str.slice(0, 2)
+    df["hypothesis_id"] = df["hypothesis_id"].fillna(prefix) if "hypothesis_id" in df.columns else prefix
+
+    return canonical_order(df)
+
+
+def main():
+    write_partitions(RESULTS_DIR)
+
+
+if __name__ == "__main__":
+    main()
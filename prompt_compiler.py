@@ -0,0 +1,233 @@
+# prompt_compiler.py — Cached prompt rendering, token counts and batch/cost manifest
+
+import hashlib
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from experiment_design import CONDITIONS, DATA_BLOCKS, PROMPTS_DIR, render_prompt
+
+CACHE_PATH = PROMPTS_DIR / "render_cache.json"
+MANIFEST_PATH = PROMPTS_DIR / "prompt_manifest.json"
+PROMPTS_JSON_PATH = PROMPTS_DIR / "prompts.json"
+
+REPETITIONS = 3          # runs per (condition × model), as in the README design
+PARALLEL_MIN_PROMPTS = 500
+
+# Per-provider request limits used for packing. Prices are left unset on
+# purpose: fill in usd_per_1k_input from the current provider price sheet
+# and the manifest will carry cost estimates.
+PROVIDER_LIMITS = {
+    "chatgpt": {"max_input_tokens": 128000, "batch_max_tokens": 200000, "batch_max_requests": 50,
+                "usd_per_1k_input": None},
+    "claude": {"max_input_tokens": 200000, "batch_max_tokens": 200000, "batch_max_requests": 50,
+               "usd_per_1k_input": None},
+    "gemini": {"max_input_tokens": 1000000, "batch_max_tokens": 200000, "batch_max_requests": 50,
+               "usd_per_1k_input": None},
+}
+
+
+# -------------------------------------------------------------------
+# Tokenizers (pluggable)
+# -------------------------------------------------------------------
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _whitespace_tokens(text):
+    return len(_WORD_RE.findall(text))
+
+
+def _char4_tokens(text):
+    return (len(text) + 3) // 4
+
+
+def _tiktoken_counter():
+    try:
+        import tiktoken
+    except ImportError:
+        raise SystemExit("tokenizer 'tiktoken' needs `pip install tiktoken`.")
+    enc = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(enc.encode(text))
+
+
+TOKENIZERS = {
+    "words": lambda: _whitespace_tokens,
+    "chars4": lambda: _char4_tokens,
+    "tiktoken": _tiktoken_counter,
+}
+
+
+def register_tokenizer(name, factory):
+    """Register a zero-argument factory returning a text -> token count function."""
+    TOKENIZERS[name] = factory
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(name="words"):
+    if name not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer '{name}'. Available: {sorted(TOKENIZERS)}")
+    return TOKENIZERS[name]()
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(tokenizer, text):
+    """Memoized count; shared prefixes such as the stat blocks are counted once."""
+    return get_token_counter(tokenizer)(text)
+
+
+def prompt_tokens(tokenizer, data_block, instruction):
+    """
+    Token count of a rendered prompt as stat-block prefix + instruction.
+    Exact for the word tokenizers (the parts are whitespace-separated); a
+    close estimate for BPE tokenizers, which may merge across the boundary.
+    """
+    return count_tokens(tokenizer, DATA_BLOCKS[data_block].strip()) + count_tokens(tokenizer, instruction.strip())
+
+
+# -------------------------------------------------------------------
+# Rendering with a factor-tuple cache
+# -------------------------------------------------------------------
+def factor_key(data_block, instruction):
+    """Stable hash of the factors that determine a prompt's text."""
+    payload = json.dumps([data_block, DATA_BLOCKS[data_block], instruction], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _render(args):
+    return render_prompt(*args)
+
+
+def load_cache(path=CACHE_PATH):
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def render_all(conditions=CONDITIONS, cache=None, workers=None):
+    """
+    Render every condition's prompt, serving cached texts by factor hash
+    and rendering misses in parallel (processes) when there are many.
+    Returns (list of dicts in condition order, cache hits).
+    """
+    cache = {} if cache is None else cache
+    keys = [factor_key(block, instr) for _, _, block, instr in conditions]
+    misses = [i for i, k in enumerate(keys) if k not in cache]
+
+    todo = [(conditions[i][2], conditions[i][3]) for i in misses]
+    if len(todo) >= PARALLEL_MIN_PROMPTS:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            texts = list(pool.map(_render, todo, chunksize=64))
+    else:
+        texts = [_render(t) for t in todo]
+    for i, text in zip(misses, texts):
+        cache[keys[i]] = text
+
+    rendered = []
+    for (h_id, c_id, block, instr), key in zip(conditions, keys):
+        rendered.append({
+            "hypothesis_id": h_id,
+            "condition_id": c_id,
+            "data_block": block,
+            "factor_key": key,
+            "prompt_text": cache[key],
+            "instruction": instr,
+        })
+    return rendered, len(keys) - len(misses)
+
+
+# -------------------------------------------------------------------
+# Batch packing + manifest
+# -------------------------------------------------------------------
+def pack_batches(requests, limits):
+    """
+    First-fit-decreasing packing of (prompt_id, tokens) requests into
+    batches under the provider's token and request-count limits.
+    Requests larger than max_input_tokens are returned separately.
+    """
+    fits = [r for r in requests if r[1] <= limits["max_input_tokens"]]
+    oversize = [r for r in requests if r[1] > limits["max_input_tokens"]]
+
+    batches = []
+    for prompt_id, tokens in sorted(fits, key=lambda r: -r[1]):
+        for b in batches:
+            if b["input_tokens"] + tokens <= limits["batch_max_tokens"] and \
+                    len(b["prompt_ids"]) < limits["batch_max_requests"]:
+                break
+        else:
+            b = {"prompt_ids": [], "input_tokens": 0}
+            batches.append(b)
+        b["prompt_ids"].append(prompt_id)
+        b["input_tokens"] += tokens
+
+    price = limits.get("usd_per_1k_input")
+    for i, b in enumerate(batches):
+        b["batch_id"] = i
+        b["requests"] = len(b["prompt_ids"])
+        b["est_cost_usd"] = round(b["input_tokens"] / 1000 * price, 6) if price is not None else None
+    return batches, oversize
+
+
+def build_manifest(tokenizer="words", repetitions=REPETITIONS, models=None, workers=None):
+    """
+    Render prompts (cached), count tokens and pack each model's
+    prompt × repetition requests into batches. Prompt ids are taken from
+    prompts.json (matched by condition), so batches name the same prompts
+    run_experiment.py logs responses for.
+    """
+    cache = load_cache()
+    rendered, hits = render_all(CONDITIONS, cache, workers)
+    with CACHE_PATH.open("w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+    ids_by_condition = {}
+    if PROMPTS_JSON_PATH.exists():
+        with PROMPTS_JSON_PATH.open("r", encoding="utf-8") as f:
+            ids_by_condition = {p["condition_id"]: p["prompt_id"] for p in json.load(f)}
+
+    prompts = []
+    for r in rendered:
+        prompts.append({
+            "prompt_id": ids_by_condition.get(r["condition_id"], r["factor_key"]),
+            "condition_id": r["condition_id"],
+            "factor_key": r["factor_key"],
+            "input_tokens": prompt_tokens(tokenizer, r["data_block"], r["instruction"]),
+        })
+
+    requests = [(p["prompt_id"], p["input_tokens"]) for p in prompts for _ in range(repetitions)]
+    per_model = {}
+    for model in models or PROVIDER_LIMITS:
+        limits = PROVIDER_LIMITS[model]
+        batches, oversize = pack_batches(requests, limits)
+        per_model[model] = {
+            "limits": limits,
+            "requests": len(requests),
+            "input_tokens": sum(t for _, t in requests),
+            "batches": batches,
+            "oversize_prompt_ids": sorted({pid for pid, _ in oversize}),
+        }
+
+    manifest = {
+        "tokenizer": tokenizer,
+        "repetitions": repetitions,
+        "render_cache_hits": hits,
+        "prompts": prompts,
+        "models": per_model,
+    }
+    with MANIFEST_PATH.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    manifest = build_manifest()
+    print(f"Wrote {MANIFEST_PATH} ({len(manifest['prompts'])} prompts, "
+          f"{manifest['render_cache_hits']} served from render cache)")
+    for model, info in manifest["models"].items():
+        print(f"  {model:<8} {info['requests']} requests, {info['input_tokens']} input tokens, "
+              f"{len(info['batches'])} batch(es)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# query_results.py — Indexed query layer over the analysis outputs (SQLite)
+
+import json
+import sqlite3
+import sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from analysis_spec import default_spec
+from partitioned_dataset import load_responses
+
+# -------------------------------------------------------------------
+# Paths
+# -------------------------------------------------------------------
+RESULTS_DIR = default_spec().results_dir
+ANALYSIS_DIR = default_spec().analysis_dir
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+DB_PATH = ANALYSIS_DIR / "results.sqlite"
+
+# Tables served by the store -> CSV written by the analysis scripts
+TABLES = {
+    "sentiment_raw": "sentiment_raw.csv",
+    "recommendations_raw": "recommendations_raw.csv",
+    "validation_flags": "validation_flags.csv",
+    "entity_mentions": "entity_mentions.csv",
+    "claims": "claims.csv",
+}
+
+# Per-table indexes beyond INDEX_COLUMNS
+EXTRA_INDEXES = {
+    "claims": [("unit", "value"), ("response_id",)],
+}
+
+INDEX_COLUMNS = ["model_name", "condition_id", "hypothesis_id", "run"]
+AGGREGATES = {"avg", "sum", "min", "max", "count"}
+
+# -------------------------------------------------------------------
+# Build the store
+# -------------------------------------------------------------------
+def find_csv(name, analysis_dir=ANALYSIS_DIR):
+    """
+    Path of an analysis CSV in analysis_dir, or None. Sub-folders are not
+    searched: they may hold other runs, and one store must not mix them.
+    """
+    path = Path(analysis_dir) / name
+    return path if path.exists() else None
+
+
+def load_response_meta(results_dir=RESULTS_DIR):
+    """Map response_id -> run / hypothesis_id using the raw response files."""
+    df = load_responses(results_dir)
+    return df[["response_id", "run", "hypothesis_id"]]
+
+
+def _attach_keys(df, meta):
+    """Add run / hypothesis_id columns so every table shares the same index keys."""
+    if "response_id" in df.columns and not meta.empty:
+        df = df.drop(columns=[c for c in ("run", "hypothesis_id") if c in df.columns])
+        df = df.merge(meta, on="response_id", how="left")
+    if "run" not in df.columns:
+        df["run"] = pd.NA
+    if "hypothesis_id" not in df.columns:
+        df["hypothesis_id"] = pd.NA
+    df["hypothesis_id"] = df["hypothesis_id"].fillna(df["condition_id"].astype(str).str.slice(0, 2))
+    return df
+
+
+def build_store(db_path=DB_PATH, analysis_dir=ANALYSIS_DIR, results_dir=RESULTS_DIR):
+    """
+    Load the analysis CSVs into SQLite and index them on
+    model_name, condition_id, hypothesis_id and run.
+    """
+    meta = load_response_meta(results_dir) if results_dir.exists() else pd.DataFrame()
+
+    con = sqlite3.connect(db_path)
+    try:
+        for table, name in TABLES.items():
+            path = find_csv(name, analysis_dir)
+            if path is None:
+                print(f"Skipping {table}: {name} not found. Run the analysis scripts first.")
+                continue
+
+            df = _attach_keys(pd.read_csv(path), meta)
+            df.to_sql(table, con, if_exists="replace", index=False)
+
+            for col in INDEX_COLUMNS:
+                con.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{col} ON {table} ({col})")
+            con.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_model_cond ON {table} (model_name, condition_id)"
+            )
+            for cols in EXTRA_INDEXES.get(table, []):
+                con.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(cols)} ON {table} ({', '.join(cols)})"
+                )
+            print(f"Loaded {table}: {len(df)} rows from {path}")
+        con.commit()
+    finally:
+        con.close()
+
+
+def _store_is_stale(db_path, analysis_dir):
+    if not db_path.exists():
+        return True
+    built = db_path.stat().st_mtime
+    for name in TABLES.values():
+        path = find_csv(name, analysis_dir)
+        if path is not None and path.stat().st_mtime > built:
+            return True
+    return False
+
+
+# -------------------------------------------------------------------
+# Query API
+# -------------------------------------------------------------------
+class ResultsStore:
+    """
+    Filtered slices and on-the-fly aggregates over the analysis tables.
+
+    Filters are keyword arguments on the index columns; each accepts a
+    single value or a list, e.g.
+
+        store = ResultsStore()
+        store.query("sentiment_raw", model_name="claude",
+                    condition_id="H3_underperf", run=2)
+        store.aggregate("validation_flags", ["wrong_record"], by=["model_name"])
+    """
+
+    def __init__(self, db_path=DB_PATH, analysis_dir=ANALYSIS_DIR, results_dir=RESULTS_DIR, rebuild=False):
+        self.db_path = Path(db_path)
+        if rebuild or _store_is_stale(self.db_path, analysis_dir):
+            build_store(self.db_path, analysis_dir, results_dir)
+        self.con = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._columns = {
+            t: [r[1] for r in self.con.execute(f"PRAGMA table_info({t})")]
+            for t in TABLES
+        }
+
+    def close(self):
+        self.con.close()
+
+    def _check(self, table, columns):
+        if not self._columns.get(table):
+            raise ValueError(f"Unknown or empty table: {table}")
+        bad = [c for c in columns if c not in self._columns[table]]
+        if bad:
+            raise ValueError(f"Unknown column(s) for {table}: {bad}")
+
+    def _where(self, table, filters):
+        self._check(table, filters.keys())
+        clauses, params = [], []
+        for col, value in filters.items():
+            if value is None:
+                continue
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            if not values:
+                # an empty list matches nothing (and "IN ()" is not valid SQL)
+                clauses.append("0")
+                continue
+            clauses.append(f"{col} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, table, columns=None, **filters):
+        """Return the rows of `table` matching all filters."""
+        cols = list(columns) if columns else ["*"]
+        if columns:
+            self._check(table, cols)
+        where, params = self._where(table, filters)
+        sql = f"SELECT {', '.join(cols)} FROM {table}{where}"
+        return pd.read_sql_query(sql, self.con, params=params)
+
+    def aggregate(self, table, metrics, by=("condition_id", "model_name"), agg="avg", **filters):
+        """Aggregate `metrics` with `agg` (avg/sum/min/max/count) grouped by `by`."""
+        agg = agg.lower()
+        if agg not in AGGREGATES:
+            raise ValueError(f"agg must be one of {sorted(AGGREGATES)}")
+        by = list(by)
+        self._check(table, list(metrics) + by)
+        where, params = self._where(table, filters)
+
+        select = by + [f"{agg}({m}) AS {m}" for m in metrics] + ["count(*) AS n"]
+        sql = f"SELECT {', '.join(select)} FROM {table}{where}"
+        if by:
+            sql += f" GROUP BY {', '.join(by)} ORDER BY {', '.join(by)}"
+        return pd.read_sql_query(sql, self.con, params=params)
+
+
+# -------------------------------------------------------------------
+# Local HTTP endpoint
+# -------------------------------------------------------------------
+def handle_request(store, path):
+    """
+    Answer one GET path; returns (status, JSON payload).
+    Bad tables, columns, aggregates or filter values give 400 {"error": ...}.
+    """
+    url = urlparse(path)
+    table = url.path.strip("/")
+    qs = parse_qs(url.query)
+
+    metrics = qs.pop("metrics", [])
+    by = qs.pop("by", [])
+    agg = qs.pop("agg", ["avg"])[0]
+    columns = qs.pop("columns", None)
+    filters = {k: (v if len(v) > 1 else v[0]) for k, v in qs.items()}
+
+    try:
+        if "run" in filters:
+            r = filters["run"]
+            try:
+                filters["run"] = [int(x) for x in r] if isinstance(r, list) else int(r)
+            except ValueError:
+                raise ValueError(f"run must be an integer, got {r!r}") from None
+        if metrics:
+            df = store.aggregate(table, metrics, by=by, agg=agg, **filters)
+        else:
+            df = store.query(table, columns=columns, **filters)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    return 200, json.loads(df.to_json(orient="records"))
+
+
+def serve(store, host="127.0.0.1", port=8765):
+    """
+    GET /<table>?model_name=claude&run=2                 -> filtered rows
+    GET /<table>?metrics=compound&by=model_name&agg=avg  -> aggregate
+    Repeat a filter key to pass several values.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self._send(*handle_request(store, self.path))
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    print(f"Serving analysis tables on http://{host}:{port}/<table>")
+    HTTPServer((host, port), Handler).serve_forever()
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+def main():
+    store = ResultsStore(rebuild="--rebuild" in sys.argv)
+    if "--serve" in sys.argv:
+        serve(store)
+        return
+
+    print(store.aggregate("sentiment_raw", ["compound"], by=["model_name", "condition_id"]))
+    print(store.aggregate("validation_flags", ["wrong_record", "claims_dominant"], by=["model_name"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# regression_harness.py — Golden-output checks of the optimized analysis paths against the reference ones
+
+import contextlib
+import io
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import analyze_bias
+import statistical_tests
+import validate_claims
+from partitioned_dataset import load_responses
+from sentiment_scorers import LexiconScorer, VaderScorer
+from validate_claims import flag_response, run_validation
+
+COMMITTED_RESULTS = Path("results") / "results"
+REGRESSION_DIR = Path("regression")
+REGRESSION_DIR.mkdir(exist_ok=True)
+
+GENERATED_SIZES = [2000, 20000]   # override with --sizes 5000,50000
+SEED = 8
+MAX_DIFF_ROWS = 1000              # per case and corpus in diffs.csv
+
+# (rtol, atol) for float columns; ints, bools and strings must match exactly
+TOLERANCES = {
+    "sentiment": (0.0, 0.05),   # LexiconScorer vs VADER, as in sentiment_scorers.check_equivalence
+    "ttests": (0.05, 0.02),     # same tests fed with the two sentiment engines
+    "chi_square": (1e-9, 1e-12),
+    "entities": (1e-12, 1e-12),
+    "flags": (0.0, 0.0),
+}
+FLAG_COLS = ["wrong_record", "wrong_goal_diff", "claims_dominant", "claims_disastrous"]
+
+
+# -------------------------------------------------------------------
+# Corpora
+# -------------------------------------------------------------------
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def generate_corpus(base, n, seed=SEED):
+    """
+    n synthetic responses recombined from the committed ones: each takes the
+    condition / model / run of a random base row and 4-14 sentences drawn
+    from responses to the same condition. One in ten has a number changed,
+    so the numeric flags see both right and wrong claims.
+    """
+    rng = random.Random(seed + n)
+    pools = {
+        cond: [s for text in group["response_text"] for s in _SENTENCE_RE.split(str(text)) if s.strip()]
+        for cond, group in base.groupby("condition_id")
+    }
+    meta = base[["condition_id", "hypothesis_id", "model_name", "run"]].to_dict("records")
+
+    rows = []
+    for i in range(n):
+        row = dict(rng.choice(meta))
+        text = " ".join(rng.choice(pools[row["condition_id"]]) for _ in range(rng.randint(4, 14)))
+        if rng.random() < 0.1:
+            numbers = list(_NUMBER_RE.finditer(text))
+            if numbers:
+                m = rng.choice(numbers)
+                text = text[:m.start()] + str(int(m.group(0)) + rng.randint(1, 5)) + text[m.end():]
+        row["response_id"] = f"gen{n}-{i:07d}"
+        row["response_text"] = text
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+# -------------------------------------------------------------------
+# Reference implementations no longer in the modules
+# -------------------------------------------------------------------
+def entities_reference(df):
+    """analyze_bias.analyze_entities as a per-group loop (str.lower + substring)."""
+    rows = []
+    for (cond, model), group in df.groupby(["condition_id", "model_name"], dropna=False):
+        total = len(group)
+        counts = Counter()
+        for text in group["response_text"]:
+            tl = text.lower()
+            for p in analyze_bias.PLAYERS:
+                if p.lower() in tl:
+                    counts[p] += 1
+        for p in analyze_bias.PLAYERS:
+            rows.append({
+                "condition_id": cond,
+                "model_name": model,
+                "entity": p,
+                "mention_count": counts[p],
+                "mention_rate": counts[p] / total if total else 0,
+                "responses": total,
+            })
+    return pd.DataFrame(rows)
+
+
+# -------------------------------------------------------------------
+# Cases: each returns (reference table, optimized table, key columns,
+# reference seconds, optimized seconds)
+# -------------------------------------------------------------------
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def case_sentiment(ctx):
+    df = ctx["df"]
+    ref, t_ref = _timed(analyze_bias.analyze_sentiment, df, scorer=ctx["vader"])
+    opt, t_opt = _timed(analyze_bias.analyze_sentiment, df, scorer=ctx["lexicon"])
+    ctx["sent_ref"], ctx["sent_opt"] = ref, opt
+    return ref, opt, ["response_id"], t_ref, t_opt
+
+
+def case_ttests(ctx):
+    base = ctx["df"][["response_id", "hypothesis_id"]]
+    ref_in = base.merge(ctx["sent_ref"], on="response_id")
+    opt_in = base.merge(ctx["sent_opt"], on="response_id")
+    ref, t_ref = _timed(statistical_tests.run_ttests, ref_in)
+    opt, t_opt = _timed(statistical_tests.run_ttests, opt_in)
+    return ref, opt, ["comparison"], t_ref, t_opt
+
+
+def case_chi_square(ctx):
+    df = ctx["df"]
+    ref, t_ref = _timed(statistical_tests.run_chi_square, df)
+    # the optimized side classifies once in analyze_recommendations, as run_analysis does
+    opt, t_opt = _timed(lambda: statistical_tests.run_chi_square(df, analyze_bias.analyze_recommendations(df)))
+    return ref, opt, ["test"], t_ref, t_opt
+
+
+def case_entities(ctx):
+    df = ctx["df"]
+    ref, t_ref = _timed(entities_reference, df)
+    opt, t_opt = _timed(analyze_bias.analyze_entities, df)
+    return ref, opt, ["condition_id", "model_name", "entity"], t_ref, t_opt
+
+
+def case_flags(ctx):
+    """flag_response per text vs run_validation (claims table + check_phrases) on its four flags."""
+    df = ctx["df"]
+    ids = df["response_id"].values
+    ref, t_ref = _timed(lambda: pd.DataFrame([flag_response(t) for t in df["response_text"]]).assign(response_id=ids))
+    opt, t_opt = _timed(run_validation, df)
+    cols = ["response_id"] + FLAG_COLS
+    return ref[cols], opt[cols], ["response_id"], t_ref, t_opt
+
+
+CASES = {
+    "sentiment": case_sentiment,
+    "ttests": case_ttests,
+    "chi_square": case_chi_square,
+    "entities": case_entities,
+    "flags": case_flags,
+}
+
+
+# -------------------------------------------------------------------
+# Comparison
+# -------------------------------------------------------------------
+def compare_tables(ref, opt, keys, rtol=0.0, atol=0.0):
+    """
+    Align two tables on `keys` and compare every shared column: floats
+    within rtol/atol (NaN == NaN), everything else exactly. Rows present on
+    one side only count as mismatches. Returns (summary dict, diff rows).
+    """
+    merged = ref.merge(opt, on=keys, how="outer", suffixes=("_ref", "_opt"), indicator=True)
+    key = merged[keys].astype(str).agg("|".join, axis=1)
+    diffs = []
+
+    for side, label in (("left_only", "missing in optimized"), ("right_only", "extra in optimized")):
+        for k in key[merged["_merge"] == side]:
+            diffs.append({"key": k, "column": label, "reference": None, "optimized": None, "abs_diff": None})
+
+    both = merged["_merge"] == "both"
+    bad_rows = ~both
+    max_abs = 0.0
+    for col in [c for c in ref.columns if c not in keys and c in opt.columns]:
+        a, b = merged[f"{col}_ref"], merged[f"{col}_opt"]
+        if pd.api.types.is_float_dtype(a) or pd.api.types.is_float_dtype(b):
+            a, b = a.astype(float), b.astype(float)
+            ok = np.isclose(a, b, rtol=rtol, atol=atol, equal_nan=True)
+            gap = (a - b).abs()
+            if (both & gap.notna()).any():
+                max_abs = max(max_abs, float(gap[both].max()))
+        else:
+            ok = (a == b) | (a.isna() & b.isna())
+            gap = pd.Series(np.nan, index=merged.index)
+        bad = both & ~ok
+        bad_rows |= bad
+        for i in merged.index[bad]:
+            diffs.append({"key": key[i], "column": col, "reference": a[i], "optimized": b[i],
+                          "abs_diff": gap[i] if pd.notna(gap[i]) else None})
+
+    summary = {
+        "rows": int(len(merged)),
+        "mismatched_rows": int(bad_rows.sum()),
+        "max_abs_diff": max_abs,
+        "passed": bool(bad_rows.sum() == 0),
+    }
+    return summary, diffs
+
+
+@contextlib.contextmanager
+def analysis_outputs_in(path):
+    """Send the analysis modules' CSV side effects to `path` while cases run."""
+    modules = (analyze_bias, statistical_tests, validate_claims)
+    saved = [m.ANALYSIS_DIR for m in modules]
+    for m in modules:
+        m.ANALYSIS_DIR = Path(path)
+    try:
+        yield
+    finally:
+        for m, d in zip(modules, saved):
+            m.ANALYSIS_DIR = d
+
+
+def run_corpus(name, df, scorers):
+    """Run every case on one corpus; returns (summary rows, diff rows)."""
+    df = df.reset_index(drop=True)
+    ctx = {"df": df, **scorers}
+
+    summary, diffs = [], []
+    for case, fn in CASES.items():
+        ref, opt, keys, t_ref, t_opt = fn(ctx)
+        rtol, atol = TOLERANCES[case]
+        result, case_diffs = compare_tables(ref, opt, keys, rtol, atol)
+        summary.append({
+            "corpus": name,
+            "responses": len(df),
+            "case": case,
+            **result,
+            "rtol": rtol,
+            "atol": atol,
+            "reference_s": round(t_ref, 4),
+            "optimized_s": round(t_opt, 4),
+            "speedup": round(t_ref / t_opt, 2) if t_opt > 0 else np.nan,
+        })
+        diffs += [{"corpus": name, "case": case, **d} for d in case_diffs[:MAX_DIFF_ROWS]]
+        status = "ok" if result["passed"] else f"{result['mismatched_rows']} row(s) differ"
+        print(f"  {case:<16} {status:<20} speedup {summary[-1]['speedup']}x")
+    return summary, diffs
+
+
+def main():
+    sizes = GENERATED_SIZES
+    args = sys.argv[1:]
+    if "--sizes" in args:
+        sizes = [int(s) for s in args[args.index("--sizes") + 1].split(",") if s]
+    if "--committed-only" in args:
+        sizes = []
+
+    if not COMMITTED_RESULTS.exists():
+        raise FileNotFoundError(f"{COMMITTED_RESULTS} not found (run from the repository root).")
+    with contextlib.redirect_stdout(io.StringIO()):
+        base = load_responses(COMMITTED_RESULTS).reset_index(drop=True)
+
+    corpora = [("committed", base)] + [(f"generated_{n}", generate_corpus(base, n)) for n in sizes]
+    scorers = {"vader": VaderScorer(), "lexicon": LexiconScorer()}
+
+    summary, diffs = [], []
+    with tempfile.TemporaryDirectory() as workdir, analysis_outputs_in(workdir):
+        for name, df in corpora:
+            print(f"{name} ({len(df)} responses)")
+            s, d = run_corpus(name, df, scorers)
+            summary += s
+            diffs += d
+
+    summary_df = pd.DataFrame(summary)
+    summary_path = REGRESSION_DIR / "summary.csv"
+    diffs_path = REGRESSION_DIR / "diffs.csv"
+    summary_df.to_csv(summary_path, index=False)
+    pd.DataFrame(diffs, columns=["corpus", "case", "key", "column", "reference", "optimized", "abs_diff"]) \
+        .to_csv(diffs_path, index=False)
+    print(f"\nSaved {summary_path} and {diffs_path}")
+
+    failed = summary_df[~summary_df["passed"]]
+    if not failed.empty:
+        raise SystemExit(f"{len(failed)} case(s) outside tolerance: "
+                         + ", ".join(failed["corpus"] + "/" + failed["case"]))
+    print("All optimized paths match the reference outputs.")
+
+
+if __name__ == "__main__":
+    main()
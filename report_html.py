@@ -0,0 +1,279 @@
+# report_html.py — Self-contained HTML report with inline SVG charts
+
+import html
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis_spec import STAGES, default_spec, load_spec
+from reproducibility import now
+
+# The report reads every table from one analysis_dir (the spec's by default)
+ANALYSIS_DIR = default_spec().analysis_dir
+REPORT_NAME = "report.html"
+
+# Table -> stage that writes it. A table is required when its stage is part
+# of the run being reported; model_effects.csv comes from model_comparison.py.
+REPORT_TABLES = {
+    "sentiment_raw.csv": "sentiment",
+    "recommendations_raw.csv": "recommendations",
+    "validation_flags.csv": "validation",
+    "entity_mentions.csv": "entities",
+    "stat_ttests.csv": "ttests",
+    "stat_chi_square.csv": "chi_square",
+    "model_effects.csv": None,
+}
+
+FLAG_COLS = ["wrong_record", "wrong_goal_diff", "claims_dominant", "claims_disastrous", "wrong_player_stat"]
+PALETTE = ["#4c72b0", "#dd8452", "#55a868", "#c44e52", "#8172b3", "#937860", "#da8bc3", "#8c8c8c"]
+
+
+# -------------------------------------------------------------------
+# Data prep (one vectorized pass)
+# -------------------------------------------------------------------
+def load_table(name, analysis_dir=ANALYSIS_DIR, required=True):
+    """Read `name` from analysis_dir itself (never from another run's sub-folder)."""
+    path = Path(analysis_dir) / name
+    if not path.exists():
+        if required:
+            raise FileNotFoundError(f"{name} not found in {analysis_dir}. Run the analysis for it first.")
+        return None
+    return pd.read_csv(path)
+
+
+def build_tables(analysis_dir=ANALYSIS_DIR, stages=STAGES):
+    """
+    Join the per-response outputs once and derive every summary from a
+    single (condition, model) aggregate:
+      - cells:       per condition × model means and counts
+      - conditions:  n-weighted roll-up of cells per condition
+      - models:      n-weighted roll-up of cells per model
+      - entities:    mean mention rate per condition × entity
+      - tests:       t-test / chi-square tables
+    Every table comes from `analysis_dir`; one whose stage is in `stages`
+    must exist there. Sentiment and recommendations are always required.
+    The keyword buckets are whatever recommendations_raw.csv has (the
+    spec's [keywords]).
+    """
+    def table(name, required=None):
+        required = REPORT_TABLES[name] in stages if required is None else required
+        return load_table(name, analysis_dir, required)
+
+    keys = ["response_id", "condition_id", "model_name"]
+    sent = table("sentiment_raw.csv", required=True)[keys + ["compound", "pos", "neu", "neg"]]
+    rec = table("recommendations_raw.csv", required=True)
+    flags = table("validation_flags.csv")
+
+    rec_cols = [c for c in rec.columns if c not in keys]
+    df = sent.merge(rec[["response_id"] + rec_cols], on="response_id", how="left")
+    metrics = ["compound", "pos", "neu", "neg"] + rec_cols
+    if flags is not None:
+        flag_cols = [c for c in FLAG_COLS if c in flags.columns]
+        flags = flags[["response_id"] + flag_cols].copy()
+        flags[flag_cols] = flags[flag_cols].astype(float)
+        flags["any_flag"] = flags[flag_cols].max(axis=1)
+        df = df.merge(flags, on="response_id", how="left")
+        metrics += flag_cols + ["any_flag"]
+
+    grouped = df.groupby(["condition_id", "model_name"], sort=True)
+    cells = grouped[metrics].mean()
+    cells["n"] = grouped.size()
+    cells["compound_sd"] = grouped["compound"].std()
+    cells = cells.reset_index()
+
+    def roll_up(by):
+        w = cells[metrics].mul(cells["n"], axis=0)
+        w[by] = cells[by]
+        w["n"] = cells["n"]
+        out = w.groupby(by).sum()
+        out[metrics] = out[metrics].div(out["n"], axis=0)
+        return out.reset_index()
+
+    tables = {
+        "cells": cells,
+        "conditions": roll_up("condition_id"),
+        "models": roll_up("model_name"),
+        "metrics": metrics,
+        "rec_cols": rec_cols,
+        "responses": len(df),
+    }
+
+    ent = table("entity_mentions.csv")
+    if ent is not None:
+        tables["entities"] = ent.pivot_table(index="condition_id", columns="entity",
+                                             values="mention_rate", aggfunc="mean")
+    for name in ("stat_ttests.csv", "stat_chi_square.csv", "model_effects.csv"):
+        t = table(name)
+        if t is not None:
+            tables[name] = t
+    return tables
+
+
+# -------------------------------------------------------------------
+# SVG charts
+# -------------------------------------------------------------------
+def svg_bars(categories, series, title, width=640, height=240, ymin=None, ymax=None):
+    """Grouped bar chart as an inline SVG string. `series` maps name -> values."""
+    categories = [str(c) for c in categories]
+    names = list(series)
+    values = np.array([np.asarray(series[n], dtype=float) for n in names]).reshape(len(names), len(categories))
+    values = np.nan_to_num(values)
+
+    lo = min(0.0, values.min()) if ymin is None else ymin
+    hi = max(0.0, values.max()) if ymax is None else ymax
+    if hi == lo:
+        hi = lo + 1.0
+
+    left, right, top, bottom = 44, 10, 24, 40
+    plot_w, plot_h = width - left - right, height - top - bottom
+    group_w = plot_w / max(len(categories), 1)
+    bar_w = group_w * 0.8 / max(len(names), 1)
+
+    def y(v):
+        return top + plot_h * (hi - v) / (hi - lo)
+
+    # all bar geometry at once
+    gi, si = np.meshgrid(np.arange(len(categories)), np.arange(len(names)))
+    xs = left + gi * group_w + group_w * 0.1 + si * bar_w
+    y0 = y(0.0)
+    ys = y(values)
+    tops = np.minimum(ys, y0)
+    heights = np.abs(ys - y0)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" class="chart">',
+        f'<text x="{left}" y="15" class="title">{html.escape(title)}</text>',
+        f'<line x1="{left}" x2="{width - right}" y1="{y0:.1f}" y2="{y0:.1f}" class="axis"/>',
+    ]
+    for tick in np.linspace(lo, hi, 5):
+        parts.append(f'<text x="{left - 4}" y="{y(tick) + 3:.1f}" class="tick" text-anchor="end">{tick:.2f}</text>')
+    for s in range(len(names)):
+        color = PALETTE[s % len(PALETTE)]
+        for g in range(len(categories)):
+            parts.append(
+                f'<rect x="{xs[s, g]:.1f}" y="{tops[s, g]:.1f}" width="{bar_w:.1f}" '
+                f'height="{heights[s, g]:.1f}" fill="{color}"><title>{html.escape(names[s])} · '
+                f'{html.escape(categories[g])}: {values[s, g]:.3f}</title></rect>'
+            )
+    for g, c in enumerate(categories):
+        cx = left + g * group_w + group_w / 2
+        parts.append(f'<text x="{cx:.1f}" y="{height - bottom + 14}" class="tick" text-anchor="middle">{html.escape(c)}</text>')
+    if len(names) > 1:
+        for s, n in enumerate(names):
+            lx = left + s * 110
+            parts.append(f'<rect x="{lx}" y="{height - 14}" width="10" height="10" fill="{PALETTE[s % len(PALETTE)]}"/>')
+            parts.append(f'<text x="{lx + 14}" y="{height - 5}" class="tick">{html.escape(str(n))}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def table_html(df, float_fmt="{:.3f}"):
+    formatters = {c: float_fmt.format for c in df.select_dtypes("float").columns}
+    return df.to_html(index=False, border=0, classes="tbl", formatters=formatters, na_rep="")
+
+
+# -------------------------------------------------------------------
+# Report
+# -------------------------------------------------------------------
+CSS = """
+body{font-family:system-ui,sans-serif;margin:24px;color:#222;max-width:1100px}
+h1{font-size:22px}h2{font-size:18px;margin-top:28px}
+.tbl{border-collapse:collapse;font-size:12px;margin:8px 0}
+.tbl th,.tbl td{padding:3px 8px;border-bottom:1px solid #ddd;text-align:right}
+.tbl th:first-child,.tbl td:first-child{text-align:left}
+.chart .title{font-size:12px;font-weight:600}.chart .tick{font-size:10px;fill:#555}
+.chart .axis{stroke:#999}details{margin:6px 0}summary{cursor:pointer;font-weight:600}
+"""
+
+
+def build_report(tables):
+    cells, conds, models = tables["cells"], tables["conditions"], tables["models"]
+    rec_cols = tables["rec_cols"]
+    model_names = list(models["model_name"])
+    cond_names = list(conds["condition_id"])
+
+    # wide views from the one aggregate
+    compound_wide = cells.pivot(index="condition_id", columns="model_name", values="compound").reindex(cond_names)
+    has_flags = "any_flag" in cells.columns
+
+    body = [
+        "<h1>LLM Bias Detection — Analysis Report</h1>",
+        f"<p>{tables['responses']} responses · {len(model_names)} models · {len(cond_names)} conditions. "
+        f"Generated {now():%Y-%m-%d %H:%M} UTC.</p>",
+        "<h2>Sentiment</h2>",
+        svg_bars(cond_names, {"compound": conds["compound"]}, "Mean sentiment (compound) by condition", ymin=-1, ymax=1),
+        svg_bars(cond_names, {m: compound_wide[m] for m in model_names},
+                 "Mean sentiment by condition and model", width=760, ymin=-1, ymax=1),
+        "<h2>Recommendation focus</h2>",
+        svg_bars(cond_names, {c: conds[c] for c in rec_cols}, "Keyword mention rate by condition",
+                 width=760, ymin=0, ymax=1),
+    ]
+    if "entities" in tables:
+        ent = tables["entities"].reindex(cond_names)
+        body += ["<h2>Entity mentions</h2>",
+                 svg_bars(cond_names, {e: ent[e] for e in ent.columns}, "Mean mention rate by condition",
+                          width=760, ymin=0, ymax=1)]
+    if has_flags:
+        flag_wide = cells.pivot(index="condition_id", columns="model_name", values="any_flag").reindex(cond_names)
+        body += ["<h2>Claim validation</h2>",
+                 svg_bars(cond_names, {m: flag_wide[m] for m in model_names},
+                          "Share of responses with any validation flag", width=760, ymin=0, ymax=1)]
+
+    for name, label in (("stat_ttests.csv", "t-tests"), ("stat_chi_square.csv", "Chi-square tests"),
+                        ("model_effects.csv", "Per-model bias effects")):
+        if name in tables:
+            body += [f"<h2>{label}</h2>", table_html(tables[name])]
+
+    body.append("<h2>Per-model drill-down</h2>")
+    show = ["condition_id", "n", "compound", "compound_sd"] + rec_cols + (["any_flag"] if has_flags else [])
+    for m, sub in cells.groupby("model_name"):
+        body.append(f"<details><summary>{html.escape(str(m))}</summary>")
+        body.append(svg_bars(sub["condition_id"], {"compound": sub["compound"]}, f"{m}: compound by condition",
+                             ymin=-1, ymax=1))
+        body.append(table_html(sub[show]))
+        body.append("</details>")
+
+    body.append("<h2>Per-condition drill-down</h2>")
+    show = ["model_name"] + show[1:]
+    for c, sub in cells.groupby("condition_id"):
+        body.append(f"<details><summary>{html.escape(str(c))}</summary>")
+        body.append(svg_bars(sub["model_name"], {"compound": sub["compound"]}, f"{c}: compound by model",
+                             ymin=-1, ymax=1))
+        body.append(table_html(sub[show]))
+        body.append("</details>")
+
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>LLM Bias Report</title>"
+        f"<style>{CSS}</style></head><body>{''.join(body)}</body></html>"
+    )
+
+
+def main():
+    """
+    python report_html.py              the default spec's analysis_dir
+    python report_html.py spec.toml    another spec's analysis_dir (its stages' tables required)
+    python report_html.py DIR          the CSVs in DIR (every stage's tables required)
+    """
+    t0 = time.perf_counter()
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else None
+    if target is None:
+        spec = default_spec()
+        analysis_dir, stages = spec.analysis_dir, spec.stages
+    elif target.is_dir():
+        analysis_dir, stages = target, STAGES
+    else:
+        spec = load_spec(target)
+        analysis_dir, stages = spec.analysis_dir, spec.stages
+
+    tables = build_tables(analysis_dir, stages)
+    page = build_report(tables)
+    report_path = analysis_dir / REPORT_NAME
+    report_path.write_text(page, encoding="utf-8")
+    print(f"Saved: {report_path} ({len(page) / 1024:.0f} KB, {time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
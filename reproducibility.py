@@ -0,0 +1,108 @@
+# reproducibility.py — Deterministic ids, timestamps and row order for byte-identical reruns
+
+import hashlib
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+ANALYSIS_DIR = Path("analysis")
+DIGESTS_PATH = ANALYSIS_DIR / "output_digests.json"
+
+# Turn on with REPRODUCIBLE=1 (or set_reproducible(True) before running a stage).
+# Timestamps then come from SOURCE_DATE_EPOCH (seconds, default 0), the usual
+# convention for reproducible builds.
+REPRODUCIBLE = os.environ.get("REPRODUCIBLE", "") not in ("", "0")
+
+# Namespace for content-derived UUIDv5 ids
+ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "Task_08_Bias_Detection")
+
+# Canonical row order of loaded responses in reproducible mode
+RESPONSE_SORT_KEYS = ["run", "model_name", "condition_id", "timestamp", "response_id"]
+
+
+def set_reproducible(flag=True):
+    global REPRODUCIBLE
+    REPRODUCIBLE = bool(flag)
+
+
+def make_id(*parts):
+    """
+    UUIDv5 from the given content in reproducible mode, uuid4 otherwise.
+    Parts must be JSON-serializable; their order matters.
+    """
+    if not REPRODUCIBLE:
+        return str(uuid.uuid4())
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return str(uuid.uuid5(ID_NAMESPACE, payload))
+
+
+def now():
+    """Naive UTC datetime: the wall clock, or SOURCE_DATE_EPOCH in reproducible mode."""
+    if not REPRODUCIBLE:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    epoch = int(os.environ.get("SOURCE_DATE_EPOCH", "0"))
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None)
+
+
+def canonical_order(df):
+    """Stable sort of a responses frame by RESPONSE_SORT_KEYS (in reproducible mode only)."""
+    if not REPRODUCIBLE:
+        return df
+    keys = [k for k in RESPONSE_SORT_KEYS if k in df.columns]
+    return df.sort_values(keys).reset_index(drop=True)
+
+
+# -------------------------------------------------------------------
+# Output digests
+# -------------------------------------------------------------------
+def digest_outputs(analysis_dir=ANALYSIS_DIR, pattern="*.csv"):
+    """sha256 of every matching file under analysis_dir, keyed by relative path."""
+    analysis_dir = Path(analysis_dir)
+    digests = {}
+    for path in sorted(analysis_dir.rglob(pattern)):
+        digests[path.relative_to(analysis_dir).as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return digests
+
+
+def compare_digests(before, after):
+    """Rows of (file, status) for files that were added, removed or changed."""
+    rows = []
+    for name in sorted(set(before) | set(after)):
+        if name not in after:
+            rows.append((name, "removed"))
+        elif name not in before:
+            rows.append((name, "added"))
+        elif before[name] != after[name]:
+            rows.append((name, "changed"))
+    return rows
+
+
+def main():
+    """
+    python reproducibility.py            record digests of analysis/*.csv
+    python reproducibility.py --check    compare against the recorded digests
+    """
+    current = digest_outputs()
+    if "--check" in sys.argv[1:]:
+        if not DIGESTS_PATH.exists():
+            raise SystemExit(f"{DIGESTS_PATH} not found. Run without --check first.")
+        with DIGESTS_PATH.open("r", encoding="utf-8") as f:
+            recorded = json.load(f)
+        diffs = compare_digests(recorded, current)
+        for name, status in diffs:
+            print(f"{status:<8} {name}")
+        if diffs:
+            raise SystemExit(f"{len(diffs)} output file(s) differ from {DIGESTS_PATH}.")
+        print(f"All {len(current)} outputs match {DIGESTS_PATH}.")
+        return
+
+    with DIGESTS_PATH.open("w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"Recorded digests of {len(current)} outputs in {DIGESTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
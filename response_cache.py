@@ -0,0 +1,69 @@
+# response_cache.py — Persistent cache of model responses keyed by exact request
+
+import hashlib
+import json
+from pathlib import Path
+
+RESULTS_DIR = Path("results")
+RESULTS_DIR.mkdir(exist_ok=True)
+CACHE_PATH = RESULTS_DIR / "response_cache.jsonl"
+
+
+def cache_key(prompt_text, model_name, sampling_params=None, repetition=0):
+    """
+    sha256 over the exact prompt text, model identifier, sampling
+    parameters (key order ignored) and repetition index.
+    """
+    payload = json.dumps(
+        [prompt_text, model_name, sampling_params or {}, int(repetition)],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Append-only JSONL store of response rows. Each line is
+    {"key": ..., "row": {...}}; later lines win if a key repeats.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        item = json.loads(line)
+                        self.entries[item["key"]] = item["row"]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Cached row for `key` (counted as a hit), or None (counted as a miss)."""
+        row = self.entries.get(key)
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return row
+
+    def put(self, key, row):
+        self.entries[key] = row
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "row": row}, ensure_ascii=False) + "\n")
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self):
+        return f"cache hits: {self.hits}, misses: {self.misses}, hit rate: {self.hit_rate:.1%}"
@@ -0,0 +1,394 @@
+# response_schema.py — Typed decoding and bulk validation of response records
+
+import hashlib
+import json
+import pickle
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from study_design import CONDITIONS, MODEL_OPTIONS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+ANALYSIS_DIR = Path("analysis")
+REJECTS_PATH = ANALYSIS_DIR / "ingest_rejects.jsonl"
+
+# Declared schema of one response record: field -> (type, required).
+# hypothesis_id is optional because loaders derive it from condition_id.
+RESPONSE_SCHEMA = {
+    "response_id": (str, True),
+    "timestamp": (str, True),
+    "model_name": (str, True),
+    "prompt_id": (str, True),
+    "hypothesis_id": (str, False),
+    "condition_id": (str, True),
+    "prompt_text": (str, True),
+    "response_text": (str, True),
+}
+
+KNOWN_CONDITIONS = sorted({c_id for _, c_id, _, _ in CONDITIONS})
+
+DECODE_ERRORS = (ValueError,) + ((msgspec.DecodeError,) if msgspec is not None else ())
+# Part of the ingest cache key: a frame decoded one way is not reused by the other
+DECODER = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "json"
+
+
+# -------------------------------------------------------------------
+# Decoding
+# -------------------------------------------------------------------
+if msgspec is not None:
+    # kw_only: optional fields (hypothesis_id) may come before required ones
+    ResponseRecord = msgspec.defstruct(
+        "ResponseRecord",
+        [(name, typ) if required else (name, Optional[typ], None)
+         for name, (typ, required) in RESPONSE_SCHEMA.items()],
+        kw_only=True,
+    )
+    _typed_array = msgspec.json.Decoder(list[ResponseRecord])
+    _untyped = msgspec.json.Decoder()
+
+
+def loads(data):
+    """Decode one JSON document (bytes) with the fastest decoder available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return _untyped.decode(data)
+    return json.loads(data)
+
+
+def _typed_frame(data):
+    """
+    Decode a JSON array straight into schema-typed records with msgspec.
+    Returns a DataFrame, or None if any record fails the schema (the
+    caller then falls back to untyped decoding to locate the rejects).
+    """
+    if msgspec is None:
+        return None
+    try:
+        records = _typed_array.decode(data)
+    except msgspec.ValidationError:
+        return None
+    return pd.DataFrame([msgspec.structs.astuple(r) for r in records], columns=list(RESPONSE_SCHEMA))
+
+
+def record_lines(text):
+    """1-based starting line of each element of a top-level JSON array."""
+    decoder = json.JSONDecoder()
+    pos = text.index("[") + 1
+    line, last = 1, 0
+    lines = []
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            return lines
+        line += text.count("\n", last, pos)
+        last = pos
+        lines.append(line)
+        _, pos = decoder.raw_decode(text, pos)
+
+
+def read_records(path):
+    """
+    Decode a response file into (DataFrame, rejects). JSON arrays and
+    JSONL partitions are both supported. Every row carries `_source`,
+    `_record` (0-based position in the file) and `_line` (JSONL only; array line
+    numbers are resolved later, and only for files that have rejects).
+    Records that are not valid JSON objects are returned as rejects.
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    rejects = []
+
+    if path.suffix == ".jsonl":
+        records, lines, positions = [], [], []
+        for i, raw in enumerate(data.split(b"\n"), 1):
+            if not raw.strip():
+                continue
+            pos = len(records) + len(rejects)
+            try:
+                entry = loads(raw)
+            except DECODE_ERRORS as e:
+                rejects.append(_reject(path, pos, i, [f"invalid JSON: {e}"], raw.decode("utf-8", "replace")))
+                continue
+            if not isinstance(entry, dict):
+                rejects.append(_reject(path, pos, i, ["not a JSON object"], entry))
+                continue
+            records.append(entry)
+            lines.append(i)
+            positions.append(pos)
+        df = pd.DataFrame(records, index=positions)
+        df["_line"] = lines
+    else:
+        df = _typed_frame(data)
+        if df is None:
+            try:
+                entries = loads(data)
+            except DECODE_ERRORS as e:
+                return pd.DataFrame(), [_reject(path, None, getattr(e, "lineno", None),
+                                                [f"invalid JSON: {e}"], None)]
+            if not isinstance(entries, list):
+                return pd.DataFrame(), [_reject(path, None, 1, ["top level is not a JSON array"], None)]
+            keep = [i for i, e in enumerate(entries) if isinstance(e, dict)]
+            if len(keep) == len(entries):
+                df = pd.DataFrame(entries)
+            else:
+                lines = record_lines(data.decode("utf-8"))
+                for i in sorted(set(range(len(entries))) - set(keep)):
+                    rejects.append(_reject(path, i, lines[i], ["not a JSON object"], entries[i]))
+                df = pd.DataFrame([entries[i] for i in keep], index=keep)
+        df["_line"] = None
+
+    df["_source"] = str(path)
+    df["_record"] = df.index
+    return df.reset_index(drop=True), rejects
+
+
+# -------------------------------------------------------------------
+# Bulk validation
+# -------------------------------------------------------------------
+_INFERRED_DTYPE = {str: "string", int: "integer", float: "floating", bool: "boolean"}
+
+
+def _type_ok(col, present, typ):
+    """Mask of present values whose type is exactly `typ` (one C-level scan when the whole column is)."""
+    if pd.api.types.infer_dtype(col, skipna=True) == _INFERRED_DTYPE.get(typ):
+        return present
+    return present & col.map(type).eq(typ)
+
+
+def validate_frame(df):
+    """
+    Check every record against RESPONSE_SCHEMA, MODEL_OPTIONS and the
+    known condition ids in column-wise passes. Returns a boolean
+    DataFrame aligned with df: one column per failed check, True where
+    the record fails it.
+    """
+    checks = {}
+    is_str = {}
+    absent = {}
+
+    def fail(mask, message):
+        checks[message] = checks[message] | mask if message in checks else mask
+
+    for field, (typ, required) in RESPONSE_SCHEMA.items():
+        if field not in df.columns:
+            if required:
+                fail(pd.Series(True, index=df.index), f"missing {field}")
+            continue
+        col = df[field]
+        missing = col.isna()
+        absent[field] = missing
+        if required:
+            fail(missing, f"missing {field}")
+        ok = _type_ok(col, ~missing, typ)
+        fail(~missing & ~ok, f"{field} is not {typ.__name__}")
+        if typ is str:
+            is_str[field] = ok
+
+    if "model_name" in df.columns:
+        models = df["model_name"].where(is_str["model_name"])
+        fail(is_str["model_name"] & ~models.str.lower().isin(MODEL_OPTIONS), "unknown model_name")
+    if "condition_id" in df.columns:
+        conds = df["condition_id"]
+        fail(~absent["condition_id"] & ~conds.isin(KNOWN_CONDITIONS), "unknown condition_id")
+        if "hypothesis_id" in df.columns:
+            hyp = df["hypothesis_id"]
+            prefix = conds.where(is_str["condition_id"]).str.slice(0, 2)
+            fail(is_str["hypothesis_id"] & is_str["condition_id"] & hyp.ne(prefix), "hypothesis_id does not match condition_id")
+    if "timestamp" in df.columns:
+        ts = df["timestamp"].where(is_str["timestamp"])
+        parsed = pd.to_datetime(ts, errors="coerce", format="ISO8601")
+        fail(is_str["timestamp"] & parsed.isna(), "timestamp is not ISO 8601")
+    if "response_id" in df.columns:
+        ids = df["response_id"]
+        fail(~absent["response_id"] & ids.duplicated(keep="first"), "duplicate response_id")
+
+    return pd.DataFrame(checks, index=df.index)
+
+
+def _reject(source, record, line, reasons, data):
+    return {"source": str(source), "record": record, "line": line, "reasons": reasons, "data": data}
+
+
+def split_rejects(df, rejects=None):
+    """
+    Validate `df` (rows from read_records) and move failing rows to the
+    reject list, filling in array line numbers for the affected files.
+    Returns (clean DataFrame, rejects); helper columns are kept so later
+    checks can still point at the source line.
+    """
+    rejects = list(rejects or [])
+    if df.empty:
+        return df, rejects
+
+    checks = validate_frame(df)
+    bad = checks.any(axis=1)
+    if not bad.any():
+        return df, rejects
+    failed = checks[bad]
+    rejects += _rejects_for(df.loc[failed.index], [list(failed.columns[row]) for row in failed.to_numpy()])
+    return df[~bad].reset_index(drop=True), rejects
+
+
+def _rejects_for(rows, reasons):
+    line_cache = {}
+    out = []
+    for (_, row), why in zip(rows.iterrows(), reasons):
+        line = row["_line"]
+        if line is None or pd.isna(line):
+            source = row["_source"]
+            if source not in line_cache:
+                line_cache[source] = record_lines(Path(source).read_text(encoding="utf-8"))
+            line = line_cache[source][int(row["_record"])]
+        data = {k: v for k, v in row.items() if not str(k).startswith("_") and not _is_missing(v)}
+        out.append(_reject(row["_source"], int(row["_record"]), int(line), why, data))
+    return out
+
+
+def _is_missing(value):
+    return not isinstance(value, (list, dict)) and pd.isna(value)
+
+
+# -------------------------------------------------------------------
+# Ingestion with a validated-frame cache
+# -------------------------------------------------------------------
+def schema_fingerprint():
+    """Changes whenever the schema or the allowed values change, invalidating cached frames."""
+    payload = json.dumps(
+        [[k, t.__name__, r] for k, (t, r) in RESPONSE_SCHEMA.items()] + [MODEL_OPTIONS, KNOWN_CONDITIONS]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def ingest_file(path, cache_dir=None):
+    """
+    Decode and validate one file. With `cache_dir`, the validated frame is
+    pickled there keyed by file size, mtime, schema fingerprint and
+    decoder, so unchanged files are not decoded again.
+    """
+    path = Path(path)
+    stat = path.stat()
+    key = [str(path), stat.st_size, stat.st_mtime_ns, schema_fingerprint(), DECODER]
+    cache_path = None
+    if cache_dir is not None:
+        name = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+        cache_path = Path(cache_dir) / f"{name}.pkl"
+        if cache_path.exists():
+            with cache_path.open("rb") as f:
+                cached = pickle.load(f)
+            if cached["key"] == key:
+                return cached["frame"], cached["rejects"]
+
+    df, rejects = split_rejects(*read_records(path))
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with cache_path.open("wb") as f:
+            pickle.dump({"key": key, "frame": df, "rejects": rejects}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return df, rejects
+
+
+def finish_ingest(frames, rejects, rejects_path=REJECTS_PATH):
+    """
+    Combine per-file frames, reject response ids repeated across files
+    (first occurrence wins), write the reject file and drop helper columns.
+    """
+    frames = [f for f in frames if not f.empty]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    rejects = list(rejects)
+    if "response_id" in df.columns:
+        dup = df["response_id"].duplicated(keep="first")
+        if dup.any():
+            rejects += _rejects_for(df[dup], [["duplicate response_id"]] * int(dup.sum()))
+            df = df[~dup].reset_index(drop=True)
+    write_rejects(rejects, rejects_path)
+    return df.drop(columns=["_source", "_record", "_line"], errors="ignore"), rejects
+
+
+def write_rejects(rejects, path=REJECTS_PATH):
+    """Write rejects as JSONL (replacing any previous file); removes a stale file when there are none."""
+    path = Path(path)
+    if not rejects:
+        if path.exists():
+            path.unlink()
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        for r in rejects:
+            f.write(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+    print(f"Rejected {len(rejects)} record(s); see {path}")
+
+
+def main():
+    import sys
+    import tempfile
+    import time
+
+    paths = [Path(p) for p in sys.argv[1:]]
+    if not paths:
+        raise SystemExit("Usage: python response_schema.py FILE [FILE ...]")
+
+    def best_of(fn, repeat=3):
+        """(result, fastest wall time) over `repeat` runs, so one-off warm-up is not counted."""
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - t0)
+        return result, min(times)
+
+    # baseline: what the loaders did before (json.load every file, one DataFrame, no checks)
+    def baseline():
+        rows = []
+        for p in paths:
+            with p.open("r", encoding="utf-8") as f:
+                if p.suffix == ".jsonl":
+                    rows += [json.loads(line) for line in f if line.strip()]
+                else:
+                    rows += json.load(f)
+        return pd.DataFrame(rows)
+
+    def ingest(cache_dir=None):
+        frames, rejects = [], []
+        for p in paths:
+            df, bad = ingest_file(p, cache_dir)
+            frames.append(df)
+            rejects += bad
+        return finish_ingest(frames, rejects)
+
+    def cold():
+        with tempfile.TemporaryDirectory() as cache_dir:
+            return ingest(cache_dir)
+
+    try:
+        _, t_base = best_of(baseline)
+        base = f"{t_base:.3f}s"
+    except (ValueError, TypeError):
+        base = "n/a (malformed input)"
+    (df, rejects), t_validate = best_of(ingest)
+    _, t_cold = best_of(cold)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        ingest(cache_dir)
+        _, t_hit = best_of(lambda: ingest(cache_dir))
+
+    decoder = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "json"
+    print(f"{len(df)} valid, {len(rejects)} rejected (best of 3 runs each, {decoder} decoder)")
+    print(f"json.load + DataFrame, no checks:    {base}")
+    print(f"decode + validate:                   {t_validate:.3f}s")
+    print(f"decode + validate + cache write:     {t_cold:.3f}s  (first load of a file)")
+    print(f"validated cache hit:                 {t_hit:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# run_analysis.py — Run one or more analysis specs in one process, sharing data and unchanged stages
+
+import shutil
+import sys
+import time
+
+import pandas as pd
+
+import analyze_bias
+import statistical_tests
+import validate_claims
+from analysis_spec import (
+    SPEC_PATH,
+    STAGE_OUTPUTS,
+    load_spec,
+    read_stage_manifest,
+    stage_is_current,
+    write_stage_manifest,
+)
+from claims_index import extract_claims
+from partitioned_dataset import load_responses
+from sentiment_scorers import SentimentScorer, get_scorer
+
+
+class PrecomputedScorer(SentimentScorer):
+    """Hands back scores already computed for the same responses."""
+
+    name = "precomputed"
+
+    def __init__(self, scores):
+        self.scores = scores
+
+    def score_batch(self, texts):
+        return self.scores
+
+
+class AnalysisSession:
+    """
+    Runs specs against shared state. Everything is keyed by the stage
+    hashes of analysis_spec, so two specs share whatever their hashes say
+    is the same:
+      - responses per "load" hash (same inputs and unchanged input files),
+      - sentiment scores per "scores" hash, numeric claims per "claims" hash,
+      - stage outputs per stage hash: copied from the spec that computed
+        them instead of being recomputed.
+    A stage whose hash matches the manifest already in its analysis_dir
+    (and whose files exist) is skipped altogether; this is checked first.
+    """
+
+    def __init__(self):
+        self.data = {}      # load hash -> responses
+        self.shared = {}    # ("scores" | "claims", hash) -> value
+        self.done = {}      # (stage, hash) -> (analysis_dir, result or None)
+        self.log = []
+
+    # ---------- shared inputs ----------
+    def responses(self, spec):
+        key = spec.stage_hash("load")
+        if key not in self.data:
+            print(f"Loading responses from {spec.results_dir}...")
+            df = load_responses(spec.results_dir, **spec.filters).reset_index(drop=True)
+            if "model_name" not in df.columns:
+                df["model_name"] = "unknown"
+            self.data[key] = df
+        return self.data[key]
+
+    def _shared(self, kind, spec, compute):
+        key = (kind, spec.stage_hash(kind))
+        if key not in self.shared:
+            self.shared[key] = compute()
+        return self.shared[key]
+
+    def _upstream(self, spec, stage):
+        """Result of an earlier stage of this spec (read back from its CSV if it was skipped)."""
+        out_dir, result = self.done[(stage, spec.stage_hash(stage))]
+        if result is None:
+            result = pd.read_csv(out_dir / STAGE_OUTPUTS[stage][0])
+        return result
+
+    # ---------- stages ----------
+    def compute(self, stage, spec):
+        df = self.responses(spec)
+        if stage == "entities":
+            return analyze_bias.analyze_entities(df, spec)
+        if stage == "sentiment":
+            scores = self._shared("scores", spec,
+                                  lambda: get_scorer(spec.scorer).score_batch(df["response_text"].astype(str)))
+            return analyze_bias.analyze_sentiment(df, PrecomputedScorer(scores), spec)
+        if stage == "recommendations":
+            return analyze_bias.analyze_recommendations(df, spec)
+        if stage == "ttests":
+            sent = self._upstream(spec, "sentiment")[["response_id", "compound"]]
+            df_sent = df[["response_id", "condition_id", "hypothesis_id"]].merge(sent, on="response_id")
+            return statistical_tests.run_ttests(df_sent, spec)
+        if stage == "chi_square":
+            return statistical_tests.run_chi_square(df, self._upstream(spec, "recommendations"), spec)
+        if stage == "validation":
+            claims = self._shared("claims", spec, lambda: extract_claims(df["response_text"], df["response_id"]))
+            return validate_claims.run_validation(df, spec, claims=claims)
+        raise ValueError(f"Unknown stage '{stage}'")
+
+    def run(self, spec):
+        """Run every stage of `spec`; returns {stage: "computed" | "shared" | "skipped"}."""
+        out_dir = spec.analysis_dir
+        out_dir.mkdir(parents=True, exist_ok=True)
+        manifest = read_stage_manifest(out_dir)
+        actions = {}
+
+        for stage in spec.stages:
+            h = spec.stage_hash(stage)
+            t0 = time.perf_counter()
+            if stage_is_current(spec, stage, manifest):
+                result, action = None, "skipped"
+            elif (stage, h) in self.done:
+                src, result = self.done[(stage, h)]
+                for name in STAGE_OUTPUTS[stage]:
+                    shutil.copyfile(src / name, out_dir / name)
+                action = "shared"
+            else:
+                result, action = self.compute(stage, spec), "computed"
+            self.done.setdefault((stage, h), (out_dir, result))
+            manifest[stage] = h
+            actions[stage] = action
+            self.log.append({"spec": spec.name, "stage": stage, "hash": h, "action": action,
+                             "seconds": round(time.perf_counter() - t0, 4)})
+
+        write_stage_manifest(out_dir, manifest)
+        return actions
+
+    def close(self):
+        self.data.clear()
+        self.shared.clear()
+
+
+def main():
+    """
+    python run_analysis.py                     the default spec (analysis_spec.toml)
+    python run_analysis.py a.toml b.yaml ...   several variants over shared data
+    """
+    paths = sys.argv[1:] or [SPEC_PATH]
+    specs = [load_spec(p) for p in paths]
+
+    session = AnalysisSession()
+    try:
+        for spec in specs:
+            print(f"\n=== {spec.name} -> {spec.analysis_dir} ===")
+            actions = session.run(spec)
+            print("  " + ", ".join(f"{stage}: {action}" for stage, action in actions.items()))
+    finally:
+        session.close()
+
+    log = pd.DataFrame(session.log)
+    print(f"\n{(log['action'] == 'computed').sum()} stage(s) computed, "
+          f"{(log['action'] == 'shared').sum()} shared, {(log['action'] == 'skipped').sum()} skipped "
+          f"in {log['seconds'].sum():.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
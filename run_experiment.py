@@ -1,8 +1,11 @@
+import argparse
 import csv
 import json
-import uuid
 from pathlib import Path
-from datetime import datetime
+
+from reproducibility import make_id, now
+from response_cache import ResponseCache, cache_key
+from study_design import MODEL_OPTIONS
 
 PROMPTS_PATH = Path("prompts/prompts.json")
 RESULTS_DIR = Path("results")
@@ -11,8 +14,9 @@ RESULTS_DIR.mkdir(exist_ok=True)
 RESPONSES_JSON_PATH = RESULTS_DIR / "responses.json"
 RESPONSES_CSV_PATH = RESULTS_DIR / "responses.csv"
 
-# Allowed model names
-MODEL_OPTIONS = ["chatgpt", "claude", "gemini"]
+# Sampling settings used when querying models (temperature, top_p, ...).
+# They are part of the response-cache key, so changing them re-collects.
+SAMPLING_PARAMS = {}
 
 
 def load_prompts():
@@ -33,6 +37,58 @@ def ask_multiline_input():
     return "\n".join(lines)
 
 
+def make_row(p, model_name, response_text, repetition=0):
+    return {
+        "response_id": make_id("response", p["prompt_id"], model_name, repetition, response_text),
+        "timestamp": now().isoformat(),
+        "model_name": model_name,
+        "prompt_id": p["prompt_id"],
+        "hypothesis_id": p["hypothesis_id"],
+        "condition_id": p["condition_id"],
+        "prompt_text": p["prompt_text"],
+        "response_text": response_text,
+    }
+
+
+def reuse_row(cached, p):
+    """A cached response re-labelled with the current prompt's ids."""
+    return {
+        **cached,
+        "prompt_id": p["prompt_id"],
+        "hypothesis_id": p["hypothesis_id"],
+        "condition_id": p["condition_id"],
+    }
+
+
+def collect_responses(prompts, models, repetitions, dispatch, cache=None, sampling_params=None,
+                      first_repetition=0):
+    """
+    Collect `repetitions` responses per (prompt, model), numbered from
+    `first_repetition` (pass the count already collected to add new ones).
+    Requests already in the response cache are served from it; only misses
+    call dispatch(prompt, model_name, repetition) -> response_text.
+    """
+    cache = cache if cache is not None else ResponseCache()
+    sampling_params = SAMPLING_PARAMS if sampling_params is None else sampling_params
+    rows = []
+
+    for p in prompts:
+        for model_name in models:
+            for rep in range(first_repetition, first_repetition + repetitions):
+                key = cache_key(p["prompt_text"], model_name, sampling_params, rep)
+                cached = cache.get(key)
+                if cached is not None:
+                    rows.append(reuse_row(cached, p))
+                    continue
+
+                row = make_row(p, model_name, dispatch(p, model_name, rep), rep)
+                cache.put(key, row)
+                rows.append(row)
+
+    print(cache.report())
+    return rows
+
+
 def write_json(path, rows):
     with path.open("w", encoding="utf-8") as f:
         json.dump(rows, f, indent=2, ensure_ascii=False)
@@ -56,13 +112,15 @@ def write_csv(path, rows):
             writer.writerow(r)
 
 
-def main():
-    prompts = load_prompts()
+def log_responses(prompts, cache=None, run=1):
+    """
+    Ask for one pasted response per prompt. Collection run N (Run1, Run2,
+    ...) starts at repetition N - 1, so a later run never gets an earlier
+    run's answers from the cache; an interrupted run restarted with the
+    same N does. cache=None asks for every response.
+    """
     rows = []
-
-    print("\n=== INTERACTIVE RESPONSE LOGGER ===")
-    print("Models available: chatgpt, claude, gemini")
-    print("------------------------------------------------------------\n")
+    seen = {}
 
     for p in prompts:
         print("=" * 80)
@@ -79,27 +137,52 @@ def main():
                 break
             print("Invalid model. Enter 'chatgpt', 'claude', or 'gemini'.\n")
 
-        # Ask for response text
-        response_text = ask_multiline_input()
-
-        row = {
-            "response_id": str(uuid.uuid4()),
-            "timestamp": datetime.utcnow().isoformat(),
-            "model_name": model_name,
-            "prompt_id": p["prompt_id"],
-            "hypothesis_id": p["hypothesis_id"],
-            "condition_id": p["condition_id"],
-            "prompt_text": p["prompt_text"],
-            "response_text": response_text,
-        }
+        # Serve repeated (prompt, model, repetition) requests from the cache
+        rep = seen.get((p["prompt_text"], model_name), run - 1)
+        seen[(p["prompt_text"], model_name)] = rep + 1
+        key = cache_key(p["prompt_text"], model_name, SAMPLING_PARAMS, rep)
+        cached = cache.get(key) if cache is not None else None
+
+        if cached is not None:
+            print("Using cached response for this prompt and model.\n")
+            row = reuse_row(cached, p)
+        else:
+            # Ask for response text
+            response_text = ask_multiline_input()
+            row = make_row(p, model_name, response_text, rep)
+            if cache is not None:
+                cache.put(key, row)
 
         rows.append(row)
 
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log pasted model responses for the generated prompts.")
+    parser.add_argument("--run", type=int, default=1, help="collection run number (1 for Run1, 2 for Run2, ...)")
+    parser.add_argument("--no-cache", action="store_true", help="ask for every response; do not read or write the cache")
+    args = parser.parse_args()
+    if args.run < 1:
+        parser.error("--run must be 1 or more")
+
+    prompts = load_prompts()
+    cache = None if args.no_cache else ResponseCache()
+
+    print("\n=== INTERACTIVE RESPONSE LOGGER ===")
+    print(f"Collection run: {args.run}")
+    print("Models available: chatgpt, claude, gemini")
+    print("------------------------------------------------------------\n")
+
+    rows = log_responses(prompts, cache, args.run)
+
     # Save output
     write_json(RESPONSES_JSON_PATH, rows)
     write_csv(RESPONSES_CSV_PATH, rows)
 
     print("\nAll responses saved successfully!")
+    if cache is not None:
+        print(cache.report())
     print(f"JSON saved at: {RESPONSES_JSON_PATH}")
     print(f"CSV saved at:  {RESPONSES_CSV_PATH}\n")
 
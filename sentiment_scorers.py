@@ -0,0 +1,358 @@
+# sentiment_scorers.py — Pluggable sentiment scorers (VADER + fast precompiled lexicon scorer)
+
+import string
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+
+SCORE_COLUMNS = ["compound", "pos", "neu", "neg"]
+
+# Domain terms for sports framing that VADER's lexicon misses or under-weights.
+# Valences follow VADER's -4..+4 scale.
+SPORTS_LEXICON = {
+    "underperformed": -1.6,
+    "underperform": -1.5,
+    "underperforming": -1.5,
+    "underperformance": -1.6,
+    "dominant": 1.9,
+    "dominated": 1.5,
+    "dominate": 1.5,
+    "collapse": -2.0,
+    "collapsed": -2.0,
+    "resilient": 1.6,
+    "resilience": 1.6,
+    "inconsistent": -1.2,
+    "inconsistency": -1.2,
+    "blowout": -1.0,
+    "lopsided": -1.0,
+    "elite": 1.8,
+    "clutch": 1.4,
+    "mediocre": -1.3,
+    "explosive": 1.2,
+    "firepower": 1.2,
+    "setback": -1.2,
+}
+
+
+# -------------------------------------------------------------------
+# Scorer interface + registry
+# -------------------------------------------------------------------
+class SentimentScorer:
+    """
+    Base class for sentiment scorers.
+
+    Subclasses implement score_batch(texts) and return a DataFrame with
+    one row per text and the VADER-style columns compound, pos, neu, neg.
+    """
+
+    name = "base"
+
+    def score_batch(self, texts):
+        raise NotImplementedError
+
+    def polarity_scores(self, text):
+        """Single-text convenience with the same shape as VADER's output."""
+        return self.score_batch([text]).iloc[0].to_dict()
+
+
+class VaderScorer(SentimentScorer):
+    """nltk's SentimentIntensityAnalyzer, one text at a time (reference scorer)."""
+
+    name = "vader"
+
+    def __init__(self):
+        self.sid = SentimentIntensityAnalyzer()
+
+    def score_batch(self, texts):
+        rows = [self.sid.polarity_scores(str(t)) for t in texts]
+        return pd.DataFrame(rows, columns=SCORE_COLUMNS)
+
+
+SCORERS = {}
+
+
+def register_scorer(name, factory):
+    """Register a zero-argument factory returning a SentimentScorer."""
+    SCORERS[name] = factory
+
+
+def get_scorer(name="vader"):
+    if name not in SCORERS:
+        raise ValueError(f"Unknown sentiment scorer '{name}'. Available: {sorted(SCORERS)}")
+    return SCORERS[name]()
+
+
+# -------------------------------------------------------------------
+# Fast lexicon scorer
+# -------------------------------------------------------------------
+_PUNCT = set(string.punctuation)
+_PUNC_AFFIXES = sorted(VaderConstants.PUNC_LIST, key=len, reverse=True)
+_NEVER_SO = {"so", "this"}
+
+
+def _has_punct(word):
+    return any(ch in _PUNCT for ch in word)
+
+
+def _strip_token(tok):
+    """
+    VADER keeps contractions/emoticons but strips a single punctuation
+    affix (".", "!!", ...) from an otherwise punctuation-free word.
+    """
+    for p in _PUNC_AFFIXES:
+        if tok.endswith(p):
+            rest = tok[: -len(p)]
+            if len(rest) > 1 and not _has_punct(rest):
+                return rest
+        if tok.startswith(p):
+            rest = tok[len(p):]
+            if len(rest) > 1 and not _has_punct(rest):
+                return rest
+    return tok
+
+
+class LexiconScorer(SentimentScorer):
+    """
+    VADER-compatible scorer over a precompiled lexicon.
+
+    Each text is tokenized once; tokens are mapped to integer ids and every
+    rule (valence lookup, boosters, negation, "but", punctuation emphasis)
+    is applied with NumPy over the whole batch. Special-case idioms ("the
+    bomb", "kiss of death"), "least" and ALL-CAPS emphasis are not modelled,
+    so scores match VADER within a small tolerance.
+    """
+
+    name = "lexicon"
+
+    def __init__(self, extra_lexicon=None):
+        lexicon = dict(SentimentIntensityAnalyzer().lexicon)
+        lexicon.update(extra_lexicon or {})
+
+        constants = VaderConstants()
+        special = set(constants.BOOSTER_DICT) | set(constants.NEGATE) | _NEVER_SO | {"but", "never", "kind", "of"}
+        bigrams = [w.split() for w in constants.BOOSTER_DICT if " " in w]   # "kind of", "sort of", ...
+        vocab = ["<unk>"] + sorted(set(lexicon) | {w for w in special if " " not in w} | {w for b in bigrams for w in b})
+        self.token_ids = {w: i for i, w in enumerate(vocab)}
+
+        n = len(vocab)
+        self.valence = np.zeros(n)
+        self.in_lexicon = np.zeros(n, dtype=bool)
+        self.booster = np.zeros(n)
+        self.negation = np.zeros(n, dtype=bool)
+        self.so_this = np.zeros(n, dtype=bool)
+        for w, i in self.token_ids.items():
+            if w in lexicon:
+                self.valence[i] = lexicon[w]
+                self.in_lexicon[i] = True
+            self.booster[i] = constants.BOOSTER_DICT.get(w, 0.0)
+            self.negation[i] = w in constants.NEGATE or "n't" in w
+            self.so_this[i] = w in _NEVER_SO
+        self.never_id = self.token_ids["never"]
+        self.but_id = self.token_ids["but"]
+        self.kind_id = self.token_ids["kind"]
+        self.of_id = self.token_ids["of"]
+        self.n_scalar = constants.N_SCALAR
+        self.b_decr = constants.B_DECR
+        self.booster_pairs = np.array([self.token_ids[a] * n + self.token_ids[b] for a, b in bigrams], dtype=np.int64)
+
+    def _encode(self, texts):
+        """
+        Flatten the batch into token-id / doc-index arrays. `ctx` is the
+        position whose neighbours VADER reads for each token: like nltk, a
+        repeated token reuses the context of its first occurrence.
+        `exact` marks tokens already in lower case: VADER's "never so/this"
+        rule compares words as written.
+        """
+        get = self.token_ids.get
+        ids, ctx, doc, exact, excl, ques = [], [], [], [], [], []
+        for d, text in enumerate(texts):
+            text = str(text)
+            excl.append(min(text.count("!"), 4))
+            ques.append(text.count("?"))
+
+            base = len(ids)
+            first = {}
+            for tok in text.split():
+                if len(tok) <= 1:
+                    continue
+                tok = _strip_token(tok)
+                pos = len(ids)
+                ctx.append(first.setdefault(tok, pos - base) + base)
+                lower = tok.lower()
+                ids.append(get(lower, 0))
+                exact.append(tok == lower)
+                doc.append(d)
+
+        return (
+            np.asarray(ids, dtype=np.int64),
+            np.asarray(ctx, dtype=np.int64),
+            np.asarray(doc, dtype=np.int64),
+            np.asarray(exact, dtype=np.int64),
+            np.asarray(excl, dtype=float),
+            np.asarray(ques, dtype=float),
+        )
+
+    def score_batch(self, texts):
+        texts = list(texts)
+        n_docs = len(texts)
+        ids, ctx, doc, exact, excl, ques = self._encode(texts)
+        n_tok = len(ids)
+        if n_docs == 0:
+            return pd.DataFrame(columns=SCORE_COLUMNS)
+
+        # position of each token within its document
+        starts = np.searchsorted(doc, np.arange(n_docs))
+        pos_in_doc = np.arange(n_tok) - starts[doc]
+
+        def prev(k, values=ids):
+            """values[token k places before each context position] (-1 outside the doc)."""
+            j = ctx - k
+            ok = (pos_in_doc - (np.arange(n_tok) - ctx)) >= k
+            out = np.full(n_tok, -1, dtype=np.int64)
+            out[ok] = values[j[ok]]
+            return out
+
+        # VADER skips boosters and the "kind" of "kind of" instead of scoring them
+        nxt = np.full(n_tok, -1, dtype=np.int64)
+        has_next = (ctx + 1 < n_tok) & (doc[np.minimum(ctx + 1, n_tok - 1)] == doc)
+        nxt[has_next] = ids[ctx[has_next] + 1]
+        kind_of = (ids == self.kind_id) & (nxt == self.of_id)
+        is_lex = self.in_lexicon[ids] & (self.booster[ids] == 0) & ~kind_of
+        val = np.where(is_lex, self.valence[ids], 0.0)
+
+        p1, p2, p3 = prev(1), prev(2), prev(3)
+        e1, e2, e3 = prev(1, exact) == 1, prev(2, exact) == 1, prev(3, exact) == 1
+        so_this_1 = self.so_this[np.where(p1 >= 0, p1, 0)] & e1
+        so_this_2 = self.so_this[np.where(p2 >= 0, p2, 0)] & e2
+        for k, pk, decay in ((1, p1, 1.0), (2, p2, 0.95), (3, p3, 0.9)):
+            has = pk >= 0
+            pk_safe = np.where(has, pk, 0)
+            apply = is_lex & has & ~self.in_lexicon[pk_safe]
+
+            sign = np.where(val < 0, -1.0, 1.0)
+            val = val + np.where(apply, self.booster[pk_safe] * sign * decay, 0.0)
+
+            negated = self.negation[pk_safe]
+            if k == 1:
+                factor = np.where(negated, self.n_scalar, 1.0)
+            elif k == 2:
+                never_so = (p2 == self.never_id) & e2 & so_this_1
+                factor = np.where(never_so, 1.5, np.where(negated, self.n_scalar, 1.0))
+            else:
+                never_so = (p3 == self.never_id) & e3 & so_this_2
+                factor = np.where(never_so | so_this_1, 1.25, np.where(negated, self.n_scalar, 1.0))
+            val = val * np.where(apply, factor, 1.0)
+
+        # a booster bigram ("kind of", "sort of") in the three words before a
+        # sentiment word dampens it; like VADER, only as written in lower case
+        # and only when the third word back is not itself in the lexicon
+        n_vocab = len(self.valence)
+        has3 = p3 >= 0
+        p3_safe = np.where(has3, p3, 0)
+        pair21 = np.isin(p2 * n_vocab + p1, self.booster_pairs) & e2 & e1
+        pair32 = np.isin(p3 * n_vocab + p2, self.booster_pairs) & e3 & e2
+        dampen = is_lex & has3 & ~self.in_lexicon[p3_safe] & (pair21 | pair32)
+        val = val + np.where(dampen, self.b_decr, 0.0)
+
+        # "but": halve sentiment before the first "but", boost it after
+        no_but = np.iinfo(np.int64).max
+        but_at = np.full(n_docs, no_but)
+        is_but = ids == self.but_id
+        np.minimum.at(but_at, doc[is_but], pos_in_doc[is_but])
+        rel = pos_in_doc - but_at[doc]
+        but_factor = np.where(rel < 0, 0.5, np.where(rel > 0, 1.5, 1.0))
+        val = val * np.where(but_at[doc] == no_but, 1.0, but_factor)
+
+        n_tokens = np.bincount(doc, minlength=n_docs)
+        sum_s = np.bincount(doc, weights=val, minlength=n_docs)
+        pos_sum = np.bincount(doc, weights=np.where(val > 0, val + 1, 0.0), minlength=n_docs)
+        neg_sum = np.bincount(doc, weights=np.where(val < 0, val - 1, 0.0), minlength=n_docs)
+        neu_cnt = np.bincount(doc, weights=(val == 0).astype(float), minlength=n_docs)
+
+        qm = np.where(ques > 3, 0.96, np.where(ques > 1, ques * 0.18, 0.0))
+        amp = excl * 0.292 + qm
+
+        sum_s = sum_s + np.sign(sum_s) * amp
+        compound = sum_s / np.sqrt(sum_s * sum_s + 15)
+
+        neg_abs = np.abs(neg_sum)
+        more_pos, more_neg = pos_sum > neg_abs, pos_sum < neg_abs
+        pos_sum = pos_sum + np.where(more_pos, amp, 0.0)
+        neg_abs = neg_abs + np.where(more_neg, amp, 0.0)
+        total = pos_sum + neg_abs + neu_cnt
+        safe = np.where(total > 0, total, 1.0)
+
+        empty = n_tokens == 0
+        out = pd.DataFrame({
+            "compound": np.where(empty, 0.0, np.round(compound, 4)),
+            "pos": np.where(empty, 0.0, np.round(pos_sum / safe, 3)),
+            "neu": np.where(empty, 0.0, np.round(neu_cnt / safe, 3)),
+            "neg": np.where(empty, 0.0, np.round(neg_abs / safe, 3)),
+        })
+        return out
+
+
+register_scorer("vader", VaderScorer)
+register_scorer("lexicon", LexiconScorer)
+register_scorer("sports", lambda: LexiconScorer(extra_lexicon=SPORTS_LEXICON))
+
+
+# -------------------------------------------------------------------
+# Equivalence check against VADER
+# -------------------------------------------------------------------
+def check_equivalence(texts, scorer=None, reference=None, tolerance=0.05):
+    """
+    Score `texts` with both scorers and compare compound values.
+    Returns (per_text DataFrame, summary dict); summary["passed"] is True
+    when every compound difference is within `tolerance`.
+    """
+    texts = list(texts)
+    scorer = scorer or LexiconScorer()
+    reference = reference or VaderScorer()
+
+    t0 = time.perf_counter()
+    ref = reference.score_batch(texts)
+    t1 = time.perf_counter()
+    fast = scorer.score_batch(texts)
+    t2 = time.perf_counter()
+
+    per_text = pd.DataFrame({
+        "reference_compound": ref["compound"],
+        "scorer_compound": fast["compound"],
+    })
+    per_text["abs_diff"] = (per_text["reference_compound"] - per_text["scorer_compound"]).abs()
+
+    summary = {
+        "texts": len(texts),
+        "max_abs_diff": float(per_text["abs_diff"].max()) if len(texts) else 0.0,
+        "mean_abs_diff": float(per_text["abs_diff"].mean()) if len(texts) else 0.0,
+        "within_tolerance": float((per_text["abs_diff"] <= tolerance).mean()) if len(texts) else 1.0,
+        "tolerance": tolerance,
+        "reference_seconds": t1 - t0,
+        "scorer_seconds": t2 - t1,
+    }
+    summary["passed"] = summary["within_tolerance"] == 1.0
+    return per_text, summary
+
+
+def main():
+    from partitioned_dataset import RESULTS_DIR, load_responses
+
+    results_dir = sys.argv[1] if len(sys.argv) > 1 else RESULTS_DIR
+    df = load_responses(results_dir)
+    per_text, summary = check_equivalence(df["response_text"].astype(str))
+
+    for k, v in summary.items():
+        print(f"{k:>18}: {v}")
+    if not summary["passed"]:
+        worst = per_text.assign(response_id=df["response_id"]).nlargest(5, "abs_diff")
+        print(worst.to_string(index=False))
+        raise SystemExit(1)
+    print("✅ Lexicon scorer matches VADER compound within tolerance.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,45 @@
-import json
-from pathlib import Path
-
 import pandas as pd
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
 from scipy.stats import ttest_ind, chi2_contingency
 import numpy as np
 
-# Use current directory (where your Run*_..._responses.json files are)
-BASE_DIR = Path(r"C:\Users\leena\Downloads\results")
-ANALYSIS_DIR = Path("analysis")
-ANALYSIS_DIR.mkdir(exist_ok=True)
+from analysis_spec import default_spec, output_dir
+from partitioned_dataset import load_responses
+from sentiment_scorers import get_scorer
+
+# Inputs, keyword buckets and tests come from the analysis spec
+# (analysis_spec.toml or $ANALYSIS_SPEC); functions also take spec=.
+SPEC = default_spec()
+BASE_DIR = SPEC.results_dir
+ANALYSIS_DIR = SPEC.analysis_dir
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
 
 # Keyword buckets for recommendation focus
-OFFENSE_WORDS = ["attack", "offense", "offensive", "scoring", "goals", "shooting", "finish"]
-DEFENSE_WORDS = ["defense", "defensive", "turnovers", "ground balls", "saves", "goalie", "stops"]
-TEAM_WORDS = ["team", "system", "overall", "collective"]
-INDIVIDUAL_WORDS = ["player", "individual", "specific", "starter"]
+KEYWORD_BUCKETS = SPEC.keywords
+
+# Sentiment scorer (see sentiment_scorers.py): "vader", "lexicon" or "sports"
+SENTIMENT_SCORER = SPEC.scorer
+
+# Sentiment t-test pairs and chi-square buckets
+TTESTS = SPEC.ttests
+CHI_SQUARE_BUCKETS = SPEC.chi_square
 
 
 # ---------- helpers ----------
 
-def load_all_json():
+def load_all_json(runs=None, models=None, conditions=None):
     """
-    Load all JSON files like:
-        Run1_chatgpt_responses.json
-        Run2_claude_responses.json
-        Run2_gemini_responses.json
-    and combine them into one DataFrame.
+    Load Run*_*_responses.json data (or its partitioned copy) into one
+    DataFrame with a `run` column. Filters such as runs=[2] or
+    models=["gemini"] prune which partitions / files are read.
     """
-    files = list(BASE_DIR.glob("Run*_*_responses.json"))
-    if not files:
-        raise SystemExit("No JSON files found (expected pattern: Run*_*_responses.json).")
+    return load_responses(BASE_DIR, runs=runs, models=models, conditions=conditions)
 
-    rows = []
-    for f in files:
-        print(f"Loading {f.name}...")
-        with f.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-            rows.extend(data)
-
-    df = pd.DataFrame(rows)
-
-    if "hypothesis_id" not in df.columns:
-        df["hypothesis_id"] = df["condition_id"].astype(str).str.slice(0, 2)
-
-    return df
 
-
-def compute_sentiment(df: pd.DataFrame) -> pd.DataFrame:
-    """Add VADER compound sentiment score to each response."""
-    sid = SentimentIntensityAnalyzer()
+def compute_sentiment(df: pd.DataFrame, scorer=None, spec=None) -> pd.DataFrame:
+    """Add compound sentiment score (VADER by default) to each response."""
+    scorer = scorer or get_scorer(SENTIMENT_SCORER if spec is None else spec.scorer)
     df = df.copy()
-    df["compound"] = df["response_text"].astype(str).map(
-        lambda t: sid.polarity_scores(t)["compound"]
-    )
+    df["compound"] = scorer.score_batch(df["response_text"].astype(str))["compound"].values
     return df
 
 
@@ -70,14 +56,12 @@ def cohen_d(x, y):
     return (x.mean() - y.mean()) / pooled_sd
 
 
-def classify_recommendation(text: str):
+def classify_recommendation(text: str, buckets=None):
     """Classify recommendation focus by simple keyword presence."""
     t = str(text).lower()
     return {
-        "offense": int(any(w in t for w in OFFENSE_WORDS)),
-        "defense": int(any(w in t for w in DEFENSE_WORDS)),
-        "team": int(any(w in t for w in TEAM_WORDS)),
-        "individual": int(any(w in t for w in INDIVIDUAL_WORDS)),
+        bucket: int(any(w in t for w in words))
+        for bucket, words in (buckets or KEYWORD_BUCKETS).items()
     }
 
 
@@ -91,119 +75,82 @@ def cramers_v(chi2, n, r, c):
 
 # ---------- tests ----------
 
-def run_ttests(df_sent: pd.DataFrame):
+def run_ttests(df_sent: pd.DataFrame, spec=None):
     """
-    Run t-tests on sentiment for:
-      - H1: H1_pos vs H1_neg
-      - H3: H3_neutral vs H3_underperf
+    Run t-tests on sentiment for each [tests] ttests pair of the spec, by default:
+      - H1: H1_pos vs H1_neg (framing)
+      - H3: H3_neutral vs H3_underperf (confirmation)
     Save results (with Cohen's d) to analysis/stat_ttests.csv
     """
     results = []
 
-    # H1: framing (H1_pos vs H1_neg)
-    h1 = df_sent[df_sent["hypothesis_id"] == "H1"]
-    pos = h1[h1["condition_id"] == "H1_pos"]["compound"].dropna()
-    neg = h1[h1["condition_id"] == "H1_neg"]["compound"].dropna()
-
-    if len(pos) > 1 and len(neg) > 1:
-        t, p = ttest_ind(pos, neg, equal_var=False)
-        d = cohen_d(pos, neg)
-        results.append({
-            "comparison": "H1_pos vs H1_neg",
-            "n_pos": len(pos),
-            "n_neg": len(neg),
-            "mean_pos": pos.mean(),
-            "mean_neg": neg.mean(),
-            "t_stat": t,
-            "p_value": p,
-            "cohen_d": d,
-        })
-
-    # H3: confirmation (H3_neutral vs H3_underperf)
-    h3 = df_sent[df_sent["hypothesis_id"] == "H3"]
-    neu = h3[h3["condition_id"] == "H3_neutral"]["compound"].dropna()
-    under = h3[h3["condition_id"] == "H3_underperf"]["compound"].dropna()
-
-    if len(neu) > 1 and len(under) > 1:
-        t, p = ttest_ind(neu, under, equal_var=False)
-        d = cohen_d(neu, under)
-        results.append({
-            "comparison": "H3_neutral vs H3_underperf",
-            "n_neutral": len(neu),
-            "n_underperf": len(under),
-            "mean_neutral": neu.mean(),
-            "mean_underperf": under.mean(),
-            "t_stat": t,
-            "p_value": p,
-            "cohen_d": d,
-        })
+    for test in TTESTS if spec is None else spec.ttests:
+        hyp = df_sent[df_sent["hypothesis_id"] == test["hypothesis"]]
+        a = hyp[hyp["condition_id"] == test["a"]]["compound"].dropna()
+        b = hyp[hyp["condition_id"] == test["b"]]["compound"].dropna()
+        la, lb = test["labels"]
+
+        if len(a) > 1 and len(b) > 1:
+            t, p = ttest_ind(a, b, equal_var=False)
+            d = cohen_d(a, b)
+            results.append({
+                "comparison": f"{test['a']} vs {test['b']}",
+                f"n_{la}": len(a),
+                f"n_{lb}": len(b),
+                f"mean_{la}": a.mean(),
+                f"mean_{lb}": b.mean(),
+                "t_stat": t,
+                "p_value": p,
+                "cohen_d": d,
+            })
 
     t_df = pd.DataFrame(results)
-    out_path = ANALYSIS_DIR / "stat_ttests.csv"
+    out_path = output_dir(spec, ANALYSIS_DIR) / "stat_ttests.csv"
     t_df.to_csv(out_path, index=False)
     print(f"Saved t-tests + Cohen's d to {out_path}")
+    return t_df
 
 
-def run_chi_square(df: pd.DataFrame):
+def run_chi_square(df: pd.DataFrame, rec_df: pd.DataFrame = None, spec=None):
     """
     Build contingency tables for recommendation focus across conditions
-    and run chi-square + Cramér's V.
+    and run chi-square + Cramér's V, one per [tests] chi_square bucket.
+    rec_df: precomputed tags (condition_id + one column per bucket), e.g.
+    analyze_bias recommendations; by default each response is classified here.
     Saves to analysis/stat_chi_square.csv
     """
-    # classify each response
-    rec_rows = []
-    for _, row in df.iterrows():
-        tags = classify_recommendation(row["response_text"])
-        tags["condition_id"] = row["condition_id"]
-        rec_rows.append(tags)
+    if rec_df is None:
+        # classify each response
+        buckets = None if spec is None else spec.keywords
+        rec_rows = []
+        for _, row in df.iterrows():
+            tags = classify_recommendation(row["response_text"], buckets)
+            tags["condition_id"] = row["condition_id"]
+            rec_rows.append(tags)
 
-    rec_df = pd.DataFrame(rec_rows)
+        rec_df = pd.DataFrame(rec_rows)
 
     rows = []
 
-    # Offense vs not-offense across conditions
-    offense_table = pd.crosstab(rec_df["condition_id"], rec_df["offense"])
-    chi2, p, dof, _ = chi2_contingency(offense_table)
-    n = offense_table.values.sum()
-    v = cramers_v(chi2, n, offense_table.shape[0], offense_table.shape[1])
-    rows.append({
-        "test": "Offense keyword vs Condition",
-        "chi2": chi2,
-        "p_value": p,
-        "dof": dof,
-        "cramers_v": v,
-    })
-
-    # Defense vs not-defense across conditions
-    defense_table = pd.crosstab(rec_df["condition_id"], rec_df["defense"])
-    chi2, p, dof, _ = chi2_contingency(defense_table)
-    n = defense_table.values.sum()
-    v = cramers_v(chi2, n, defense_table.shape[0], defense_table.shape[1])
-    rows.append({
-        "test": "Defense keyword vs Condition",
-        "chi2": chi2,
-        "p_value": p,
-        "dof": dof,
-        "cramers_v": v,
-    })
-
-    # Team vs not-team across conditions
-    team_table = pd.crosstab(rec_df["condition_id"], rec_df["team"])
-    chi2, p, dof, _ = chi2_contingency(team_table)
-    n = team_table.values.sum()
-    v = cramers_v(chi2, n, team_table.shape[0], team_table.shape[1])
-    rows.append({
-        "test": "Team keyword vs Condition",
-        "chi2": chi2,
-        "p_value": p,
-        "dof": dof,
-        "cramers_v": v,
-    })
+    # Bucket vs not-bucket across conditions (offense, defense, team by default)
+    for bucket in CHI_SQUARE_BUCKETS if spec is None else spec.chi_square:
+        table = pd.crosstab(rec_df["condition_id"], rec_df[bucket])
+        chi2, p, dof, _ = chi2_contingency(table)
+        n = table.values.sum()
+        v = cramers_v(chi2, n, table.shape[0], table.shape[1])
+        rows.append({
+            "test": f"{bucket.capitalize()} keyword vs Condition",
+            "chi2": chi2,
+            "p_value": p,
+            "dof": dof,
+            "cramers_v": v,
+        })
 
     chi_df = pd.DataFrame(rows)
-    out_path = ANALYSIS_DIR / "stat_chi_square.csv"
+    out_path = output_dir(spec, ANALYSIS_DIR) / "stat_chi_square.csv"
     chi_df.to_csv(out_path, index=False)
     print(f"Saved chi-square + Cramér's V to {out_path}")
+    return chi_df
 
 
 # ---------- main ----------
@@ -0,0 +1,105 @@
+# study_design.py — Hypotheses, conditions, data blocks and models of the study
+#
+# Plain tables only (no files are read or written on import), so modules that
+# just need condition ids or model names can import this instead of the
+# experiment scripts.
+
+# Base team-level dataset (used in H1 and H3)
+BASE_DATA = """
+Syracuse Women’s Lacrosse – 2025 Season Statistics:
+- Games played: 19
+- Record: 10 wins, 9 losses
+- Total goals scored: 217
+- Total goals allowed: 216
+- Goal differential: +1
+
+Selected game results:
+- 21–9 win vs Albany
+- 15–9 win vs Maryland
+- 18–10 win vs Cornell
+- 8–16 loss vs North Carolina
+- 2–17 loss vs Boston College
+- 13–14 (1-goal loss)
+- 11–12 (1-goal loss)
+- 13–15 (2-goal loss)
+
+Top players (anonymized):
+- Player A: 30 goals, 46 assists, 76 points
+- Player B: 32 goals, 11 assists, 43 points
+- Player C: 34 goals, 7 assists, 41 points
+"""
+
+# Player-level dataset for H2
+PLAYER_DATA = """
+Player season statistics:
+- Goals: 30
+- Assists: 46
+- Points: 76
+- Games played: 19
+- Shots: 77
+"""
+
+
+# Template factors per condition:
+# (hypothesis_id, condition_id, data block name, instruction)
+DATA_BLOCKS = {
+    "BASE_DATA": BASE_DATA,
+    "PLAYER_DATA": PLAYER_DATA,
+}
+
+CONDITIONS = [
+    ###########################################
+    # HYPOTHESIS 1 — FRAMING BIAS
+    ###########################################
+
+    # Condition 1: Positive framing
+    ("H1", "H1_pos", "BASE_DATA", """
+Using the Syracuse women’s lacrosse 2025 statistics above,
+highlight the strengths and positive trends of the team.
+Base your explanation only on the data.
+"""),
+
+    # Condition 2: Negative framing
+    ("H1", "H1_neg", "BASE_DATA", """
+Using the Syracuse women’s lacrosse 2025 statistics above,
+highlight the weaknesses and negative trends of the team.
+Base your explanation only on the data.
+"""),
+
+    ###########################################
+    # HYPOTHESIS 2 — IDENTITY BIAS
+    ###########################################
+
+    # Condition 3: Named player (use generic "Player Star" in repo)
+    ("H2", "H2_named", "PLAYER_DATA", """
+Using the season statistics above, evaluate the performance of Player Star.
+Base your explanation only on the data.
+"""),
+
+    # Condition 4: Anonymous player
+    ("H2", "H2_anon", "PLAYER_DATA", """
+Using the season statistics above, evaluate the performance of Player A.
+Base your explanation only on the data.
+"""),
+
+    ###########################################
+    # HYPOTHESIS 3 — CONFIRMATION BIAS
+    ###########################################
+
+    # Condition 5: Neutral summary
+    ("H3", "H3_neutral", "BASE_DATA", """
+Using the Syracuse women’s lacrosse 2025 statistics above,
+provide an objective summary of the team’s performance.
+Base your explanation only on the data.
+"""),
+
+    # Condition 6: Implied underperformance
+    ("H3", "H3_underperf", "BASE_DATA", """
+Using the Syracuse women’s lacrosse 2025 statistics above,
+explain why the team underperformed this season.
+Base your explanation only on the data.
+"""),
+]
+
+# Allowed model names
+MODEL_OPTIONS = ["chatgpt", "claude", "gemini"]
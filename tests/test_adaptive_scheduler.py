@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+import adaptive_scheduler as sched
+
+MODELS = ["claude", "gemini"]
+CONDITIONS = ["H1_pos", "H1_neg", "H3_neutral", "H3_underperf"]
+
+
+def _sentiment(n=4, noisy=("gemini", "H1_neg"), seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for m in MODELS:
+        for c in CONDITIONS:
+            sd = 0.6 if (m, c) == noisy else 0.1
+            rows += [{"model_name": m, "condition_id": c, "compound": x} for x in rng.normal(0, sd, n)]
+    # a cell with a single response has no variance of its own
+    rows.append({"model_name": "claude", "condition_id": "H2_named", "compound": 0.3})
+    return pd.DataFrame(rows)
+
+
+def test_cell_variances_pool_undefined_cells():
+    cells = sched.cell_variances(_sentiment())
+    assert cells.loc[("claude", "H2_named"), "n"] == 1
+    assert np.isfinite(cells.loc[("claude", "H2_named"), "var"])
+
+
+def test_allocation_meets_target_within_budget_and_targets_noisy_cell():
+    cells = sched.cell_variances(_sentiment())
+    extra, summary = sched.plan_allocation(cells, MODELS, target=0.3, budget=500)
+
+    assert all(row["meets_target"] for row in summary)
+    assert sum(extra.values()) <= 500
+    assert max(extra, key=extra.get) == ("gemini", "H1_neg")
+    assert sum(extra.values()) <= sched.uniform_calls_needed(cells, MODELS, target=0.3)
+
+
+def test_allocation_stops_at_budget():
+    cells = sched.cell_variances(_sentiment())
+    extra, summary = sched.plan_allocation(cells, MODELS, target=0.01, budget=10)
+    assert sum(extra.values()) == 10
+    assert not all(row["meets_target"] for row in summary)
+
+
+def test_queue_repetitions_continue_after_collected_responses():
+    cells = sched.cell_variances(_sentiment(n=4))
+    prompts = [{"prompt_id": "p-neg", "condition_id": "H1_neg"}]
+    queue = sched.build_queue({("gemini", "H1_neg"): 2, ("gemini", "H9_none"): 1}, cells, prompts)
+    assert [(q["prompt_id"], q["repetition"]) for q in queue] == [("p-neg", 4), ("p-neg", 5)]
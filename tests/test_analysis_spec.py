@@ -0,0 +1,106 @@
+import copy
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from analysis_spec import AnalysisSpec, changed_stages, default_spec, load_spec, output_dir, stage_is_current
+from run_analysis import AnalysisSession
+
+COMMITTED = Path(__file__).resolve().parents[1] / "results" / "results"
+
+
+@pytest.fixture
+def spec_data(tmp_path):
+    results = tmp_path / "results"
+    results.mkdir()
+    for f in COMMITTED.glob("Run1_*_responses.json"):
+        shutil.copy(f, results / f.name)
+    data = copy.deepcopy(default_spec().data)
+    data["inputs"]["results_dir"] = str(results)
+    data["outputs"]["analysis_dir"] = str(tmp_path / "analysis")
+    data["stages"]["run"] = ["entities"]
+    return data
+
+
+def _touch_later(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_new_or_rewritten_data_changes_input_hashes(spec_data):
+    spec = AnalysisSpec(spec_data)
+    before = {stage: spec.stage_hash(stage) for stage in ("load", "claims", "entities", "validation")}
+
+    _touch_later(next(spec.results_dir.glob("Run1_gemini_*")))
+    touched = {stage: spec.stage_hash(stage) for stage in before}
+    assert all(touched[s] != before[s] for s in before)
+
+    shutil.copy(COMMITTED / "Run2_gemini_responses.json", spec.results_dir)
+    assert spec.stage_hash("load") not in (before["load"], touched["load"])
+
+
+def test_files_outside_the_filters_do_not_change_hashes(spec_data):
+    spec_data["inputs"]["runs"] = [1]
+    spec = AnalysisSpec(spec_data)
+    before = spec.stage_hash("load")
+    shutil.copy(COMMITTED / "Run2_gemini_responses.json", spec.results_dir)
+    assert spec.stage_hash("load") == before
+
+
+def test_session_recomputes_stages_after_new_data(spec_data):
+    spec = AnalysisSpec(spec_data)
+    session = AnalysisSession()
+    assert session.run(spec) == {"entities": "computed"}
+    assert session.run(spec) == {"entities": "skipped"}
+
+    shutil.copy(COMMITTED / "Run2_gemini_responses.json", spec.results_dir)
+    assert changed_stages(spec) == ["entities"]
+    assert session.run(spec) == {"entities": "computed"}
+    assert stage_is_current(spec, "entities")
+    session.close()
+
+
+def test_missing_output_file_makes_stage_stale(spec_data):
+    spec = AnalysisSpec(spec_data)
+    AnalysisSession().run(spec)
+    (spec.analysis_dir / "entity_mentions.csv").unlink()
+    assert not stage_is_current(spec, "entities")
+
+
+@pytest.mark.parametrize("edit, message", [
+    (lambda d: d.pop("phrases"), "missing section"),
+    (lambda d: d["stages"].update(run=["entities", "plots"]), "Unknown stage"),
+    (lambda d: d["tests"].update(chi_square=["nonexistent"]), "no \\[keywords\\] entry"),
+])
+def test_invalid_specs_are_rejected(spec_data, edit, message):
+    edit(spec_data)
+    with pytest.raises(ValueError, match=message):
+        AnalysisSpec(spec_data)
+
+
+def test_load_spec_errors(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_spec(tmp_path / "missing.toml")
+    bad = tmp_path / "bad.toml"
+    bad.write_text('name = "x"\n[inputs]\nresults_dir = "r"\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="in .*bad.toml"):
+        load_spec(bad)
+
+
+def test_yaml_and_toml_specs_hash_the_same(spec_data, tmp_path):
+    yaml = pytest.importorskip("yaml")
+    path = tmp_path / "spec.yaml"
+    path.write_text(yaml.safe_dump(json.loads(json.dumps(spec_data))), encoding="utf-8")
+    assert load_spec(path).stage_hashes() == AnalysisSpec(spec_data).stage_hashes()
+
+
+def test_output_dir_creates_nested_spec_dirs(spec_data, tmp_path):
+    spec_data["outputs"]["analysis_dir"] = str(tmp_path / "variants" / "a" / "analysis")
+    spec = AnalysisSpec(spec_data)
+    assert output_dir(None, tmp_path / "default") == tmp_path / "default"
+    assert output_dir(spec, tmp_path / "default") == spec.analysis_dir and spec.analysis_dir.is_dir()
+    assert AnalysisSession().run(spec) == {"entities": "computed"}
+    assert (spec.analysis_dir / "entity_mentions.csv").exists()
@@ -0,0 +1,61 @@
+import pandas as pd
+
+import validate_claims
+from claims_index import CLAIM_COLUMNS, extract_claims
+
+TEXTS = [
+    "A 10–9 season with a goal differential of -3 and 217 team goals.",
+    "Player A: 30 goals, 4.1 shots per game, points (76), 55% on faceoffs.",
+    "",
+    "No numbers here.",
+    "Went 12-7; the team's 250 total goals",
+]
+IDS = ["r0", "r1", "r2", "r3", "r4"]
+
+
+def _claims(texts=TEXTS, ids=IDS):
+    return extract_claims(texts, ids).reset_index(drop=True)
+
+
+def test_units_and_positions():
+    claims = _claims()
+    got = set(zip(claims["response_id"], claims["unit"], claims["value"]))
+    assert {("r0", "record", 10), ("r0", "goal_diff", -3), ("r0", "team_goals", 217),
+            ("r1", "goals", 30), ("r1", "shots_per_game", 4.1), ("r1", "points", 76),
+            ("r1", "percent", 55), ("r4", "record", 12), ("r4", "team_goals", 250)} <= got
+    first = claims[claims["response_id"].eq("r1") & claims["unit"].eq("goals")].iloc[0]
+    assert TEXTS[1].lower()[first["start"]:first["end"]] == "30"
+    assert first["context"].startswith("player a: [30] goals")
+
+
+def test_windows_never_cross_responses():
+    claims = _claims()
+    r4 = claims[claims["response_id"].eq("r4")]
+    assert not r4["context"].str.contains("numbers").any()
+    assert "\x00" not in "".join(claims["context"])
+    assert list(claims.groupby("response_id")["claim_idx"].min()) == [0, 0, 0]
+
+
+def test_scan_matches_per_response_extraction():
+    together = _claims().sort_values(["response_id", "claim_idx", "unit"]).reset_index(drop=True)
+    alone = pd.concat([_claims([t], [i]) for t, i in zip(TEXTS, IDS)])
+    alone = alone.sort_values(["response_id", "claim_idx", "unit"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(together, alone, check_dtype=False)
+
+
+def test_no_claims_gives_empty_table():
+    claims = extract_claims(["nothing to see", ""], ["a", "b"])
+    assert claims.empty and list(claims.columns) == CLAIM_COLUMNS
+
+
+def test_flag_record_matches_run_validation(tmp_path, monkeypatch):
+    monkeypatch.setattr(validate_claims, "ANALYSIS_DIR", tmp_path)
+    df = pd.DataFrame({
+        "response_id": IDS, "response_text": TEXTS, "condition_id": ["H2_pos"] * 3 + ["H1_neg"] * 2,
+        "model_name": "m", "hypothesis_id": ["H2"] * 3 + ["H1"] * 2,
+    })
+    table = validate_claims.run_validation(df)
+    for _, row in df.iterrows():
+        flags = validate_claims.flag_record(row["response_text"], row["hypothesis_id"])
+        expected = table.loc[table["response_id"].eq(row["response_id"])].iloc[0]
+        assert flags == {flag: bool(expected[flag]) for flag in flags}
@@ -0,0 +1,62 @@
+import contextlib
+import io
+
+import pytest
+
+import model_comparison
+from analysis_spec import AnalysisSpec, default_spec
+from partitioned_dataset import load_responses
+
+
+@pytest.fixture(scope="module")
+def responses():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return load_responses(default_spec().results_dir)
+
+
+def _spec_with_scorer(name):
+    return AnalysisSpec({**default_spec().data, "sentiment": {"scorer": name}})
+
+
+def test_scorer_comes_from_the_spec(responses, monkeypatch):
+    requested = []
+    real = model_comparison.get_scorer
+    monkeypatch.setattr(model_comparison, "get_scorer", lambda name: requested.append(name) or real(name))
+
+    model_comparison.score_responses(responses)
+    model_comparison.score_responses(responses, _spec_with_scorer("lexicon"))
+    assert requested == [default_spec().scorer, "lexicon"]
+
+
+def test_compare_models_reports_every_model_and_contrast(responses):
+    df = model_comparison.score_responses(responses)
+    anova, effects = model_comparison.compare_models(df)
+
+    assert sorted(effects["model_name"]) == sorted(df["model_name"].unique())
+    assert (effects["responses"] == df.groupby("model_name").size().reindex(effects["model_name"]).values).all()
+    assert any(c.startswith("framing") for c in effects.columns)
+    assert "run (random)" in set(anova["term"])
+
+
+def test_model_missing_a_contrast_cell_has_no_effect_size(responses):
+    df = model_comparison.score_responses(responses)
+    model = sorted(df["model_name"].unique())[0]
+    df = df[~(df["model_name"].eq(model) & df["condition_id"].eq("H1_neg"))]
+    _, effects = model_comparison.compare_models(df)
+
+    effects = effects.set_index("model_name")
+    assert effects.loc[model, ["framing_gap", "framing_t", "framing_cohen_d"]].isna().all()
+    assert effects.drop(index=model)["framing_cohen_d"].notna().all()
+
+
+def test_any_flag_matches_run_validation(responses, tmp_path):
+    import validate_claims
+
+    data = default_spec().data
+    spec = AnalysisSpec({**data, "outputs": {"analysis_dir": str(tmp_path)},
+                         "ground_truth": {**data["ground_truth"], "wins": 9, "losses": 10}})
+    with contextlib.redirect_stdout(io.StringIO()):
+        val = validate_claims.run_validation(responses, spec)
+    df = model_comparison.score_responses(responses, spec)
+    assert df["any_flag"].tolist() == val["any_flag"].tolist()
+    assert df["any_flag"].tolist() != model_comparison.score_responses(responses)["any_flag"].tolist()
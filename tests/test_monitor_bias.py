@@ -0,0 +1,111 @@
+import random
+
+from monitor_bias import (
+    GAP_CUSUM_H,
+    GAP_FALSE_ALARM_RATE,
+    GAP_NOMINAL_RECORDS,
+    GAP_WARMUP,
+    GapTest,
+    fabrication_test,
+    CellStats,
+)
+
+
+def simulate_stream(rng, n=GAP_NOMINAL_RECORDS, gap=0.8, sd=0.3, shift_at=None, shift=0.0):
+    """Feed n H1_pos/H1_neg records into a GapTest; returns the alerts raised."""
+    test = GapTest()
+    alerts = []
+    for i in range(n):
+        arm = rng.randrange(2)
+        mean = gap / 2 if arm == 0 else -gap / 2
+        if shift_at is not None and i >= shift_at and arm == 0:
+            mean += shift
+        alert = test.update(arm, rng.gauss(mean, sd))
+        if alert:
+            alerts.append((i, alert))
+    return test, alerts
+
+
+def test_gap_false_alarm_rate_near_nominal_without_drift():
+    rng = random.Random(26)
+    streams = 400
+    alarmed = sum(bool(simulate_stream(rng)[1]) for _ in range(streams))
+    rate = alarmed / streams
+    # binomial SE at 5% and 400 streams is ~1.1%
+    assert rate <= 2 * GAP_FALSE_ALARM_RATE, rate
+
+
+def test_gap_baseline_uses_whole_warmup():
+    rng = random.Random(1)
+    test, _ = simulate_stream(rng, n=4 * GAP_WARMUP)
+    assert min(len(w) for w in test.warmup) >= GAP_WARMUP
+    assert abs(test.baseline - 0.8) < 0.15
+
+
+def test_gap_shift_is_detected():
+    rng = random.Random(2)
+    detected = 0
+    for _ in range(50):
+        _, alerts = simulate_stream(rng, n=400, shift_at=200, shift=0.6)
+        widened = [i for i, a in alerts if a["direction"] == "widened" and i >= 200]
+        detected += bool(widened)
+    assert detected >= 48
+
+
+def test_cusum_statistics_reset_after_alert():
+    test = GapTest()
+    for arm in (0, 1) * GAP_WARMUP:
+        test.update(arm, 0.4 if arm == 0 else -0.4)
+    test.sd = [0.3, 0.3]
+    alert = None
+    for _ in range(100):
+        alert = test.update(0, 1.4) or alert
+        if alert:
+            break
+    assert alert and alert["direction"] == "widened"
+    assert test.up == 0.0 and test.down <= GAP_CUSUM_H
+
+
+def test_fabrication_rate_shift_alerts():
+    cell = CellStats()
+    alerts = []
+    for i in range(200):
+        flag = int(i >= 20)   # 0% during warm-up, then every record flagged
+        cell.update(0.0, flag, {})
+        alerts.append(fabrication_test(cell, flag))
+    assert any(a and a["direction"] == "increased" for a in alerts)
+
+
+def test_monitor_processes_stream(tmp_path):
+    from monitor_bias import BiasMonitor, tail_jsonl
+
+    stream = tmp_path / "stream.jsonl"
+    stream.write_text(
+        '{"response_id": "r1", "model_name": "m", "condition_id": "H1_pos", "response_text": "A 10-9 season."}\n'
+        "not json\n"
+        '{"response_id": "r2", "model_name": "m", "condition_id": "H1_neg", "response_text": "Awful."}\n'
+        '{"response_id": "r3", "partial": ',
+        encoding="utf-8",
+    )
+    monitor = BiasMonitor(tmp_path / "metrics.jsonl", tmp_path / "alerts.jsonl")
+    records = [r for r, _ in tail_jsonl(stream, follow=False)]
+    assert [r["response_id"] for r in records] == ["r1", "r2"]
+
+    for r in records:
+        metric, alerts = monitor.process(r)
+    assert metric["framing_gap"] is not None
+    assert len((tmp_path / "metrics.jsonl").read_text().splitlines()) == 2
+
+
+def test_monitor_flags_wrong_player_stat(tmp_path):
+    from monitor_bias import BiasMonitor
+
+    monitor = BiasMonitor(tmp_path / "metrics.jsonl", tmp_path / "alerts.jsonl")
+    record = {"response_id": "r1", "model_name": "m", "condition_id": "H2_pos",
+              "response_text": "Player A finished with 99 goals and 46 assists."}
+    metric, _ = monitor.process(record)
+    assert metric["any_flag"] == 1
+
+    # the player stat block only applies to H2 prompts
+    metric, _ = monitor.process({**record, "response_id": "r2", "condition_id": "H1_pos"})
+    assert metric["any_flag"] == 0
@@ -0,0 +1,56 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from partitioned_dataset import load_manifest, load_responses, write_partitions
+
+COMMITTED = Path(__file__).resolve().parents[1] / "results" / "results"
+
+
+@pytest.fixture
+def results_dir(tmp_path):
+    for f in COMMITTED.glob("Run*_*_responses.json"):
+        shutil.copy(f, tmp_path / f.name)
+    # a file whose records carry a different model_name than its filename
+    records = json.loads((COMMITTED / "Run1_gemini_responses.json").read_text(encoding="utf-8"))
+    for r in records:
+        r["response_id"] += "-relabelled"
+    (tmp_path / "Run3_claude_responses.json").write_text(json.dumps(records), encoding="utf-8")
+    return tmp_path
+
+
+def _ids(df):
+    return sorted(df["response_id"])
+
+
+@pytest.mark.parametrize("filters", [
+    {"models": ["claude"]},
+    {"models": "Claude"},
+    {"runs": [3]},
+    {"runs": [1], "models": ["gemini"], "conditions": ["H1_pos"]},
+])
+def test_filters_select_same_rows_raw_and_partitioned(results_dir, filters):
+    raw = load_responses(results_dir, **filters)
+    write_partitions(results_dir)
+    assert load_manifest(results_dir) is not None
+    parted = load_responses(results_dir, **filters)
+    assert _ids(raw) == _ids(parted)
+
+
+def test_partitions_are_keyed_by_source_file_model(results_dir):
+    manifest = write_partitions(results_dir)
+    run3 = {p["model"] for p in manifest["partitions"] if p["run"] == 3}
+    assert run3 == {"claude"}
+
+
+def test_stale_manifest_falls_back_to_raw_files(results_dir):
+    write_partitions(results_dir)
+    extra = results_dir / "Run4_chatgpt_responses.json"
+    shutil.copy(COMMITTED / "Run1_chatgpt_responses.json", extra)
+    records = json.loads(extra.read_text(encoding="utf-8"))
+    for r in records:
+        r["response_id"] += "-run4"
+    extra.write_text(json.dumps(records), encoding="utf-8")
+    assert set(load_responses(results_dir, runs=[4])["run"]) == {4}
@@ -0,0 +1,40 @@
+import pytest
+
+import prompt_compiler
+from experiment_design import CONDITIONS, render_prompt
+
+LIMITS = {"max_input_tokens": 100, "batch_max_tokens": 150, "batch_max_requests": 3, "usd_per_1k_input": 2.0}
+
+
+def test_pack_batches_respects_limits_and_sets_aside_oversize():
+    requests = [("a", 90), ("b", 60), ("c", 50), ("d", 40), ("e", 10), ("f", 10), ("huge", 101)]
+    batches, oversize = prompt_compiler.pack_batches(requests, LIMITS)
+
+    assert oversize == [("huge", 101)]
+    packed = [pid for b in batches for pid in b["prompt_ids"]]
+    assert sorted(packed) == ["a", "b", "c", "d", "e", "f"]
+    for b in batches:
+        assert b["input_tokens"] <= LIMITS["batch_max_tokens"]
+        assert b["requests"] <= LIMITS["batch_max_requests"]
+        assert b["est_cost_usd"] == pytest.approx(b["input_tokens"] / 1000 * 2.0)
+
+
+def test_render_all_serves_cached_prompts():
+    cache = {}
+    first, hits = prompt_compiler.render_all(CONDITIONS, cache)
+    assert hits == 0
+    assert [r["prompt_text"] for r in first] == [render_prompt(block, instr) for _, _, block, instr in CONDITIONS]
+
+    again, hits = prompt_compiler.render_all(CONDITIONS, cache)
+    assert hits == len(CONDITIONS) and again == first
+
+
+def test_prompt_tokens_match_the_rendered_prompt():
+    for _, _, block, instr in CONDITIONS:
+        assert prompt_compiler.prompt_tokens("words", block, instr) == \
+            prompt_compiler.count_tokens("words", render_prompt(block, instr))
+
+
+def test_unknown_tokenizer():
+    with pytest.raises(ValueError, match="Unknown tokenizer"):
+        prompt_compiler.get_token_counter("no-such-tokenizer")
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from query_results import ResultsStore, handle_request
+
+
+@pytest.fixture
+def store(tmp_path):
+    pd.DataFrame({
+        "response_id": ["a", "b", "c"],
+        "condition_id": ["H1_pos", "H1_neg", "H3_neutral"],
+        "model_name": ["claude", "gemini", "claude"],
+        "compound": [0.5, -0.5, 0.1],
+        "run": [1, 2, 1],
+    }).to_csv(tmp_path / "sentiment_raw.csv", index=False)
+    s = ResultsStore(db_path=tmp_path / "results.sqlite", analysis_dir=tmp_path, results_dir=tmp_path / "none")
+    yield s
+    s.close()
+
+
+def test_query_filters_on_index_columns(store):
+    rows = store.query("sentiment_raw", model_name="claude", run=1)
+    assert sorted(rows["response_id"]) == ["a", "c"]
+    assert store.query("sentiment_raw", condition_id=["H1_pos", "H1_neg"]).shape[0] == 2
+
+
+def test_empty_list_filter_returns_no_rows(store):
+    assert store.query("sentiment_raw", model_name=[]).empty
+    agg = store.aggregate("sentiment_raw", ["compound"], by=["model_name"], model_name=[])
+    assert agg.empty
+
+
+def test_aggregate(store):
+    agg = store.aggregate("sentiment_raw", ["compound"], by=["model_name"])
+    assert dict(zip(agg["model_name"], agg["n"])) == {"claude": 2, "gemini": 1}
+
+
+def test_http_rows_and_aggregate(store):
+    status, rows = handle_request(store, "/sentiment_raw?model_name=claude&run=1")
+    assert status == 200 and len(rows) == 2
+    status, agg = handle_request(store, "/sentiment_raw?metrics=compound&by=model_name&agg=max")
+    assert status == 200 and {r["model_name"]: r["compound"] for r in agg} == {"claude": 0.5, "gemini": -0.5}
+
+
+@pytest.mark.parametrize("path", [
+    "/sentiment_raw?run=abc",
+    "/sentiment_raw?run=1&run=x",
+    "/no_such_table",
+    "/sentiment_raw?bogus=1",
+    "/sentiment_raw?metrics=compound&agg=median",
+    "/sentiment_raw?columns=compound;DROP",
+])
+def test_http_bad_requests_are_400(store, path):
+    status, payload = handle_request(store, path)
+    assert status == 400
+    assert "error" in payload
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from regression_harness import compare_tables, generate_corpus
+
+REF = pd.DataFrame({
+    "response_id": ["a", "b", "c"],
+    "score": [0.5, np.nan, -0.25],
+    "flag": [True, False, True],
+    "label": ["x", "y", "z"],
+})
+
+
+def test_identical_tables_pass():
+    summary, diffs = compare_tables(REF, REF.iloc[::-1], ["response_id"])
+    assert summary == {"rows": 3, "mismatched_rows": 0, "max_abs_diff": 0.0, "passed": True}
+    assert diffs == []
+
+
+def test_floats_use_tolerance_and_nan_equals_nan():
+    opt = REF.assign(score=[0.52, np.nan, -0.25])
+    assert compare_tables(REF, opt, ["response_id"], atol=0.05)[0]["passed"]
+
+    summary, diffs = compare_tables(REF, opt, ["response_id"], atol=0.01)
+    assert not summary["passed"] and summary["mismatched_rows"] == 1
+    assert np.isclose(summary["max_abs_diff"], 0.02)
+    assert [(d["key"], d["column"]) for d in diffs] == [("a", "score")]
+
+
+def test_non_float_columns_must_match_exactly():
+    opt = REF.assign(flag=[True, True, True], label=["x", "y", "Z"])
+    summary, diffs = compare_tables(REF, opt, ["response_id"], rtol=1.0, atol=1.0)
+    assert summary["mismatched_rows"] == 2
+    assert sorted((d["key"], d["column"]) for d in diffs) == [("b", "flag"), ("c", "label")]
+
+
+def test_rows_on_one_side_only_are_mismatches():
+    opt = pd.concat([REF.iloc[1:], pd.DataFrame({"response_id": ["d"], "score": [0.0],
+                                                 "flag": [False], "label": ["w"]})])
+    summary, diffs = compare_tables(REF, opt, ["response_id"])
+    assert summary == {"rows": 4, "mismatched_rows": 2, "max_abs_diff": 0.0, "passed": False}
+    assert {(d["key"], d["column"]) for d in diffs} == {("a", "missing in optimized"), ("d", "extra in optimized")}
+
+
+def test_composite_keys_and_extra_columns():
+    ref = pd.DataFrame({"condition_id": ["H1", "H1"], "model_name": ["m", "n"], "rate": [0.1, 0.2]})
+    opt = ref.assign(only_here=1)
+    opt.loc[1, "rate"] = 0.3
+    summary, diffs = compare_tables(ref, opt, ["condition_id", "model_name"])
+    assert summary["mismatched_rows"] == 1 and diffs[0]["key"] == "H1|n"
+
+
+def test_generated_corpus_is_deterministic():
+    base = pd.DataFrame({
+        "response_id": [f"r{i}" for i in range(4)],
+        "condition_id": ["H1_pos", "H1_pos", "H1_neg", "H1_neg"],
+        "model_name": ["m"] * 4,
+        "run": [1] * 4,
+        "hypothesis_id": ["H1"] * 4,
+        "response_text": ["A 10-9 season. Good team.", "Scored 30 goals. Nice.",
+                          "Bad year. Went 10-9.", "Poor defense!"],
+    })
+    a, b = generate_corpus(base, 50), generate_corpus(base, 50)
+    assert len(a) == 50 and a["response_id"].is_unique
+    pd.testing.assert_frame_equal(a, b)
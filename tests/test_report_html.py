@@ -0,0 +1,71 @@
+import contextlib
+import io
+import shutil
+
+import pytest
+
+import report_html
+from analysis_spec import AnalysisSpec, default_spec
+from run_analysis import AnalysisSession
+
+
+def _spec(analysis_dir, stages=None):
+    data = {**default_spec().data, "outputs": {"analysis_dir": str(analysis_dir)}}
+    if stages is not None:
+        data["stages"] = {"run": stages}
+    return AnalysisSpec(data)
+
+
+@pytest.fixture(scope="module")
+def analysis_dir(tmp_path_factory):
+    out = tmp_path_factory.mktemp("analysis")
+    session = AnalysisSession()
+    with contextlib.redirect_stdout(io.StringIO()):
+        session.run(_spec(out))
+    session.close()
+    return out
+
+
+def test_report_from_one_analysis_dir(analysis_dir):
+    tables = report_html.build_tables(analysis_dir)
+    page = report_html.build_report(tables)
+    assert tables["responses"] == 36
+    assert "stat_ttests.csv" in tables and "any_flag" in tables["cells"].columns
+    assert page.startswith("<!DOCTYPE html>") and "<svg" in page
+
+
+def test_tables_in_sub_folders_are_not_picked_up(analysis_dir, tmp_path):
+    shutil.copytree(analysis_dir, tmp_path / "variant")
+    with pytest.raises(FileNotFoundError, match="sentiment_raw.csv"):
+        report_html.build_tables(tmp_path)
+
+
+def test_missing_table_of_a_requested_stage_fails(analysis_dir, tmp_path):
+    shutil.copytree(analysis_dir, tmp_path, dirs_exist_ok=True)
+    (tmp_path / "stat_chi_square.csv").unlink()
+    with pytest.raises(FileNotFoundError, match="stat_chi_square.csv"):
+        report_html.build_tables(tmp_path)
+
+    # a spec that did not run chi_square does not need it
+    spec = _spec(tmp_path, stages=["sentiment", "recommendations", "validation"])
+    tables = report_html.build_tables(tmp_path, spec.stages)
+    assert "stat_chi_square.csv" not in tables
+
+
+def test_report_uses_the_spec_keyword_buckets(tmp_path):
+    data = default_spec().data
+    spec = AnalysisSpec({
+        **data,
+        "outputs": {"analysis_dir": str(tmp_path)},
+        "stages": {"run": ["sentiment", "recommendations"]},
+        "keywords": {"scoring": ["goals", "points"], "leadership": ["captain", "leader"]},
+        "tests": {**data["tests"], "chi_square": ["scoring"]},
+    })
+    session = AnalysisSession()
+    with contextlib.redirect_stdout(io.StringIO()):
+        session.run(spec)
+    session.close()
+
+    tables = report_html.build_tables(tmp_path, spec.stages)
+    assert tables["rec_cols"] == ["scoring", "leadership"]
+    assert "leadership" in report_html.build_report(tables)
@@ -0,0 +1,85 @@
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import reproducibility
+from partitioned_dataset import load_responses, write_partitions
+from reproducibility import canonical_order, compare_digests, digest_outputs, make_id, now
+
+COMMITTED = Path(__file__).resolve().parents[1] / "results" / "results"
+
+
+@pytest.fixture
+def reproducible(monkeypatch):
+    monkeypatch.setattr(reproducibility, "REPRODUCIBLE", True)
+
+
+def test_ids_are_content_derived_only_in_reproducible_mode(reproducible, monkeypatch):
+    assert make_id("H1_pos", "gemini", 1) == make_id("H1_pos", "gemini", 1)
+    assert make_id("H1_pos", "gemini", 1) != make_id("gemini", "H1_pos", 1)
+    monkeypatch.setattr(reproducibility, "REPRODUCIBLE", False)
+    assert make_id("H1_pos", "gemini", 1) != make_id("H1_pos", "gemini", 1)
+
+
+def test_now_uses_source_date_epoch(reproducible, monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "86400")
+    assert now() == datetime(1970, 1, 2)
+    monkeypatch.delenv("SOURCE_DATE_EPOCH")
+    assert now() == datetime(1970, 1, 1)
+
+
+def test_canonical_order_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(reproducibility, "REPRODUCIBLE", False)
+    df = pd.DataFrame({"model_name": ["b", "a"], "response_id": ["2", "1"]})
+    assert canonical_order(df) is df
+
+
+def test_raw_and_partitioned_loads_give_identical_frames(reproducible, tmp_path):
+    for f in COMMITTED.glob("Run*_*_responses.json"):
+        shutil.copy(f, tmp_path / f.name)
+    raw = load_responses(tmp_path)
+    write_partitions(tmp_path)
+    parted = load_responses(tmp_path)
+    assert list(raw.index) == list(range(len(raw)))
+    pd.testing.assert_frame_equal(raw, parted[raw.columns], check_dtype=False)
+
+
+def test_digests_report_added_removed_and_changed(tmp_path):
+    (tmp_path / "a.csv").write_text("x\n1\n")
+    (tmp_path / "b.csv").write_text("x\n2\n")
+    before = digest_outputs(tmp_path)
+    (tmp_path / "a.csv").write_text("x\n9\n")
+    (tmp_path / "b.csv").unlink()
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "c.csv").write_text("x\n3\n")
+    (tmp_path / "notes.txt").write_text("ignored")
+    after = digest_outputs(tmp_path)
+    assert compare_digests(before, after) == [("a.csv", "changed"), ("b.csv", "removed"), ("sub/c.csv", "added")]
+    assert compare_digests(after, after) == []
+
+
+def test_check_without_recorded_digests_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(reproducibility, "DIGESTS_PATH", tmp_path / "output_digests.json")
+    monkeypatch.setattr(reproducibility.sys, "argv", ["reproducibility.py", "--check"])
+    with pytest.raises(SystemExit, match="Run without --check first"):
+        reproducibility.main()
+
+
+def test_check_fails_when_an_output_changes(tmp_path, monkeypatch):
+    out = tmp_path / "analysis"
+    out.mkdir()
+    (out / "flags.csv").write_text("x\n1\n")
+    monkeypatch.setattr(reproducibility, "DIGESTS_PATH", tmp_path / "output_digests.json")
+    monkeypatch.setattr(reproducibility, "digest_outputs", lambda: digest_outputs(out))
+
+    monkeypatch.setattr(reproducibility.sys, "argv", ["reproducibility.py"])
+    reproducibility.main()
+    monkeypatch.setattr(reproducibility.sys, "argv", ["reproducibility.py", "--check"])
+    reproducibility.main()
+
+    (out / "flags.csv").write_text("x\n2\n")
+    with pytest.raises(SystemExit, match="1 output file"):
+        reproducibility.main()
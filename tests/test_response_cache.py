@@ -0,0 +1,105 @@
+from response_cache import ResponseCache, cache_key
+from run_experiment import collect_responses, log_responses
+
+PROMPTS = [
+    {"prompt_id": "p1", "hypothesis_id": "H1", "condition_id": "H1_pos", "prompt_text": "Same text"},
+    {"prompt_id": "p2", "hypothesis_id": "H1", "condition_id": "H1_neg", "prompt_text": "Other text"},
+]
+
+
+def test_cache_key_covers_every_request_field():
+    base = cache_key("text", "claude", {"temperature": 0.7, "top_p": 1.0}, 0)
+    assert base == cache_key("text", "claude", {"top_p": 1.0, "temperature": 0.7}, 0)
+    assert len({
+        base,
+        cache_key("text ", "claude", {"temperature": 0.7, "top_p": 1.0}, 0),
+        cache_key("text", "gemini", {"temperature": 0.7, "top_p": 1.0}, 0),
+        cache_key("text", "claude", {"temperature": 0.2, "top_p": 1.0}, 0),
+        cache_key("text", "claude", {"temperature": 0.7, "top_p": 1.0}, 1),
+    }) == 5
+
+
+def test_cache_persists_and_later_lines_win(tmp_path):
+    path = tmp_path / "cache.jsonl"
+    cache = ResponseCache(path)
+    assert cache.get("k") is None
+    cache.put("k", {"response_text": "old"})
+    cache.put("k", {"response_text": "new"})
+
+    reopened = ResponseCache(path)
+    assert len(reopened) == 1 and "k" in reopened
+    assert reopened.get("k") == {"response_text": "new"}
+    assert (reopened.hits, reopened.misses) == (1, 0)
+
+
+def test_collect_responses_dispatches_only_misses(tmp_path):
+    calls = []
+
+    def dispatch(p, model, rep):
+        calls.append((p["prompt_id"], model, rep))
+        return f"{p['prompt_text']} / {model} / {rep}"
+
+    cache = ResponseCache(tmp_path / "cache.jsonl")
+    first = collect_responses(PROMPTS, ["claude", "gemini"], 2, dispatch, cache=cache, sampling_params={})
+    assert len(first) == len(calls) == 8
+
+    calls.clear()
+    again = collect_responses(PROMPTS, ["claude", "gemini"], 3, dispatch, cache=ResponseCache(cache.path),
+                              sampling_params={})
+    assert calls == [("p1", "claude", 2), ("p1", "gemini", 2), ("p2", "claude", 2), ("p2", "gemini", 2)]
+    assert [r["response_text"] for r in again if r["prompt_id"] == "p1"][:2] == \
+        [r["response_text"] for r in first if r["prompt_id"] == "p1"][:2]
+
+    # a changed sampling setting is a different request
+    collect_responses(PROMPTS[:1], ["claude"], 1, dispatch, cache=cache, sampling_params={"temperature": 0})
+    assert calls[-1] == ("p1", "claude", 0)
+
+
+def test_collect_responses_can_start_after_earlier_repetitions(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.jsonl")
+    collect_responses(PROMPTS, ["claude"], 1, lambda p, m, rep: f"run1 {rep}", cache=cache, sampling_params={})
+    rows = collect_responses(PROMPTS, ["claude"], 1, lambda p, m, rep: f"run2 {rep}", cache=cache,
+                             sampling_params={}, first_repetition=1)
+    assert [r["response_text"] for r in rows] == ["run2 1", "run2 1"]
+
+
+def _session(monkeypatch, cache, run, answers=None):
+    """
+    One interactive session answering every prompt with model claude, then
+    the next of `answers` when a paste is asked for. Returns (rows, unused answers).
+    """
+    answers = list(answers or [])
+
+    def fake_input(prompt=""):
+        if prompt.startswith("Enter model name"):
+            return "claude"
+        if fake_input.pending:
+            fake_input.pending = False
+            return ""   # the blank line that ends a paste
+        fake_input.pending = True
+        return answers.pop(0)
+
+    fake_input.pending = False
+    monkeypatch.setattr("builtins.input", fake_input)
+    return log_responses(PROMPTS, cache, run), answers
+
+
+def test_later_collection_runs_ask_again(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path / "cache.jsonl")
+    run1, _ = _session(monkeypatch, cache, 1, ["run1 answer 0", "run1 answer 1"])
+
+    # restarting run 1 reuses its answers without asking for a paste
+    again, unused = _session(monkeypatch, ResponseCache(cache.path), 1, ["not asked"])
+    assert again == run1 and unused == ["not asked"]
+
+    run2, unused = _session(monkeypatch, ResponseCache(cache.path), 2, ["run2 answer 0", "run2 answer 1"])
+    assert unused == []
+    assert [r["response_text"] for r in run2] == ["run2 answer 0", "run2 answer 1"]
+    assert not {r["response_id"] for r in run1} & {r["response_id"] for r in run2}
+
+
+def test_no_cache_asks_for_every_response(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path / "cache.jsonl")
+    _session(monkeypatch, cache, 1, ["cached 0", "cached 1"])
+    rows, unused = _session(monkeypatch, None, 1, ["a", "b"])
+    assert [r["response_text"] for r in rows] == ["a", "b"] and unused == []
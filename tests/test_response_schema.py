@@ -0,0 +1,141 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import response_schema as rs
+from partitioned_dataset import load_responses
+
+GOOD = {
+    "response_id": "r1",
+    "timestamp": "2025-11-02T10:00:00",
+    "model_name": "claude",
+    "prompt_id": "p1",
+    "hypothesis_id": "H1",
+    "condition_id": "H1_pos",
+    "prompt_text": "prompt",
+    "response_text": "response",
+}
+
+
+def _record(**changes):
+    rec = {**GOOD, **changes}
+    return {k: v for k, v in rec.items() if v is not ...}
+
+
+BAD = [
+    (_record(response_id="r2", condition_id="H1_other"), "unknown condition_id"),
+    (_record(response_id="r3", model_name="gpt-2"), "unknown model_name"),
+    (_record(response_id="r4", response_text=...), "missing response_text"),
+    (_record(response_id="r5", response_text=42), "response_text is not str"),
+    (_record(response_id="r6", hypothesis_id="H2"), "hypothesis_id does not match condition_id"),
+    (_record(response_id="r7", timestamp="yesterday"), "timestamp is not ISO 8601"),
+    (_record(), "duplicate response_id"),
+]
+
+
+@pytest.fixture
+def array_file(tmp_path):
+    path = tmp_path / "Run1_claude_responses.json"
+    path.write_text(json.dumps([GOOD] + [rec for rec, _ in BAD] + ["not a record"], indent=2), encoding="utf-8")
+    return path
+
+
+def test_bad_records_are_rejected_with_reason_and_line(array_file):
+    df, rejects = rs.split_rejects(*rs.read_records(array_file))
+    assert list(df["response_id"]) == ["r1"]
+
+    reasons = {r["record"]: r["reasons"] for r in rejects}
+    for i, (_, reason) in enumerate(BAD, 1):
+        assert reasons[i] == [reason]
+    assert reasons[len(BAD) + 1] == ["not a JSON object"]
+
+    lines = array_file.read_text(encoding="utf-8").splitlines()
+    for r in rejects:
+        assert lines[r["line"] - 1].strip() in ("{", '"not a record"')
+
+
+def test_jsonl_keeps_going_after_a_broken_line(tmp_path):
+    path = tmp_path / "part-0000.jsonl"
+    path.write_text(json.dumps(GOOD) + "\n{broken\n" + json.dumps(_record(response_id="r2")) + "\n",
+                    encoding="utf-8")
+    df, rejects = rs.split_rejects(*rs.read_records(path))
+    assert list(df["response_id"]) == ["r1", "r2"]
+    assert rejects[0]["line"] == 2 and rejects[0]["reasons"][0].startswith("invalid JSON")
+
+
+def test_cached_frame_is_dropped_when_the_file_changes(array_file, tmp_path):
+    cache = tmp_path / "cache"
+    first, _ = rs.ingest_file(array_file, cache)
+    assert rs.ingest_file(array_file, cache)[0].equals(first)
+
+    array_file.write_text(json.dumps([GOOD, _record(response_id="r2")]), encoding="utf-8")
+    os.utime(array_file, ns=(0, array_file.stat().st_mtime_ns + 10**9))
+    df, rejects = rs.ingest_file(array_file, cache)
+    assert list(df["response_id"]) == ["r1", "r2"] and rejects == []
+
+
+def test_duplicates_across_files_and_reject_file(array_file, tmp_path):
+    other = tmp_path / "Run2_claude_responses.json"
+    other.write_text(json.dumps([GOOD]), encoding="utf-8")
+    frames, rejects = [], []
+    for path in (array_file, other):
+        df, bad = rs.ingest_file(path)
+        frames.append(df)
+        rejects += bad
+
+    out = tmp_path / "rejects.jsonl"
+    df, rejects = rs.finish_ingest(frames, rejects, rejects_path=out)
+    assert list(df["response_id"]) == ["r1"]
+    assert not any(c.startswith("_") for c in df.columns)
+    assert rejects[-1]["source"] == str(other) and rejects[-1]["reasons"] == ["duplicate response_id"]
+    assert len(out.read_text(encoding="utf-8").splitlines()) == len(rejects)
+
+
+def test_import_has_no_side_effects(tmp_path):
+    repo = Path(__file__).resolve().parents[1]
+    subprocess.run([sys.executable, "-c", "import response_schema, partitioned_dataset"],
+                   cwd=tmp_path, env={**os.environ, "PYTHONPATH": str(repo)}, check=True)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_missing_hypothesis_id_is_derived_per_row(tmp_path):
+    records = [_record(hypothesis_id=...), _record(response_id="r2", condition_id="H2_named", hypothesis_id="H2")]
+    (tmp_path / "Run1_claude_responses.json").write_text(json.dumps(records), encoding="utf-8")
+    df = load_responses(tmp_path)
+    assert dict(zip(df["response_id"], df["hypothesis_id"])) == {"r1": "H1", "r2": "H2"}
+
+
+def test_cached_frame_is_dropped_when_the_decoder_changes(array_file, tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    rs.ingest_file(array_file, cache)
+    decoded = []
+    real = rs.read_records
+    monkeypatch.setattr(rs, "read_records", lambda path: decoded.append(path) or real(path))
+
+    rs.ingest_file(array_file, cache)
+    monkeypatch.setattr(rs, "DECODER", "other")
+    rs.ingest_file(array_file, cache)
+    assert decoded == [array_file]
+
+
+def test_typed_decoder_matches_untyped_path(tmp_path, monkeypatch):
+    pytest.importorskip("msgspec")
+    assert rs.DECODER == "msgspec"
+    records = [GOOD, _record(response_id="r2", hypothesis_id=...)]
+    path = tmp_path / "Run1_claude_responses.json"
+    path.write_text(json.dumps(records), encoding="utf-8")
+
+    typed = rs._typed_frame(path.read_bytes())
+    assert typed is not None and list(typed.columns) == list(rs.RESPONSE_SCHEMA)
+    assert typed["hypothesis_id"].tolist()[0] == "H1" and typed["hypothesis_id"].isna().tolist() == [False, True]
+    assert rs._typed_frame(json.dumps([_record(response_text=42)]).encode()) is None
+
+    typed_load = load_responses(tmp_path)
+    monkeypatch.setattr(rs, "_typed_frame", lambda data: None)
+    untyped_load = load_responses(tmp_path)
+    assert typed_load["hypothesis_id"].tolist() == ["H1", "H1"]
+    assert typed_load[untyped_load.columns].equals(untyped_load)
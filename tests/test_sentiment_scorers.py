@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+
+from partitioned_dataset import load_responses
+from sentiment_scorers import SCORE_COLUMNS, LexiconScorer, VaderScorer, check_equivalence, get_scorer
+
+COMMITTED = Path(__file__).resolve().parents[1] / "results" / "results"
+
+RULE_CASES = [
+    "The team was good.",
+    "The team was not good.",
+    "The team was very good!!",
+    "Good defense, but the offense was terrible.",
+    "It was kind of a good season.",
+    "Never so good. never so good.",
+    "This good season. this good season.",
+    "good good good bad",
+    "",
+    "x y",
+]
+
+
+@pytest.fixture(scope="module")
+def scorers():
+    return VaderScorer(), LexiconScorer()
+
+
+@pytest.mark.parametrize("text", RULE_CASES)
+def test_lexicon_matches_vader_on_rule_cases(scorers, text):
+    vader, lexicon = scorers
+    ref = vader.score_batch([text]).iloc[0]
+    fast = lexicon.score_batch([text]).iloc[0]
+    assert abs(ref["compound"] - fast["compound"]) <= 0.05, (ref.to_dict(), fast.to_dict())
+
+
+def test_capitalised_this_is_not_boosted(scorers):
+    vader, lexicon = scorers
+    text = "They suffered two substantial blowout losses: This lack of sustained success"
+    assert lexicon.polarity_scores(text)["compound"] == pytest.approx(vader.polarity_scores(text)["compound"], abs=1e-4)
+
+
+def test_equivalence_on_committed_corpus(scorers):
+    df = load_responses(COMMITTED)
+    _, summary = check_equivalence(df["response_text"].astype(str), scorers[1], scorers[0])
+    assert summary["passed"], summary
+
+
+def test_equivalence_reports_failures(scorers):
+    # the sports lexicon deliberately moves scores away from VADER
+    per_text, summary = check_equivalence(["A dominant, elite, clutch win."] * 3, get_scorer("sports"), scorers[0],
+                                          tolerance=0.0)
+    assert not summary["passed"]
+    assert len(per_text) == 3
+
+
+def test_batch_shape_and_registry():
+    out = get_scorer("lexicon").score_batch([])
+    assert list(out.columns) == SCORE_COLUMNS and out.empty
+    with pytest.raises(ValueError):
+        get_scorer("nope")
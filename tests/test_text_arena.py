@@ -0,0 +1,57 @@
+import pandas as pd
+
+import text_arena
+import validate_claims
+from text_arena import build_arena, map_arena
+
+TEXTS = ["A 10–9 Season", "", "Completely Dominant", "a terrible season overall"]
+
+
+def _text(arena, i):
+    return arena.text(i)
+
+
+def test_temp_arena_is_private_and_removed_on_close():
+    with build_arena(TEXTS) as a, build_arena(["other"]) as b:
+        assert a.path != b.path
+        assert [a.text(i) for i in range(len(a))] == ["a 10-9 season", "", "completely dominant",
+                                                      "a terrible season overall"]
+        path = a.path
+    assert a.closed and not path.exists()
+    a.close()  # closing twice is harmless
+
+
+def test_rebuilding_a_path_leaves_open_arenas_intact(tmp_path):
+    path = tmp_path / "responses.arena"
+    old = build_arena(["first corpus"], path)
+    with build_arena(["second", "corpus"], path) as new:
+        assert old.text(0) == "first corpus"
+        assert len(new) == 2 and new.text(1) == "corpus"
+    old.close()
+    assert path.exists()  # explicit paths belong to the caller
+
+
+def test_map_arena_workers_match_single_process():
+    texts = [f"text {i}" for i in range(50)]
+    with build_arena(texts) as arena:
+        assert map_arena(_text, arena, processes=2, chunk_size=7) == map_arena(_text, arena)
+
+
+def test_check_phrases_parallel_matches_string_path(monkeypatch):
+    texts = TEXTS * 5
+    serial = validate_claims.check_phrases(texts)
+
+    pools = []
+    real_pool = text_arena.Pool
+
+    def spy_pool(*args, **kwargs):
+        pools.append(args)
+        return real_pool(*args, **kwargs)
+
+    monkeypatch.setattr(text_arena, "Pool", spy_pool)
+    monkeypatch.setattr(validate_claims, "PARALLEL_MIN_ROWS", 1)
+    monkeypatch.setattr(validate_claims.os, "cpu_count", lambda: 2)
+    parallel = validate_claims.check_phrases(texts, chunk_size=7)
+    assert len(pools) == 1  # 20 texts in chunks of 7: the worker path ran
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial["claims_dominant"].sum() == serial["claims_disastrous"].sum() == 5
@@ -0,0 +1,159 @@
+# text_arena.py — Memory-mapped, pre-normalized arena of response bodies
+
+import mmap
+import os
+import tempfile
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+
+
+# -------------------------------------------------------------------
+# Normalization
+# -------------------------------------------------------------------
+def normalize_text(text):
+    """Lowercase and unify en-dash with hyphen (what every matcher expects)."""
+    return str(text).lower().replace("–", "-")
+
+
+def encode_needles(words):
+    """Normalize + UTF-8 encode a word list once for repeated arena lookups."""
+    return [normalize_text(w).encode("utf-8") for w in words]
+
+
+def _offsets_path(path):
+    path = Path(path)
+    return path.with_name(path.name + ".offsets.npy")
+
+
+# -------------------------------------------------------------------
+# Build / open
+# -------------------------------------------------------------------
+def build_arena(texts, path=None):
+    """
+    Write all texts, normalized, into one UTF-8 buffer plus an offsets array
+    (<path>.offsets.npy); text i is buffer[offsets[i]:offsets[i+1]].
+    Returns the opened TextArena; use it as a context manager or close() it.
+
+    Without `path` the arena goes to a fresh temp file that close() deletes,
+    so concurrent callers never share one. An existing file at `path` is
+    replaced atomically: arenas already mapped from it keep their data.
+    """
+    owned = path is None
+    if owned:
+        fd, name = tempfile.mkstemp(prefix="responses_", suffix=".arena")
+        os.close(fd)
+        path = Path(name)
+    path = Path(path)
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    offsets = [0]
+    with tmp.open("wb") as f:
+        for text in texts:
+            data = normalize_text(text).encode("utf-8")
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    with _offsets_path(tmp).open("wb") as f:
+        np.save(f, np.asarray(offsets, dtype=np.int64))
+    os.replace(_offsets_path(tmp), _offsets_path(path))
+    os.replace(tmp, path)
+    return TextArena(path, owned=owned)
+
+
+class TextArena:
+    """
+    Read-only view over an arena file. Opening only maps the file, so
+    several worker processes can share the same pages without pickling
+    the corpus; pass the path (not the object) to workers.
+    """
+
+    def __init__(self, path, owned=False):
+        self.path = Path(path)
+        self.owned = owned      # delete the files on close (temp arenas)
+        self.closed = False
+        self.offsets = np.load(_offsets_path(self.path))
+        self._file = self.path.open("rb")
+        if self.offsets[-1] > 0:
+            self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.buf = b""
+        self._view = memoryview(self.buf)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def bounds(self, i):
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def view(self, i):
+        """Zero-copy memoryview of text i (use with bytes regexes)."""
+        start, end = self.bounds(i)
+        return self._view[start:end]
+
+    def text(self, i):
+        """Decoded copy of text i (only when a str is really needed)."""
+        return str(self.view(i), "utf-8")
+
+    def contains(self, i, needle):
+        start, end = self.bounds(i)
+        return self.buf.find(needle, start, end) != -1
+
+    def contains_any(self, i, needles):
+        start, end = self.bounds(i)
+        find = self.buf.find
+        return any(find(n, start, end) != -1 for n in needles)
+
+    def search(self, i, pattern):
+        """pattern.search over text i; `pattern` must be a compiled bytes regex."""
+        return pattern.search(self.view(i))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._view.release()
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+        self._file.close()
+        if self.owned:
+            self.path.unlink(missing_ok=True)
+            _offsets_path(self.path).unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -------------------------------------------------------------------
+# Shared-arena parallel map
+# -------------------------------------------------------------------
+_worker_arena = None
+
+
+def _init_worker(path):
+    global _worker_arena
+    _worker_arena = TextArena(path)
+
+
+def _run_chunk(args):
+    func, lo, hi = args
+    return [func(_worker_arena, i) for i in range(lo, hi)]
+
+
+def map_arena(func, arena, processes=None, chunk_size=2000):
+    """
+    Apply func(arena, i) to every text. With processes > 1 each worker maps
+    the arena file itself; only the path and index ranges are pickled.
+    Results come back in index order. `func` must be a module-level function.
+    """
+    n = len(arena)
+    if not processes or processes <= 1 or n <= chunk_size:
+        return [func(arena, i) for i in range(n)]
+
+    chunks = [(func, lo, min(lo + chunk_size, n)) for lo in range(0, n, chunk_size)]
+    with Pool(processes, initializer=_init_worker, initargs=(str(arena.path),)) as pool:
+        parts = pool.map(_run_chunk, chunks)
+    return [r for part in parts for r in part]